@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+함수 추출기 벤치마크
+
+합성 C++ 코퍼스(일반 코드 + 정규식 역추적을 유발하기 쉬운 병적인 입력)를
+원하는 크기로 생성하고, FunctionExtractor.extract_functions의
+처리량(functions/sec, MB/sec)과 최대 메모리를 측정해 JSON으로 저장한다.
+
+사용법:
+    python benchmarks/extractor_benchmark.py                      # 기본 1MB 코퍼스
+    python benchmarks/extractor_benchmark.py --size 5000000 --corpus typical macro_soup
+    python benchmarks/extractor_benchmark.py --compare old.json new.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# 서버 모듈 경로 추가
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / 'server'))
+
+import function_extractor
+from function_extractor import FunctionExtractor
+
+RESULTS_DIR = project_root / 'benchmarks' / 'results'
+
+_TYPES = ['int', 'double', 'bool', 'size_t', 'std::string', 'const std::string&', 'const char*',
+          'std::vector<int>', 'std::map<std::string, int>', 'uint64_t']
+
+
+def _name(rng: random.Random, prefix: str = 'fn') -> str:
+    return f"{prefix}_{rng.randrange(10 ** 9):x}"
+
+
+def _params(rng: random.Random, count: int) -> str:
+    return ', '.join(f"{rng.choice(_TYPES)} p{i}" for i in range(count))
+
+
+def _body(rng: random.Random, statements: int) -> str:
+    lines = []
+    for i in range(statements):
+        kind = rng.randrange(5)
+        if kind == 0:
+            lines.append(f'    if (p0 > {i}) {{ return {i}; }}')
+        elif kind == 1:
+            lines.append(f'    const char* s{i} = "brace {{ in string }}";')
+        elif kind == 2:
+            lines.append(f"    char c{i} = '}}';  // }} in comment")
+        elif kind == 3:
+            lines.append(f'    for (int k = 0; k < {i}; ++k) {{ total += k; }}')
+        else:
+            lines.append(f'    /* block {{ comment */ total += {i};')
+    return '\n'.join(lines)
+
+
+def gen_typical(rng: random.Random) -> str:
+    """일반적인 유틸리티 코드 (네임스페이스, 클래스, 주석, 자유 함수)"""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return (f"// {_name(rng, 'doc')}\n"
+                f"static int {_name(rng)}({_params(rng, rng.randint(0, 4))}) {{\n"
+                f"    int total = 0;\n{_body(rng, rng.randint(1, 8))}\n    return total;\n}}\n\n")
+    if kind == 1:
+        return (f"namespace {_name(rng, 'ns')} {{\n"
+                f"inline double {_name(rng)}(double x) {{ return x * x; }}\n}}\n\n")
+    if kind == 2:
+        return (f"class {_name(rng, 'Cls')} {{\npublic:\n"
+                f"    int method(int v) const {{ return v + 1; }}\n}};\n\n")
+    return f"extern int {_name(rng, 'decl')}({_params(rng, 2)});\n"
+
+
+def gen_long_params(rng: random.Random) -> str:
+    """매개변수가 수백 개인 함수 (여러 줄에 걸친 시그니처)"""
+    count = rng.randint(100, 400)
+    params = ',\n    '.join(f"{rng.choice(_TYPES)} p{i} = {i}" for i in range(count))
+    return f"int {_name(rng)}(\n    {params})\n{{\n    return p0;\n}}\n\n"
+
+
+def gen_template_heavy(rng: random.Random) -> str:
+    """한 줄이 매우 긴 중첩 템플릿 시그니처"""
+    depth = rng.randint(8, 30)
+    nested = 'int'
+    for _ in range(depth):
+        nested = f"std::map<std::string, std::vector<{nested}>>"
+    return (f"{nested} {_name(rng)}(const {nested}& a, {nested}* b, "
+            f"std::function<{nested}({nested})> f) {{ return a; }}\n")
+
+
+def gen_macro_soup(rng: random.Random) -> str:
+    """매크로 정의/조건부 컴파일/함수처럼 보이는 매크로 호출이 뒤섞인 코드"""
+    name = _name(rng)
+    return (f"#define {name.upper()}(x, y) \\\n    do {{ if ((x) > (y)) {{ (x) = (y); }} }} while (0)\n"
+            f"#if defined(_WIN32) && !defined(__MINGW32__)\n"
+            f"DECLARE_HANDLER({name}) {{ return 0; }}\n"
+            f"#elif defined(__linux__)\n"
+            f"#  ifdef FEATURE_{rng.randrange(100)}\n"
+            f"int {name}_linux(int v) {{ {name.upper()}(v, 1); return v; }}\n"
+            f"#  endif\n"
+            f"#else\n"
+            f"int {name}_other() {{ return 1; }}\n"
+            f"#endif\n"
+            f"BEGIN_MESSAGE_MAP({name}, CWnd) ON_WM_PAINT() END_MESSAGE_MAP()\n\n")
+
+
+def gen_huge_single_line(rng: random.Random) -> str:
+    """줄바꿈 없이 이어 붙인 함수들 (코퍼스 전체가 한 줄)"""
+    return (f"static int {_name(rng)}(int a, int b) {{ if (a) {{ return b; }} "
+            f"const char* s = \"}}{{\"; return a + b; }} ")
+
+
+def gen_adversarial(rng: random.Random) -> str:
+    """짝이 맞지 않는 괄호, 연속된 한정자, 긴 식별자 나열 등 역추적 유발 입력"""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return 'f(' * rng.randint(50, 200) + ';\n'
+    if kind == 1:
+        return '::'.join(_name(rng, 'q') for _ in range(rng.randint(20, 80))) + ' x;\n'
+    if kind == 2:
+        return ' '.join(_name(rng, 'id') for _ in range(rng.randint(50, 200))) + ';\n'
+    return f"int {_name(rng)}(" + 'int, ' * rng.randint(100, 300) + "int) const noexcept override final;\n"
+
+
+CORPORA: Dict[str, Callable[[random.Random], str]] = {
+    'typical': gen_typical,
+    'long_params': gen_long_params,
+    'template_heavy': gen_template_heavy,
+    'macro_soup': gen_macro_soup,
+    'huge_single_line': gen_huge_single_line,
+    'adversarial': gen_adversarial,
+}
+
+
+def generate_corpus(kind: str, size: int, seed: int = 0) -> str:
+    """size 바이트 이상이 될 때까지 조각을 생성해 이어 붙인 코퍼스"""
+    rng = random.Random(f"{kind}:{seed}")
+    generator = CORPORA[kind]
+    parts = []
+    total = 0
+    while total < size:
+        part = generator(rng)
+        parts.append(part)
+        total += len(part)
+    return ''.join(parts)
+
+
+def _measure(kind: str, size: int, seed: int, repeat: int, queue):
+    """자식 프로세스에서 코퍼스 하나 측정 (시간은 tracemalloc 없이, 메모리는 별도 실행)"""
+    try:
+        code = generate_corpus(kind, size, seed)
+        timings = []
+        functions = 0
+        for _ in range(repeat):
+            extractor = FunctionExtractor()
+            started = time.perf_counter()
+            functions = len(extractor.extract_functions(code))
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        FunctionExtractor().extract_functions(code)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        best = min(timings)
+        queue.put({
+            'status': 'ok',
+            'bytes': len(code.encode('utf-8')),
+            'lines': code.count('\n') + 1,
+            'functions': functions,
+            'seconds_best': round(best, 4),
+            'seconds_median': round(statistics.median(timings), 4),
+            'functions_per_sec': round(functions / best, 1) if best else None,
+            'mb_per_sec': round(len(code) / best / 1e6, 2) if best else None,
+            'peak_memory_mb': round(peak / 1e6, 2)
+        })
+    except Exception as e:
+        queue.put({'status': 'error', 'error': str(e)})
+
+
+def run_benchmark(corpora: List[str], size: int, repeat: int = 3, seed: int = 0,
+                  timeout: float = 300) -> Dict:
+    """코퍼스별로 자식 프로세스에서 측정 (역추적으로 멈추면 timeout으로 기록)"""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for kind in corpora:
+        print(f"⏱️ {kind} ({size:,} bytes) 측정 중...")
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(kind, size, seed, repeat, queue))
+        process.start()
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            results[kind] = {'status': 'timeout', 'timeout_sec': timeout}
+            print(f"  ❌ {timeout}초 초과")
+            continue
+        result = queue.get() if not queue.empty() else {'status': 'error', 'error': f'exit code {process.exitcode}'}
+        results[kind] = result
+        if result['status'] == 'ok':
+            print(f"  ✅ {result['functions']}개 함수, {result['seconds_best']}초, "
+                  f"{result['functions_per_sec']} functions/sec, {result['mb_per_sec']} MB/sec, "
+                  f"최대 메모리 {result['peak_memory_mb']} MB")
+        else:
+            print(f"  ❌ 오류: {result.get('error')}")
+
+    return {
+        'extractor_version': function_extractor.EXTRACTOR_VERSION,
+        'git_commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': function_extractor.np is not None,
+        'size': size,
+        'repeat': repeat,
+        'seed': seed,
+        'results': results
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ''
+
+
+def compare(old_path: str, new_path: str):
+    """두 결과 파일의 코퍼스별 시간/메모리 비교 출력"""
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"📊 {old.get('git_commit') or old_path} (v{old.get('extractor_version')}) -> "
+          f"{new.get('git_commit') or new_path} (v{new.get('extractor_version')})")
+    print(f"{'corpus':<18}{'old sec':>10}{'new sec':>10}{'speedup':>10}{'old MB':>10}{'new MB':>10}{'funcs':>12}")
+    for kind in sorted(set(old['results']) | set(new['results'])):
+        a = old['results'].get(kind, {})
+        b = new['results'].get(kind, {})
+        if a.get('status') != 'ok' or b.get('status') != 'ok':
+            print(f"{kind:<18}{a.get('status', '-'):>10}{b.get('status', '-'):>10}")
+            continue
+        speedup = a['seconds_best'] / b['seconds_best'] if b['seconds_best'] else float('inf')
+        funcs = f"{a['functions']}->{b['functions']}" if a['functions'] != b['functions'] else str(b['functions'])
+        print(f"{kind:<18}{a['seconds_best']:>10.3f}{b['seconds_best']:>10.3f}{speedup:>9.2f}x"
+              f"{a['peak_memory_mb']:>10.1f}{b['peak_memory_mb']:>10.1f}{funcs:>12}")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='FunctionExtractor 벤치마크')
+    parser.add_argument('--size', type=int, default=1_000_000, help='코퍼스별 크기 (바이트)')
+    parser.add_argument('--corpus', nargs='+', choices=sorted(CORPORA), default=list(CORPORA),
+                        help='측정할 코퍼스')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최소 시간 사용)')
+    parser.add_argument('--seed', type=int, default=0, help='코퍼스 생성 시드')
+    parser.add_argument('--timeout', type=float, default=300, help='코퍼스별 제한 시간 (초)')
+    parser.add_argument('--output', help='결과 JSON 경로 (기본: benchmarks/results/)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='두 결과 파일 비교')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run_benchmark(args.corpus, args.size, args.repeat, args.seed, args.timeout)
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = RESULTS_DIR / f"extractor-v{report['extractor_version']}-{report['git_commit'] or 'local'}-{stamp}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {output}")
+
+
+if __name__ == '__main__':
+    main()
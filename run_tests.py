@@ -32,6 +32,17 @@ def run_all_tests():
     test_modules = [
         'tests.test_code_analyzer',
         'tests.test_function_extractor',
+        'tests.test_disk_cache',
+        'tests.test_call_graph',
+        'tests.test_function_fingerprint',
+        'tests.test_function_record',
+        'tests.test_project_fingerprint',
+        'tests.test_scan_planner',
+        'tests.test_sampling',
+        'tests.test_rate_limiter',
+        'tests.test_code_metrics',
+        'tests.test_services',
+        'tests.test_jobs',
         'tests.test_agent_wrapper',
         'tests.test_aws_backend',
         'tests.test_integration'
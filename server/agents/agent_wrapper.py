@@ -2,8 +2,9 @@ from typing import List, Dict, Optional
 from .code_analyzer_agent import CodeAnalyzerAgent
 
 class AgentWrapper:
-    def __init__(self):
-        self.code_analyzer = CodeAnalyzerAgent()
+    def __init__(self, refactor_store=None, bedrock_client=None):
+        self.bedrock_client = bedrock_client
+        self.code_analyzer = CodeAnalyzerAgent(refactor_store, bedrock_client)
         print("Agent 래퍼 초기화 완료")
     
     async def refactor_for_reusability(self, raw_functions: List[Dict], full_code: str, file_extension: str) -> List[Dict]:
@@ -51,11 +52,11 @@ class AgentWrapper:
 사용자가 이 라이브러리를 쉽게 사용할 수 있도록 친절하고 상세한 문서를 작성해주세요.
 """
 
-            # Bedrock 클라이언트 직접 생성
+            # 공유 클라이언트가 없을 때만 직접 생성
             from aws_config import get_bedrock_client, BEDROCK_MODEL_ID
             import json
             
-            bedrock_client = get_bedrock_client()
+            bedrock_client = self.bedrock_client or get_bedrock_client()
             
             response = bedrock_client.invoke_model(
                 modelId=BEDROCK_MODEL_ID,
@@ -2,13 +2,41 @@ import boto3
 import json
 import time
 import asyncio
+import re
 from typing import List, Dict, Optional
 from aws_config import *
 
+# 함수 리팩토링용 모델
+REFACTOR_MODEL_ID = "anthropic.claude-3-haiku-20240307-v1:0"
+# 리팩토링 프롬프트/도구 스키마를 바꾸면 올려서 저장된 이전 결과를 무효화
+REFACTOR_PROMPT_VERSION = '1'
+# 한 번의 리팩토링 요청에 넣는 최대 함수 수
+REFACTOR_BATCH_SIZE = 8
+# 리팩토링 결과에 원본 함수에서 그대로 옮기는 위치 정보
+SOURCE_KEYS = ('source_file', 'file', 'path')
+
+
+def _normalize_name(name) -> str:
+    """AI 결과와 원본 함수 이름 비교용 (대소문자/밑줄 차이 무시)"""
+    return re.sub(r'_', '', name or '').lower()
+
+
+def _with_source(func: Dict, utilities: List[Dict]) -> List[Dict]:
+    """원본 함수의 위치 정보(source_file 등)를 붙인 리팩토링 결과 복사본"""
+    source = {key: func.get(key) for key in SOURCE_KEYS if func.get(key) is not None}
+    if not source:
+        return utilities
+    return [dict(util, **{key: value for key, value in source.items() if key not in util})
+            if isinstance(util, dict) else util for util in utilities]
+
+
 class CodeAnalyzerAgent:
-    def __init__(self):
+    def __init__(self, refactor_store=None, bedrock_client=None):
+        # refactor_store: 이전 리팩토링 결과 저장소 (function_fingerprint.RefactorStore)
+        # bedrock_client: 공유 클라이언트 (없으면 새로 생성)
+        self.refactor_store = refactor_store
         try:
-            self.bedrock = get_bedrock_client()
+            self.bedrock = bedrock_client or get_bedrock_client()
             self.aws_available = True
             print("✅ AWS Bedrock 연결 성공")
         except Exception as e:
@@ -248,13 +276,54 @@ Use the extract_utilities tool to return ONLY useful utility functions.
         return validated
     
     async def refactor_functions(self, raw_functions: List[Dict], full_code: str, file_extension: str) -> List[Dict]:
-        """원본 함수들을 재사용 가능하게 리팩토링"""
+        """원본 함수들을 재사용 가능하게 리팩토링
+
+        refactor_store가 있으면 핑거프린트가 같은 함수(공백/주석/식별자 이름만 다른 함수)는
+        저장된 이전 결과를 바로 사용하고, 처음 보는 함수만 Bedrock으로 리팩토링한다.
+        결과에는 원본 함수의 source_file/file/path를 붙여, 다시 업로드한 파일에서
+        삭제/수정된 함수의 이전 결과를 파일 단위로 지울 수 있게 한다.
+        """
+        if self.refactor_store is None:
+            return self._attach_sources(raw_functions,
+                                        await self._refactor_with_bedrock(raw_functions, full_code, file_extension))
+        
+        reused = []
+        misses = []
+        for func in raw_functions:
+            stored = self.refactor_store.lookup(func)
+            if stored is None:
+                misses.append(func)
+            else:
+                reused.extend(_with_source(func, stored))
+        if len(misses) < len(raw_functions):
+            print(f"♻️ 저장된 리팩토링 결과 재사용: {len(raw_functions) - len(misses)}개 함수 (AI 호출 생략)")
+        if not misses:
+            return reused
+        
+        return reused + self._attach_sources(misses,
+                                             await self._refactor_with_bedrock(misses, full_code, file_extension))
+
+    @staticmethod
+    def _attach_sources(raw_functions: List[Dict], utilities: List[Dict]) -> List[Dict]:
+        """AI 결과를 함수명으로 원본과 짝지어 위치 정보 붙이기 (짝이 없으면 그대로)"""
+        by_name = {}
+        for func in raw_functions:
+            by_name.setdefault(_normalize_name(func.get('name')), func)
+        attached = []
+        for util in utilities:
+            func = by_name.get(_normalize_name(util.get('name')))
+            attached.extend(_with_source(func, [util]) if func is not None else [util])
+        return attached
+    
+    async def _refactor_with_bedrock(self, raw_functions: List[Dict], full_code: str, file_extension: str) -> List[Dict]:
+        """Bedrock으로 함수 리팩토링 (성공하면 결과를 refactor_store에 저장)"""
         if not self.aws_available or not self.bedrock:
             print("❌ Bedrock을 사용할 수 없습니다. 원본 함수 반환")
             return raw_functions
         
         # DLL 유틸리티 함수 추출 특화 프롬프트
-        func_list = "\n".join([f"- {func['name']}: {func.get('signature', 'N/A')}" for func in raw_functions[:8]])
+        batch = raw_functions[:REFACTOR_BATCH_SIZE]
+        func_list = "\n".join([f"- {func['name']}: {func.get('signature', 'N/A')}" for func in batch])
         refactoring_prompt = f"""
 다음 함수들 중 DLL로 만들 가치가 있는 유틸리티 함수만 선별하여 변환하세요.
 
@@ -297,7 +366,7 @@ DLL 빌드 가능한 함수만 JSON 배열로 응답:
                     await asyncio.sleep(base_delay)  # 첫 시도는 기본 대기
                 
                 response = self.bedrock.converse(
-                    modelId="anthropic.claude-3-haiku-20240307-v1:0",  # Haiku 모델로 변경
+                    modelId=REFACTOR_MODEL_ID,  # Haiku 모델
                     messages=[{
                         "role": "user",
                         "content": [{"text": refactoring_prompt}]
@@ -403,7 +472,9 @@ DLL 빌드 가능한 함수만 JSON 배열로 응답:
                             print(f"⚠️ required_headers 누락된 함수들: {missing_headers}")
                         
                         # AI가 리팩토링한 새로운 시그니처 사용
-                        return self._validate_utilities(filtered_utilities)
+                        validated = self._validate_utilities(filtered_utilities)
+                        self._store_refactored(batch, utilities, validated)
+                        return validated
             
             print("❌ AI 리팩토링 실패, 원본 함수 반환")
             return raw_functions
@@ -412,6 +483,24 @@ DLL 빌드 가능한 함수만 JSON 배열로 응답:
             print(f"❌ 리팩토링 오류: {e}")
             return raw_functions
     
+    def _store_refactored(self, batch: List[Dict], utilities: List[Dict], validated: List[Dict]):
+        """요청한 함수별 리팩토링 결과를 refactor_store에 저장
+
+        AI 결과는 함수명으로 원본과 짝짓는다 (대소문자/밑줄 차이 무시).
+        원본과 짝지을 수 없는 결과가 있으면 이름이 바뀐 것일 수 있으므로
+        결과가 없는 함수를 '제외됨'으로 저장하지 않는다.
+        """
+        if self.refactor_store is None:
+            return
+        
+        batch_names = {_normalize_name(func.get('name')) for func in batch}
+        unmatched = any(_normalize_name(util.get('name')) not in batch_names for util in utilities)
+        for func in batch:
+            name = _normalize_name(func.get('name'))
+            matched = [util for util in validated if _normalize_name(util.get('name')) == name]
+            if matched or not unmatched:
+                self.refactor_store.record(func, matched)
+    
     def get_analysis_stats(self) -> Dict:
         """분석 통계 반환"""
         return {
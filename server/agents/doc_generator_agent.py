@@ -4,8 +4,9 @@ from typing import List, Dict
 from aws_config import *
 
 class DocumentationAgent:
-    def __init__(self):
-        self.bedrock = boto3.client('bedrock-runtime', region_name=AWS_REGION)
+    def __init__(self, bedrock_client=None):
+        # bedrock_client: 공유 클라이언트 (없으면 새로 생성)
+        self.bedrock = bedrock_client or boto3.client('bedrock-runtime', region_name=AWS_REGION)
         self.model_id = "anthropic.claude-3-haiku-20240307-v1:0"  # 올바른 Haiku 모델 ID
     
     async def generate_documentation(self, build_data: Dict) -> str:
@@ -1,15 +1,23 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 import json
 import uuid
 import os
+import time
+import asyncio
 from datetime import datetime
 from typing import List
 from pydantic import BaseModel
 from decimal import Decimal
-from function_extractor import FunctionExtractor
+from collections import OrderedDict
+from function_extractor import FunctionExtractor, language_for_path
+from disk_cache import DiskCache
+from call_graph import CallGraph
+from function_fingerprint import RefactorStore
+from function_record import FunctionRecord
+from code_metrics import compute_metrics, maintainability_index
 
 class FileData(BaseModel):
     name: str
@@ -19,8 +27,9 @@ class FileData(BaseModel):
 
 class AnalyzeRequest(BaseModel):
     files: List[FileData]
-from agents.agent_wrapper import AgentWrapper
-from code_analyzer import CodeAnalyzer
+from agents.code_analyzer_agent import REFACTOR_MODEL_ID, REFACTOR_PROMPT_VERSION
+from services import Services
+from jobs import JobQueue, JobFailed, FINISHED_STATES
 import git
 import stat
 import httpx
@@ -57,17 +66,6 @@ app.add_middleware(
 # 정적 파일 서빙 - HTML 파일들을 루트에서 직접 서빙
 # app.mount("/static", StaticFiles(directory="."), name="static")
 
-# Agent 래퍼 초기화
-try:
-    init_aws_resources()
-    agent_wrapper = AgentWrapper()
-    code_analyzer = CodeAnalyzer()
-    print("Agent 래퍼 초기화 완료")
-except Exception as e:
-    print(f"AWS 초기화 실패 (무시): {e}")
-    agent_wrapper = None
-    code_analyzer = CodeAnalyzer()
-
 # 로컬 저장소 설정 (AWS 환경용)
 LOCAL_STORAGE_DIR = os.path.join(CURRENT_DIR, "local_storage")
 LOCAL_REPOS_DIR = os.path.join(LOCAL_STORAGE_DIR, "repositories")
@@ -76,6 +74,69 @@ os.makedirs(LOCAL_REPOS_DIR, exist_ok=True)
 os.makedirs(LOCAL_BUILDS_DIR, exist_ok=True)
 os.makedirs(LOCAL_STORAGE_DIR, exist_ok=True)
 
+# 함수 추출 결과 캐시 (파일 내용 해시 기준, 같은 파일 재업로드 시 파싱 생략)
+EXTRACTION_CACHE_MAX_BYTES = 64 * 1024 * 1024
+extraction_cache = DiskCache(os.path.join(LOCAL_STORAGE_DIR, "extraction_cache.db"), EXTRACTION_CACHE_MAX_BYTES)
+
+# 증분 재추출용 이전 추출 결과 ((세션, 파일 경로) -> span 목록, 소스 전체를 참조하므로 개수 제한 LRU)
+# 세션은 X-Session-Id 헤더 (없으면 클라이언트 주소), 다른 사용자가 같은 이름의 파일을 올려도 섞이지 않음
+EXTRACTION_SPANS_MAX_FILES = 256
+extraction_spans = OrderedDict()
+
+def previous_extraction(key):
+    spans = extraction_spans.get(key)
+    if spans is not None:
+        extraction_spans.move_to_end(key)
+    return spans
+
+def remember_extraction(key, spans):
+    extraction_spans[key] = spans
+    extraction_spans.move_to_end(key)
+    while len(extraction_spans) > EXTRACTION_SPANS_MAX_FILES:
+        extraction_spans.popitem(last=False)
+
+def extraction_session(request: Request) -> str:
+    return request.headers.get('x-session-id') or (request.client.host if request.client else '')
+
+# 세션별로 업로드된 파일의 함수 호출 그래프 (/build에서 필요한 헬퍼 함수 자동 포함, 세션 수 제한 LRU)
+CALL_GRAPH_MAX_SESSIONS = 64
+call_graphs = OrderedDict()
+
+def session_call_graph(session: str) -> CallGraph:
+    graph = call_graphs.get(session)
+    if graph is None:
+        graph = call_graphs[session] = CallGraph()
+    call_graphs.move_to_end(session)
+    while len(call_graphs) > CALL_GRAPH_MAX_SESSIONS:
+        call_graphs.popitem(last=False)
+    return graph
+
+# 함수 핑거프린트별 이전 AI 리팩토링 결과 (같은 함수는 Bedrock 호출 생략)
+REFACTOR_STORE_MAX_BYTES = 64 * 1024 * 1024
+refactor_store = RefactorStore(
+    DiskCache(os.path.join(LOCAL_STORAGE_DIR, "refactor_store.db"), REFACTOR_STORE_MAX_BYTES),
+    f"{REFACTOR_MODEL_ID}:{REFACTOR_PROMPT_VERSION}"
+)
+
+# 스트리밍 분석에서 끝난 파일이 없을 때 진행 이벤트를 보내는 간격 (프록시 유휴 타임아웃 방지)
+STREAM_HEARTBEAT_SECONDS = 10
+
+# 분석기/에이전트 컨테이너 (Bedrock 클라이언트와 캐시를 한 번 만들어 모든 요청이 공유)
+services = Services(refactor_store, aws_init=init_aws_resources)
+if services.init_aws():
+    try:
+        services.agent_wrapper()
+        print("Agent 래퍼 초기화 완료")
+    except Exception as e:
+        print(f"Agent 래퍼 초기화 실패 (무시): {e}")
+services.code_analyzer()
+
+# 오래 걸리는 분석/빌드를 요청과 분리해 실행하는 백그라운드 작업 큐 (SQLite에 저장, 재시작해도 유지)
+job_queue = JobQueue(os.path.join(LOCAL_STORAGE_DIR, "jobs.db"))
+# 작업 등록 시 받을 수 있는 우선순위 범위 (클수록 먼저 실행)
+JOB_PRIORITY_MIN = -10
+JOB_PRIORITY_MAX = 10
+
 class BuildConfig(BaseModel):
     architecture: str
     runtime: str
@@ -187,18 +248,29 @@ async def save_extraction(function_data: dict):
         return {"success": False, "error": str(e)}
 
 @app.post("/analyze_json")
-async def analyze_code_json(request: AnalyzeRequest):
+async def analyze_code_json(request: AnalyzeRequest, http_request: Request):
     """JSON 형식으로 파일 내용을 받아 함수 단위로 분석"""
-    extractor = FunctionExtractor()
-    analyzer = CodeAnalyzer()
+    extractor = FunctionExtractor(cache=extraction_cache)
+    analyzer = services.code_analyzer()
     new_utilities = []
     
-    for file_data in request.files:
+    # 함수 단위로 추출 (프로세스 풀에서 병렬 처리, 입력 순서 유지)
+    extraction_results = await extractor.extract_many_async(
+        [file_data.content for file_data in request.files],
+        [language_for_path(file_data.name) or 'cpp' for file_data in request.files]
+    )
+    
+    for file_data, extraction in zip(request.files, extraction_results):
         try:
-            print(f"파일 처리 시작: {file_data.name}")
+            print(f"파일 처리 시작: {file_data.name} (추출 {extraction['elapsed']:.3f}초)")
             
-            # 함수 단위로 추출
-            functions = extractor.extract_functions(file_data.content)
+            if extraction['error']:
+                raise Exception(extraction['error'])
+            functions = extraction['functions']
+            # /build에서 헬퍼 함수를 찾을 수 있도록 호출 그래프 갱신
+            session_call_graph(extraction_session(http_request)).update_file(
+                file_data.path or file_data.name, functions, source=file_data.content
+            )
             
             for func in functions:
                 try:
@@ -259,12 +331,13 @@ async def analyze_code_json(request: AnalyzeRequest):
     return {"utilities": new_utilities}
 
 @app.post("/analyze")
-async def analyze_code(files: List[UploadFile] = File(...)):
-    extractor = FunctionExtractor()
+async def analyze_code(request: Request, files: List[UploadFile] = File(...)):
+    extractor = FunctionExtractor(cache=extraction_cache)
     all_raw_functions = []
     file_info_map = {}
     
     # 1단계: 모든 파일에서 함수 추출
+    sources = []
     for file_index, file in enumerate(files):
         try:
             print(f"파일 처리 시작 ({file_index+1}/{len(files)}): {file.filename}")
@@ -281,37 +354,96 @@ async def analyze_code(files: List[UploadFile] = File(...)):
                 except UnicodeDecodeError:
                     text = content.decode('latin-1')
             
-            # 파일 확장자 확인
-            file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'txt'
-            
-            # 함수 추출
-            raw_functions = extractor.extract_functions(text)
-            print(f"추출된 함수: {len(raw_functions)}개")
-            
-            # 파일 정보 저장
-            for func in raw_functions:
-                func['source_file'] = file.filename
-                func['file_extension'] = file_extension
-                func['file'] = file.filename
-                func['type'] = 'function'
-                func['line'] = func.get('line', 1)
-                func['path'] = file.filename
-                
-                # 시그니처 생성
-                if 'signature' not in func and 'name' in func:
-                    return_type = func.get('return_type', 'void')
-                    params = func.get('parameters', '')
-                    func['signature'] = f"{return_type} {func['name']}({params})"
-            
-            all_raw_functions.extend(raw_functions)
+            # 같은 요청에 이름이 같은 파일이 여러 개면 결과/증분 상태가 섞이지 않도록 구분
+            path = file.filename
+            taken = {source_path for source_path, _ in sources}
+            duplicate = 2
+            while path in taken:
+                path = f"{file.filename} ({duplicate})"
+                duplicate += 1
+            sources.append((path, text))
             
         except Exception as e:
             print(f"파일 처리 오류 ({file.filename}): {e}")
             continue
     
+    # 같은 세션에서 이전에 분석한 파일은 변경된 부분만 다시 추출
+    session = extraction_session(request)
+    previous_spans = {filename: previous_extraction((session, filename)) for filename, _ in sources}
+    # 확장자로 언어 판단 (알 수 없는 확장자는 기존처럼 C/C++로 처리)
+    languages = {filename: language_for_path(filename) or 'cpp' for filename, _ in sources}
+    new_sources = [(filename, text) for filename, text in sources if previous_spans[filename] is None]
+    removed_names = {}
+    
+    # 새 파일 함수 추출 (프로세스 풀에서 병렬 처리, 입력 순서 유지)
+    extraction_results = await extractor.extract_many_async(
+        [text for _, text in new_sources], [languages[filename] for filename, _ in new_sources]
+    )
+    extractions = dict(zip([filename for filename, _ in new_sources], extraction_results))
+    
+    for filename, text in sources:
+        if filename in extractions:
+            continue
+        started = time.perf_counter()
+        try:
+            diff = await asyncio.to_thread(extractor.extract_incremental, previous_spans[filename], text)
+        except Exception as e:
+            extractions[filename] = {'functions': [], 'spans': [], 'elapsed': 0, 'error': str(e)}
+            continue
+        changed = sorted(diff['added'] + diff['modified'], key=lambda span: span.start)
+        removed_names[filename] = {span.name for span in diff['removed'] + diff['modified']}
+        extractions[filename] = {
+            'functions': [span.to_dict() for span in changed],
+            'spans': diff['spans'],
+            'elapsed': time.perf_counter() - started,
+            'error': None
+        }
+        mode = "전체" if diff['full_parse'] else "증분"
+        print(f"🔄 {mode} 재추출 ({filename}): 추가 {len(diff['added'])}개, "
+              f"수정 {len(diff['modified'])}개, 삭제 {len(diff['removed'])}개")
+    
+    for filename, text in sources:
+        extraction = extractions[filename]
+        if extraction['error']:
+            print(f"파일 처리 오류 ({filename}): {extraction['error']}")
+            continue
+        if languages[filename] == 'cpp':
+            # 증분 재추출은 C/C++만 지원
+            remember_extraction((session, filename), extraction['spans'])
+        
+        # 파일 확장자 확인
+        file_extension = filename.split('.')[-1] if '.' in filename else 'txt'
+        
+        raw_functions = extraction['functions']
+        # 호출 그래프 갱신 (증분 재추출이면 삭제/수정된 함수만 교체)
+        session_call_graph(session).update_file(filename, raw_functions, removed_names.get(filename), text)
+        cached = " 캐시" if extraction.get('cached') else ""
+        print(f"추출된 함수: {len(raw_functions)}개 ({filename}, {extraction['elapsed']:.3f}초{cached})")
+        
+        # 파일 정보 저장
+        for func in raw_functions:
+            func['source_file'] = filename
+            func['file_extension'] = file_extension
+            func['file'] = filename
+            func['type'] = 'function'
+            func['line'] = func.get('line', 1)
+            func['path'] = filename
+            
+            # 시그니처 생성 (C/C++ 외 언어는 원본 시그니처 사용)
+            if 'signature' not in func and func.get('language', 'cpp') != 'cpp':
+                func['signature'] = func.get('original_signature', func.get('name', ''))
+            if 'signature' not in func and 'name' in func:
+                return_type = func.get('return_type', 'void')
+                params = func.get('parameters', '')
+                func['signature'] = f"{return_type} {func['name']}({params})"
+        
+        # 메모리 절약형 레코드로 보관 (API 응답에서만 dict로 변환)
+        all_raw_functions.extend(FunctionRecord.from_dict(func) for func in raw_functions)
+    
     print(f"전체 추출된 함수: {len(all_raw_functions)}개")
     
     # 2단계: 모든 함수를 한 번에 AI 리팩토링
+    agent_wrapper = services.agent_wrapper()
     if agent_wrapper and all_raw_functions:
         print("AI 리팩토링 시작 (모든 함수 일괄 처리)")
         utilities = await agent_wrapper.refactor_for_reusability(all_raw_functions, "", "cpp")
@@ -320,7 +452,10 @@ async def analyze_code(files: List[UploadFile] = File(...)):
         utilities = all_raw_functions
         print("AI 없이 원본 함수 사용")
     
-    new_utilities = utilities
+    new_utilities = [
+        util if isinstance(util, FunctionRecord) else FunctionRecord.from_dict(util)
+        for util in utilities
+    ]
     
     # 기존 분석 결과와 합치기
     try:
@@ -331,6 +466,13 @@ async def analyze_code(files: List[UploadFile] = File(...)):
         # 중복 제거: 같은 파일의 같은 함수명은 새 것으로 교체
         existing_utilities = app.state.analyzed_utilities.copy()
         
+        # 증분 재추출에서 삭제/수정된 함수는 기존 결과에서 제거 (같은 파일에서 나온 함수만)
+        if removed_names:
+            existing_utilities = [
+                util for util in existing_utilities
+                if util.get('name') not in removed_names.get(util.get('source_file'), ())
+            ]
+        
         for new_util in new_utilities:
             # 같은 파일의 같은 함수가 있으면 제거
             existing_utilities = [
@@ -379,20 +521,36 @@ async def analyze_code(files: List[UploadFile] = File(...)):
         
         print(f"📊 전체 함수: {len(all_utilities)}개 (기존: {len(existing_utilities)}개, 새로 추가: {len(new_utilities)}개)")
         
-        return {"utilities": all_utilities}
+        return {"utilities": [util.to_dict() for util in all_utilities]}
         
     except Exception as e:
         print(f"결과 합치기 오류: {e}")
-        return {"utilities": new_utilities}
+        return {"utilities": [util.to_dict() for util in new_utilities]}
 
 @app.get("/agent/stats")
 async def get_agent_stats():
     """Agent 통계 정보 조회"""
+    agent_wrapper = services.agent_wrapper()
     if not agent_wrapper:
         return {"error": "Agent가 초기화되지 않았습니다."}
     
     return await agent_wrapper.get_agent_stats()
 
+@app.get("/services/stats")
+async def get_services_stats():
+    """공유 서비스 상태와 현재 설정 조회"""
+    return services.stats()
+
+@app.post("/services/reload")
+async def reload_services():
+    """서비스 설정 파일(service_config.json) 다시 읽기"""
+    return await asyncio.to_thread(services.reload)
+
+@app.get("/extraction_cache/stats")
+async def get_extraction_cache_stats():
+    """함수 추출 캐시 히트/미스 통계"""
+    return extraction_cache.stats()
+
 @app.get("/utilities")
 async def get_saved_utilities():
     # DynamoDB에서 저장된 유틸리티 조회
@@ -410,7 +568,11 @@ async def get_saved_utilities():
         return {"utilities": []}
 
 @app.post("/build")
-async def build_dll(config: BuildConfig):
+async def build_dll(config: BuildConfig, request: Request):
+    return await build_library(config, extraction_session(request))
+
+async def build_library(config: BuildConfig, session: str):
+    """선택한 함수로 라이브러리 빌드 (session의 호출 그래프에서 헬퍼 함수 포함)"""
     print(f"🏗️ 빌드 요청 받음: {len(config.utilities)}개 함수")
     
     # 받은 데이터 확인
@@ -422,6 +584,17 @@ async def build_dll(config: BuildConfig):
         else:
             print(f"    사용 가능한 필드들: {list(utility.keys())}")
     
+    # 선택한 함수가 호출하는 헬퍼 함수를 호출 그래프에서 찾아 자동 포함
+    # (헬퍼는 소스에만 넣고 헤더에는 노출하지 않음, 호출되지 않는 코드는 포함하지 않음)
+    graph = session_call_graph(session)
+    skipped_helpers = []
+    helper_functions = graph.dependency_closure(config.utilities, skipped_helpers)
+    if helper_functions:
+        print(f"🔗 의존 헬퍼 함수 {len(helper_functions)}개 자동 포함: {[helper['name'] for helper in helper_functions]}")
+    if skipped_helpers:
+        print(f"⚠️ 프로젝트 타입/매크로를 써서 포함하지 못한 헬퍼 함수: {skipped_helpers}")
+    build_functions = helper_functions + config.utilities
+    
     build_id = str(uuid.uuid4())
     
     # 라이브러리 타입에 따른 파일 확장자 결정
@@ -437,7 +610,7 @@ async def build_dll(config: BuildConfig):
     # 저장된 분석 결과와 매칭하여 required_headers 찾기
     stored_utilities = getattr(app.state, 'analyzed_utilities', [])
     
-    for utility in config.utilities:
+    for utility in build_functions:
         func_name = utility.get('name')
         
         # 저장된 분석 결과에서 같은 함수 찾기
@@ -476,6 +649,9 @@ async def build_dll(config: BuildConfig):
             if 'std::runtime_error' in code or 'std::exception' in code:
                 all_headers.add('<stdexcept>')
     
+    # 헬퍼 함수가 정의된 파일의 시스템 헤더
+    all_headers.update(graph.includes_for(helper_functions))
+    
     # 기본 헤더들 추가
     default_headers = ['<iostream>']
     all_headers.update(default_headers)
@@ -497,10 +673,13 @@ async def build_dll(config: BuildConfig):
 
 """
     
-    # 각 함수의 코드 추가
-    for utility in config.utilities:
+    # 각 함수의 코드 추가 (헬퍼 함수가 먼저 오도록, 네임스페이스 안의 헬퍼는 같은 네임스페이스로 감쌈)
+    for utility in build_functions:
+        code = utility.get('code', '// 코드 없음')
+        if utility.get('namespace'):
+            code = f"namespace {utility['namespace']} {{\n{code}\n}}"
         cpp_content += f"""
-{utility.get('code', '// 코드 없음')}
+{code}
 
 """
     
@@ -533,9 +712,10 @@ async def build_dll(config: BuildConfig):
                 ]
                 # 먼저 오브젝트 파일 생성
                 obj_cmd = ["g++", "-c", "-std=c++17", "-o", cpp_file.replace('.cpp', '.o'), cpp_file]
-                subprocess.run(obj_cmd, check=True, cwd=temp_dir)
+                await asyncio.to_thread(subprocess.run, obj_cmd, check=True, cwd=temp_dir)
             
-            result = subprocess.run(compile_cmd, capture_output=True, text=True, cwd=temp_dir)
+            # 컴파일러는 스레드에서 실행 (호출 그래프/분석 결과는 이벤트 루프에서만 다룸)
+            result = await asyncio.to_thread(subprocess.run, compile_cmd, capture_output=True, text=True, cwd=temp_dir)
             
             if result.returncode == 0:
                 print(f"✅ 컴파일 성공!")
@@ -563,7 +743,8 @@ async def build_dll(config: BuildConfig):
                 s3 = get_s3_client()
                 
                 # DLL 파일 업로드
-                s3.put_object(
+                await asyncio.to_thread(
+                    s3.put_object,
                     Bucket=S3_BUCKET_NAME,
                     Key=f"{build_id}.{file_extension}",
                     Body=library_content,
@@ -571,7 +752,8 @@ async def build_dll(config: BuildConfig):
                 )
                 
                 # 헤더 파일 업로드
-                s3.put_object(
+                await asyncio.to_thread(
+                    s3.put_object,
                     Bucket=S3_BUCKET_NAME,
                     Key=f"{build_id}.h",
                     Body=header_content.encode('utf-8'),
@@ -627,6 +809,9 @@ async def build_dll(config: BuildConfig):
 @app.post("/clear")
 async def clear_analysis():
     """분석 결과 초기화"""
+    # 합친 분석 결과가 전체 공용이므로 모든 세션의 증분 상태와 호출 그래프도 같이 초기화
+    extraction_spans.clear()
+    call_graphs.clear()
     if hasattr(app.state, 'analyzed_utilities'):
         count = len(app.state.analyzed_utilities)
         app.state.analyzed_utilities = []
@@ -641,7 +826,7 @@ async def get_analyzed():
     if hasattr(app.state, 'analyzed_utilities'):
         utilities = app.state.analyzed_utilities
         print(f"📋 현재 분석된 함수: {len(utilities)}개")
-        return {"utilities": utilities}
+        return {"utilities": [util.to_dict() for util in utilities]}
     else:
         return {"utilities": []}
 
@@ -906,6 +1091,7 @@ async def generate_docs_from_build(build_id: str):
             raise HTTPException(status_code=400, detail="함수 정보가 없습니다")
         
         # 문서 생성 AI 호출
+        agent_wrapper = services.agent_wrapper()
         if agent_wrapper:
             try:
                 documentation = await agent_wrapper.generate_documentation(utilities)
@@ -1099,7 +1285,11 @@ async def read_root():
 
 @app.post("/analyze_commit_changes")
 async def analyze_commit_changes(request: CommitAnalysisRequest):
-    """커밋 변경사항 분석"""
+    """커밋 변경사항 분석 (git/파일 작업이 블로킹이라 스레드에서 실행)"""
+    return await asyncio.to_thread(analyze_commit_diff, request)
+
+def analyze_commit_diff(request: CommitAnalysisRequest):
+    """부모 커밋과의 diff로 변경된 파일 분석 (공유 상태를 건드리지 않음)"""
     try:
         # 레포지터리 디렉토리 경로
         repo_name = request.repo_id.replace('/', '_')
@@ -1206,21 +1396,10 @@ async def analyze_commit_changes(request: CommitAnalysisRequest):
 def analyze_commit_file_changes(file_path, content, added_lines, deleted_lines):
     """커밋에서 변경된 파일 분석"""
     try:
-        lines = content.split('\n')
-        total_lines = len(lines)
-        
-        # 코드 라인과 주석 라인 구분
-        code_lines = 0
-        comment_lines = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            if not stripped:
-                continue
-            elif stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
-                comment_lines += 1
-            else:
-                code_lines += 1
+        # 코드 라인과 주석 라인 구분 (토큰 기반 지표)
+        metrics = compute_metrics(content, file_path)
+        code_lines = metrics.code_lines
+        comment_lines = metrics.comment_lines
         
         # 추가/삭제된 라인에서 코드와 주석 구분 (간단한 추정)
         code_lines_added = max(0, int(added_lines * 0.8))  # 80%가 코드라고 가정
@@ -1230,7 +1409,7 @@ def analyze_commit_file_changes(file_path, content, added_lines, deleted_lines):
         
         # 변경사항 기반 난이도 계산
         change_complexity = added_lines + deleted_lines
-        file_complexity = calculate_complexity(content)
+        file_complexity = calculate_complexity(content, file_path)
         
         # 난이도 점수 (1-10)
         difficulty = min(10, max(1, 
@@ -1594,34 +1773,39 @@ def force_remove_readonly(func, path, exc):
     except Exception:
         pass
 
+def clone_github_repo(request: GitRepoRequest) -> str:
+    """레포지터리를 영구 저장 디렉토리에 새로 클론하고 경로 반환 (실패하면 예외)"""
+    # 영구 저장 디렉토리 설정
+    repo_name = request.repo_id.replace('/', '_')
+    repo_dir = os.path.join(LOCAL_REPOS_DIR, repo_name)
+    
+    # 이미 존재하면 강제 삭제 후 재클론
+    if os.path.exists(repo_dir):
+        try:
+            import shutil
+            shutil.rmtree(repo_dir, onerror=force_remove_readonly)
+            print(f"🗑️ 기존 폴더 삭제: {repo_dir}")
+        except Exception as e:
+            print(f"기존 폴더 삭제 실패: {e}")
+    
+    # Git 클론
+    print(f"📥 클론 중: {request.repo_url} -> {repo_dir}")
+    import git
+    git.Repo.clone_from(request.repo_url, repo_dir)
+    print(f"✅ 클론 완료: {repo_dir}")
+    return repo_dir
+
 @app.post("/analyze_github_repo")
 async def analyze_github_repo(request: GitRepoRequest):
     """GitHub 레포지터리 클론 및 분석"""
     try:
-        # 영구 저장 디렉토리 설정
-        repo_name = request.repo_id.replace('/', '_')
-        repo_dir = os.path.join(LOCAL_REPOS_DIR, repo_name)
-        
-        # 이미 존재하면 강제 삭제 후 재클론
-        if os.path.exists(repo_dir):
-            try:
-                import shutil
-                shutil.rmtree(repo_dir, onerror=force_remove_readonly)
-                print(f"🗑️ 기존 폴더 삭제: {repo_dir}")
-            except Exception as e:
-                print(f"기존 폴더 삭제 실패: {e}")
-        
-        # Git 클론
         try:
-            print(f"📥 클론 중: {request.repo_url} -> {repo_dir}")
-            import git
-            git.Repo.clone_from(request.repo_url, repo_dir)
-            print(f"✅ 클론 완료: {repo_dir}")
+            repo_dir = clone_github_repo(request)
         except Exception as e:
             return {"error": f"레포지터리 클론 실패: {str(e)}"}
         
         # 프로젝트 분석 (항상 새로 분석)
-        result = analyze_project_directory(repo_dir)
+        result = await asyncio.to_thread(analyze_project_directory, repo_dir)
         
         # 결과에 타임스탬프 추가하여 캐시 방지
         result['analysis_timestamp'] = datetime.now().isoformat()
@@ -1653,28 +1837,33 @@ async def download_docs(build_id: str):
         print(f"문서 다운로드 오류: {e}")
         raise HTTPException(status_code=404, detail="문서 파일을 찾을 수 없습니다")
 
+async def save_uploaded_project(files: List[UploadFile]):
+    """업로드된 파일들을 영구 저장소에 저장하고 (upload_id, 디렉토리) 반환"""
+    upload_id = str(uuid.uuid4())
+    upload_dir = os.path.join(LOCAL_REPOS_DIR, f"upload_{upload_id}")
+    os.makedirs(upload_dir, exist_ok=True)
+    
+    print(f"📁 업로드 파일 저장 디렉토리: {upload_dir}")
+    
+    for file in files:
+        file_path = os.path.join(upload_dir, file.filename)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        
+        content = await file.read()
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        print(f"📄 파일 저장: {file.filename}")
+    return upload_id, upload_dir
+
 @app.post("/analyze_project")
 async def analyze_project(files: List[UploadFile] = File(...)):
     """업로드된 파일들 분석"""
     try:
         # 영구 저장소에 파일들 저장
-        upload_id = str(uuid.uuid4())
-        upload_dir = os.path.join(LOCAL_REPOS_DIR, f"upload_{upload_id}")
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        print(f"📁 업로드 파일 저장 디렉토리: {upload_dir}")
-        
-        for file in files:
-            file_path = os.path.join(upload_dir, file.filename)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            content = await file.read()
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            print(f"📄 파일 저장: {file.filename}")
+        upload_id, upload_dir = await save_uploaded_project(files)
         
         # 프로젝트 분석
-        result = analyze_project_directory(upload_dir)
+        result = await asyncio.to_thread(analyze_project_directory, upload_dir)
         
         # 결과에 upload_id 추가
         result['upload_id'] = upload_id
@@ -1683,61 +1872,37 @@ async def analyze_project(files: List[UploadFile] = File(...)):
     except Exception as e:
         return {"error": f"분석 실패: {str(e)}"}
 
-# def analyze_project_directory(project_dir):
-#     """프로젝트 디렉토리 분석"""
-#     extractor = FunctionExtractor()
-#     files_data = []
-#     total_lines = 0
-#     total_files = 0
-#     complexity_scores = []
-#     difficulty_scores = []
-    
-#     # 지원하는 파일 확장자
-#     supported_extensions = {'.py', '.js', '.ts', '.java', '.cpp', '.c', '.cs', '.php', '.rb', '.go'}
-    
-#     for root, dirs, files in os.walk(project_dir):
-#         # 불필요한 디렉토리 제외
-#         dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'build', 'dist']]
-        
-#         for file in files:
-#             file_path = os.path.join(root, file)
-#             file_ext = os.path.splitext(file)[1].lower()
-            
-#             if file_ext in supported_extensions:
-#                 try:
-#                     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-#                         content = f.read()
-                    
-#                     # 파일 분석
-#                     file_analysis = analyze_file(file_path, content, extractor)
-#                     if file_analysis:
-#                         files_data.append(file_analysis)
-#                         total_lines += file_analysis['total_lines']
-#                         total_files += 1
-#                         complexity_scores.append(file_analysis['cyclomatic_complexity'])
-#                         difficulty_scores.append(file_analysis['difficulty_score'])
-                        
-#                 except Exception as e:
-#                     print(f"파일 분석 오류 {file_path}: {e}")
-#                     continue
-    
-#     # 요약 정보 계산
-#     summary = {
-#         'total_files': total_files,
-#         'total_lines': total_lines,
-#         'avg_complexity': round(sum(complexity_scores) / len(complexity_scores), 2) if complexity_scores else 0,
-#         'max_difficulty': max(difficulty_scores) if difficulty_scores else 0,
-#         'total_estimated_hours': sum(f['estimated_dev_hours'] for f in files_data)
-#     }
-    
-#     return {
-#         'summary': summary,
-#         'files': files_data
-#     }
+@app.post("/analyze_project/stream")
+async def analyze_project_stream(files: List[UploadFile] = File(...)):
+    """업로드된 파일들 분석 (파일별 결과를 끝나는 대로 NDJSON으로 전송)"""
+    upload_id, upload_dir = await save_uploaded_project(files)
+    
+    async def events():
+        yield json.dumps({'type': 'start', 'upload_id': upload_id}) + '\n'
+        async for line in analyze_project_directory_stream(upload_dir, {'upload_id': upload_id}):
+            yield line
+    
+    return ndjson_response(events())
+
+@app.post("/analyze_github_repo/stream")
+async def analyze_github_repo_stream(request: GitRepoRequest):
+    """GitHub 레포지터리 클론 및 분석 (파일별 결과를 끝나는 대로 NDJSON으로 전송)"""
+    async def events():
+        yield json.dumps({'type': 'start', 'repo_id': request.repo_id}) + '\n'
+        try:
+            repo_dir = await asyncio.to_thread(clone_github_repo, request)
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'error': f"레포지터리 클론 실패: {str(e)}"}, ensure_ascii=False) + '\n'
+            return
+        extra = {'repo_id': request.repo_id, 'analysis_timestamp': datetime.now().isoformat()}
+        async for line in analyze_project_directory_stream(repo_dir, extra):
+            yield line
+    
+    return ndjson_response(events())
 
 def analyze_project_directory(project_dir):
     """프로젝트 디렉토리 분석 - CodeAnalyzer 사용"""
-    analyzer = CodeAnalyzer()
+    analyzer = services.code_analyzer()
     result = analyzer.analyze_project(project_dir)
     
     # CodeAnalyzer는 {'files': [...], 'summary': {...}} 형태로 반환
@@ -1745,38 +1910,69 @@ def analyze_project_directory(project_dir):
     existing_summary = result.get('summary', {})
     
     # 기존 요약 정보가 있으면 사용, 없으면 계산
-    if existing_summary:
-        summary = existing_summary
-    else:
-        total_files = len(files_data)
-        total_lines = sum(f.get('total_lines', 0) for f in files_data)
-        complexity_scores = [f.get('cyclomatic_complexity', 0) for f in files_data if f.get('cyclomatic_complexity')]
-        difficulty_scores = [f.get('difficulty_score', 0) for f in files_data if f.get('difficulty_score')]
-        
-        summary = {
-            'total_files': total_files,
-            'total_lines': total_lines,
-            'avg_complexity': round(sum(complexity_scores) / len(complexity_scores), 2) if complexity_scores else 0,
-            'max_difficulty': max(difficulty_scores) if difficulty_scores else 0,
-            'total_estimated_hours': sum(f.get('estimated_dev_hours', 0) for f in files_data)
-        }
+    summary = existing_summary or basic_project_summary(files_data)
     
     return {
         'summary': summary,
         'files': files_data
     }
 
+
+def basic_project_summary(files_data):
+    """파일별 결과만으로 계산한 기본 요약"""
+    total_files = len(files_data)
+    total_lines = sum(f.get('total_lines', 0) for f in files_data)
+    complexity_scores = [f.get('cyclomatic_complexity', 0) for f in files_data if f.get('cyclomatic_complexity')]
+    difficulty_scores = [f.get('difficulty_score', 0) for f in files_data if f.get('difficulty_score')]
+    
+    return {
+        'total_files': total_files,
+        'total_lines': total_lines,
+        'avg_complexity': round(sum(complexity_scores) / len(complexity_scores), 2) if complexity_scores else 0,
+        'max_difficulty': max(difficulty_scores) if difficulty_scores else 0,
+        'total_estimated_hours': sum(f.get('estimated_dev_hours', 0) for f in files_data)
+    }
+
+async def analyze_project_directory_stream(project_dir, extra=None):
+    """analyze_project_directory의 스트리밍 버전 (NDJSON 줄 단위로 진행 이벤트 전송)
+
+    맨 처음 대상 파일 비용 추정 {"type": "plan", ...}, 파일 하나가 끝날 때마다 {"type": "file", ...},
+    마지막에 {"type": "summary", ...}를 보낸다.
+    오래 걸리는 파일이 있어도 프록시가 연결을 끊지 않도록 주기적으로 progress 이벤트를 보낸다.
+    extra는 summary 이벤트에 함께 넣을 값 (upload_id, repo_id 등).
+    """
+    analyzer = services.code_analyzer()
+    files_data = []
+    try:
+        async for event in analyzer.analyze_project_events(project_dir, heartbeat=STREAM_HEARTBEAT_SECONDS):
+            if event['type'] == 'file':
+                files_data.append(event['file'])
+            elif event['type'] == 'summary':
+                event = dict(event, summary=event['summary'] or basic_project_summary(files_data), **(extra or {}))
+            yield json.dumps(event, ensure_ascii=False, default=str) + '\n'
+    except Exception as e:
+        yield json.dumps({'type': 'error', 'error': f"분석 실패: {str(e)}"}, ensure_ascii=False) + '\n'
+
+def ndjson_response(lines):
+    """NDJSON 스트리밍 응답 (프록시 버퍼링 비활성화)"""
+    return StreamingResponse(
+        lines,
+        media_type='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 def analyze_file(file_path, content, extractor):
     """개별 파일 분석"""
     try:
-        lines = content.split('\n')
-        total_lines = len(lines)
-        code_lines = len([line for line in lines if line.strip() and not line.strip().startswith('#') and not line.strip().startswith('//')])
-        comment_lines = total_lines - code_lines
+        # 줄 수와 복잡도를 토큰 한 번 훑어서 계산
+        metrics = compute_metrics(content, file_path)
+        total_lines = metrics.total_lines
+        code_lines = metrics.code_lines
+        comment_lines = metrics.comment_lines
         comment_ratio = f"{round((comment_lines / total_lines) * 100, 1)}%" if total_lines > 0 else "0%"
         
-        # 복잡도 계산 (간단한 휴리스틱)
-        complexity = calculate_complexity(content)
+        # 복잡도 계산 (McCabe 순환복잡도)
+        complexity = calculate_complexity(content, file_path)
         
         # 기술 스택 감지
         tech_stack = detect_tech_stack(file_path, content)
@@ -1815,7 +2011,7 @@ def analyze_file(file_path, content, extractor):
             'code_lines': code_lines,
             'code_comment_ratio': comment_ratio,
             'cyclomatic_complexity': complexity,
-            'maintainability_index': max(0, min(100, 100 - complexity)),
+            'maintainability_index': maintainability_index(metrics),
             'estimated_dev_hours': estimated_hours,
             'difficulty_score': difficulty,
             'developer_level': dev_level,
@@ -1830,19 +2026,9 @@ def analyze_file(file_path, content, extractor):
         print(f"파일 분석 오류: {e}")
         return None
 
-def calculate_complexity(content):
-    """코드 복잡도 계산"""
-    complexity = 1  # 기본 복잡도
-    
-    # 제어 구조 카운트
-    control_keywords = ['if', 'else', 'elif', 'for', 'while', 'switch', 'case', 'try', 'catch', 'except']
-    for keyword in control_keywords:
-        complexity += content.lower().count(keyword)
-    
-    # 함수/메서드 카운트
-    complexity += content.count('def ') + content.count('function ') + content.count('public ') + content.count('private ')
-    
-    return min(100, complexity)
+def calculate_complexity(content, file_path=None):
+    """코드 복잡도 계산 (McCabe 순환복잡도, 최대 100)"""
+    return min(100, compute_metrics(content, file_path).cyclomatic_complexity)
 
 def detect_tech_stack(file_path, content):
     """기술 스택 감지"""
@@ -1968,20 +2154,123 @@ async def get_history():
         print(f"히스토리 조회 오류: {e}")
         return JSONResponse({'error': str(e)}, status_code=500)
 
-from agents.doc_generator_agent import DocumentationAgent
-
-# 전역 문서 생성 에이전트
-doc_agent = None
+# ===== 백그라운드 작업 =====
+# 분석/빌드를 작업으로 등록하면 작업 ID를 바로 돌려주고, 클라이언트 연결이 끊겨도 작업은 계속 진행된다.
+# 단일 커밋 분석과 빌드는 interactive 큐, 프로젝트/레포 전체 분석은 batch 큐에서 따로 실행된다.
+
+async def analyze_project_directory_job(project_dir, extra, job):
+    """analyze_project_directory의 작업 버전 (파일이 끝날 때마다 진행 상황 기록, 취소하면 남은 분석 중단)"""
+    analyzer = services.code_analyzer()
+    files = {}
+    summary = {}
+    async for event in analyzer.analyze_project_events(project_dir):
+        if event['type'] == 'plan':
+            job.progress(done=0, total=event['estimate']['files'])
+        elif event['type'] == 'file':
+            files[event['index']] = event['file']
+            job.progress(done=event['done'], total=event['total'])
+        elif event['type'] == 'summary':
+            summary = event['summary']
+    files_data = [files[index] for index in sorted(files)]
+    return dict({'summary': summary or basic_project_summary(files_data), 'files': files_data}, **extra)
+
+async def run_analyze_project_job(payload, job):
+    return await analyze_project_directory_job(payload['upload_dir'], {'upload_id': payload['upload_id']}, job)
+
+async def run_analyze_github_repo_job(payload, job):
+    request = GitRepoRequest(**payload)
+    repo_dir = await asyncio.to_thread(clone_github_repo, request)
+    extra = {'repo_id': request.repo_id, 'analysis_timestamp': datetime.now().isoformat()}
+    return await analyze_project_directory_job(repo_dir, extra, job)
+
+def checked_job_result(result):
+    """엔드포인트가 오류를 예외 대신 응답으로 돌려준 경우 ({"error": ...}, {"success": False}) 작업 실패로 처리"""
+    if isinstance(result, dict) and (result.get('error') or result.get('success') is False):
+        raise JobFailed(str(result.get('error') or result.get('message') or '작업 실패'), result)
+    return result
+
+async def run_analyze_commit_changes_job(payload, job):
+    return checked_job_result(await analyze_commit_changes(CommitAnalysisRequest(**payload)))
+
+async def run_build_job(payload, job):
+    # 앱 이벤트 루프에서 실행 (analyzed_utilities/호출 그래프를 요청 처리와 같은 루프에서만 다룸)
+    session = payload.pop('session', '')
+    return checked_job_result(await build_library(BuildConfig(**payload), session))
+
+job_queue.register('analyze_project', run_analyze_project_job, 'batch')
+job_queue.register('analyze_github_repo', run_analyze_github_repo_job, 'batch')
+job_queue.register('analyze_commit_changes', run_analyze_commit_changes_job, 'interactive')
+job_queue.register('build', run_build_job, 'interactive')
+
+@app.post("/jobs/analyze_project")
+async def submit_analyze_project_job(files: List[UploadFile] = File(...), priority: int = Query(0, ge=JOB_PRIORITY_MIN, le=JOB_PRIORITY_MAX)):
+    """업로드된 파일 분석 작업 등록 (결과는 /jobs/{job_id}/result)"""
+    upload_id, upload_dir = await save_uploaded_project(files)
+    job_id = job_queue.submit('analyze_project', {'upload_id': upload_id, 'upload_dir': upload_dir}, priority)
+    return {'job_id': job_id, 'upload_id': upload_id}
+
+@app.post("/jobs/analyze_github_repo")
+async def submit_analyze_github_repo_job(request: GitRepoRequest, priority: int = Query(0, ge=JOB_PRIORITY_MIN, le=JOB_PRIORITY_MAX)):
+    """GitHub 레포지터리 클론 및 분석 작업 등록"""
+    return {'job_id': job_queue.submit('analyze_github_repo', request.model_dump(), priority)}
+
+@app.post("/jobs/analyze_commit_changes")
+async def submit_analyze_commit_changes_job(request: CommitAnalysisRequest, priority: int = Query(0, ge=JOB_PRIORITY_MIN, le=JOB_PRIORITY_MAX)):
+    """커밋 변경사항 분석 작업 등록"""
+    return {'job_id': job_queue.submit('analyze_commit_changes', request.model_dump(), priority)}
+
+@app.post("/jobs/build")
+async def submit_build_job(config: BuildConfig, request: Request, priority: int = Query(0, ge=JOB_PRIORITY_MIN, le=JOB_PRIORITY_MAX)):
+    """라이브러리 빌드 작업 등록 (요청한 세션의 호출 그래프로 헬퍼 함수 포함)"""
+    payload = dict(config.model_dump(), session=extraction_session(request))
+    return {'job_id': job_queue.submit('build', payload, priority)}
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50):
+    """최근 작업 목록과 큐별 작업 수"""
+    return {'jobs': job_queue.list(limit), 'stats': job_queue.stats()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태 (대기 순서, 진행 상황 포함)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """작업 결과 (아직 끝나지 않았으면 202와 현재 상태)"""
+    job = job_queue.get(job_id, with_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    if job['status'] not in FINISHED_STATES:
+        return JSONResponse(job, status_code=202)
+    return job
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """대기 중이거나 실행 중인 작업 취소"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return job
 
 @app.on_event("startup")
 async def startup_event():
-    global doc_agent
+    # 백그라운드 작업 워커 시작 (이전 실행에서 남은 작업도 이어서 실행)
+    await job_queue.start()
+    # 문서 생성 에이전트를 미리 만들어 첫 요청 지연 제거
     try:
-        doc_agent = DocumentationAgent()
-        print("✅ 문서 생성 AI 초기화 완료")
+        if services.doc_agent():
+            print("✅ 문서 생성 AI 초기화 완료")
     except Exception as e:
         print(f"❌ 문서 생성 AI 초기화 실패: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_queue.stop()
+
 @app.get("/docs/{build_id}")
 async def download_docs(build_id: str):
     """AI 기반 문서 생성 및 다운로드"""
@@ -2020,6 +2309,7 @@ async def download_docs(build_id: str):
             build_data = response['Item']
             
             # AI를 사용하여 문서 생성
+            doc_agent = services.doc_agent()
             if doc_agent:
                 print(f"AI로 문서 생성 중... (빌드 ID: {build_id})")
                 doc_content = await doc_agent.generate_documentation(build_data)
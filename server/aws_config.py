@@ -1,5 +1,6 @@
 import boto3
 import os
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # AWS 설정
@@ -7,6 +8,8 @@ AWS_REGION = 'us-east-1'
 S3_BUCKET_NAME = 'utility-dll-storage'
 DYNAMODB_TABLE_NAME = 'utility-builds'
 BEDROCK_MODEL_ID = 'anthropic.claude-3-5-sonnet-20240620-v1:0'
+# Bedrock 호출 한도 (계정 Service Quotas의 분당 InvokeModel 요청 수에 맞춰 설정)
+BEDROCK_REQUESTS_PER_MINUTE = 200
 
 # AWS 클라이언트 초기화
 def get_s3_client():
@@ -15,8 +18,9 @@ def get_s3_client():
 def get_dynamodb_client():
     return boto3.resource('dynamodb', region_name=AWS_REGION)
 
-def get_bedrock_client():
-    return boto3.client('bedrock-runtime', region_name=AWS_REGION)
+def get_bedrock_client(region_name=None, max_pool_connections=None):
+    config = Config(max_pool_connections=max_pool_connections) if max_pool_connections else None
+    return boto3.client('bedrock-runtime', region_name=region_name or AWS_REGION, config=config)
 
 # S3 버킷 생성 (없으면)
 def create_s3_bucket():
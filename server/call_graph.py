@@ -0,0 +1,273 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# 주석/문자열/문자 리터럴은 건너뛰고, 멤버 호출(obj.f(), ptr->f())이 아닌 함수 호출만 찾는다
+_CALL_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?(?:\*/|\Z)'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r'|(?<![\w.>:])(?P<qualifier>(?:::\s*)?(?:(?!(?:return|case|throw|else|do|new|delete)\b)\w+\s*::\s*)*)'
+    r'(?P<name>[A-Za-z_]\w*)\s*\(',
+    re.DOTALL
+)
+
+# 네임스페이스 블록 추적용 (주석/문자열 안의 중괄호는 무시)
+_SCOPE_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?(?:\*/|\Z)'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r'|\bnamespace\s+(?P<namespace>\w+(?:\s*::\s*\w+)*)?\s*\{'
+    r'|(?P<open>\{)|(?P<close>\})',
+    re.DOTALL
+)
+
+
+def find_calls(code: str) -> Set[str]:
+    """코드에서 호출하는 함수 이름 집합
+
+    한정자가 붙은 호출(std::max(), util::f())은 'std::max'처럼 한정자를 포함해 돌려주고,
+    전역 한정자(::f())만 붙은 호출은 이름만 돌려준다.
+    """
+    calls = set()
+    for m in _CALL_RE.finditer(code):
+        if not m.group('name'):
+            continue
+        qualifier = re.sub(r'\s+', '', m.group('qualifier')).strip(':')
+        calls.add(f"{qualifier}::{m.group('name')}" if qualifier else m.group('name'))
+    return calls
+
+
+def namespace_lines(source: str) -> List[Tuple[int, str]]:
+    """소스의 줄 번호별 네임스페이스 변화 [(시작 줄, 'a::b')] (줄 번호 순, 전역은 '')"""
+    changes = [(1, '')]
+    # 열린 중괄호마다 네임스페이스 이름 (일반 블록은 None, 익명 네임스페이스는 '')
+    stack: List[Optional[str]] = []
+    for m in _SCOPE_RE.finditer(source):
+        if m.group('close'):
+            if not stack or stack.pop() is None:
+                continue
+        elif m.group('open'):
+            stack.append(None)
+            continue
+        elif m.group(0).startswith('namespace'):
+            stack.append(re.sub(r'\s+', '', m.group('namespace') or ''))
+        else:
+            continue
+        current = '::'.join(name for name in stack if name)
+        line = source.count('\n', 0, m.end()) + 1
+        if changes[-1][0] == line:
+            changes[-1] = (line, current)
+        else:
+            changes.append((line, current))
+    return changes
+
+
+# 파일에서 선언한 타입/매크로와 시스템 헤더 (주석/문자열은 건너뜀)
+_DECLARATION_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?(?:\*/|\Z)'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r'|^[ \t]*#[ \t]*include[ \t]*(?P<include><[^>\n]+>)'
+    r'|^[ \t]*#[ \t]*define[ \t]+(?P<macro>\w+)'
+    r'|\b(?:struct|class|union|enum(?:\s+class|\s+struct)?)\s+(?P<type>[A-Za-z_]\w*)\s*(?=[:{;]|final\b)'
+    r'|\btypedef\b[^;{}]*?\b(?P<typedef>[A-Za-z_]\w*)\s*;'
+    r'|\busing\s+(?P<alias>[A-Za-z_]\w*)\s*=',
+    re.DOTALL | re.MULTILINE
+)
+_IDENTIFIER_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?(?:\*/|\Z)'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r'|(?P<name>\b[A-Za-z_]\w*)',
+    re.DOTALL
+)
+# 빌드 소스가 직접 정의하므로 프로젝트 선언이 있어도 문제없는 이름
+_BUILD_DEFINED = frozenset(('LIBRARY_API',))
+
+
+def file_context(source: str) -> Dict[str, Set[str]]:
+    """파일의 시스템 헤더(#include <...>)와 선언한 타입/매크로 이름"""
+    includes, declared = set(), set()
+    for m in _DECLARATION_RE.finditer(source):
+        if m.group('include'):
+            includes.add(re.sub(r'\s+', '', m.group('include')))
+        else:
+            name = m.group('macro') or m.group('type') or m.group('typedef') or m.group('alias')
+            if name:
+                declared.add(name)
+    return {'includes': includes, 'declared': declared - _BUILD_DEFINED}
+
+
+def _identifiers(code: str) -> Set[str]:
+    return {m.group('name') for m in _IDENTIFIER_RE.finditer(code) if m.group('name')}
+
+
+def _namespace_at(changes: List[Tuple[int, str]], line: int) -> str:
+    return changes[bisect_right(changes, (line, '\uffff')) - 1][1]
+
+
+class CallGraph:
+    """업로드된 전체 C/C++ 파일의 함수 호출 그래프
+
+    파일별로 함수 정의와 호출 목록을 보관하고, /build에서 선택한 함수가
+    필요로 하는 헬퍼 함수들의 최소 전이 폐포를 계산한다.
+    빌드 소스에는 함수 코드만 들어가므로, 업로드된 파일에서 선언한 타입/매크로를 쓰는
+    헬퍼(와 그 헬퍼를 호출하는 헬퍼)는 컴파일할 수 없어 폐포에서 뺀다.
+    """
+
+    def __init__(self):
+        # {파일명: {함수명: [함수 정보, ...]}} (오버로드는 같은 이름에 여러 개)
+        self.files: Dict[str, Dict[str, List[Dict]]] = {}
+        # {함수명: [정의된 파일명, ...]} (업로드 순서 유지)
+        self.definitions: Dict[str, List[str]] = {}
+        # {파일명: {'includes': 시스템 헤더, 'declared': 선언한 타입/매크로}} (source를 준 파일만)
+        self.contexts: Dict[str, Dict[str, Set[str]]] = {}
+
+    def update_file(self, filename: str, functions: List[Dict], removed: Optional[Set[str]] = None,
+                    source: Optional[str] = None):
+        """파일의 함수 정보 갱신
+
+        removed가 None이면 파일 전체를 functions로 교체하고,
+        아니면 removed 함수를 지운 뒤 functions를 추가/교체한다 (증분 재추출).
+        source(파일 전체 내용)를 주면 각 함수가 정의된 네임스페이스를 기록해
+        한정자가 붙은 호출(util::f())을 같은 네임스페이스의 정의에만 연결하고,
+        파일의 시스템 헤더와 선언한 타입/매크로도 기록한다.
+        """
+        scopes = namespace_lines(source) if source is not None else None
+        if source is not None:
+            self.contexts[filename] = file_context(source)
+        if removed is None:
+            entries = {}
+        else:
+            entries = {name: funcs for name, funcs in self.files.get(filename, {}).items()
+                       if name not in removed}
+
+        added: Dict[str, List[Dict]] = {}
+        for func in functions:
+            if func.get('language', 'cpp') != 'cpp' or not func.get('name'):
+                continue
+            added.setdefault(func['name'], []).append({
+                'name': func['name'],
+                'code': func.get('code', ''),
+                'file': filename,
+                'namespace': _namespace_at(scopes, func.get('line') or 1) if scopes else '',
+                'calls': find_calls(func.get('code', '')),
+                'identifiers': _identifiers(func.get('code', ''))
+            })
+        entries.update(added)
+
+        context = self.contexts.get(filename)
+        self.remove_file(filename)
+        if context is not None:
+            self.contexts[filename] = context
+        if entries:
+            self.files[filename] = entries
+            for name in entries:
+                self.definitions.setdefault(name, []).append(filename)
+
+    def remove_file(self, filename: str):
+        """파일의 함수 정보 삭제"""
+        self.contexts.pop(filename, None)
+        for name in self.files.pop(filename, {}):
+            files = self.definitions.get(name, [])
+            if filename in files:
+                files.remove(filename)
+            if not files:
+                self.definitions.pop(name, None)
+
+    def clear(self):
+        self.files = {}
+        self.definitions = {}
+        self.contexts = {}
+
+    def includes_for(self, helpers: List[Dict]) -> Set[str]:
+        """헬퍼가 정의된 파일들의 시스템 헤더 (빌드 소스에 같이 포함)"""
+        includes = set()
+        for helper in helpers:
+            includes.update(self.contexts.get(helper['file'], {}).get('includes', ()))
+        return includes
+
+    def _resolve(self, call: str, caller_file: Optional[str]) -> List[Dict]:
+        """호출 이름에 해당하는 정의 (호출한 파일의 정의 우선, 없으면 처음 업로드된 파일)
+
+        한정자가 붙은 호출은 네임스페이스가 한정자로 끝나는 정의에만 연결한다
+        (std::max()가 사용자 함수 max로 연결되지 않도록).
+        """
+        qualifier, _, name = call.rpartition('::')
+        files = self.definitions.get(name)
+        if not files or name == 'main':
+            return []
+        if qualifier:
+            files = [filename for filename in files
+                     if any(self._in_namespace(func, qualifier) for func in self.files[filename][name])]
+            if not files:
+                return []
+        filename = caller_file if caller_file in files else files[0]
+        funcs = self.files[filename][name]
+        return [func for func in funcs if self._in_namespace(func, qualifier)] if qualifier else funcs
+
+    @staticmethod
+    def _in_namespace(func: Dict, qualifier: str) -> bool:
+        namespace = func.get('namespace', '')
+        return namespace == qualifier or namespace.endswith('::' + qualifier)
+
+    def dependency_closure(self, selected: List[Dict], skipped: Optional[List[str]] = None) -> List[Dict]:
+        """선택한 함수들이 (전이적으로) 호출하는 헬퍼 함수 목록
+
+        selected는 빌드에 포함할 함수 정보({'name', 'code', 'source_file'})이며,
+        선택한 함수와 같은 이름의 헬퍼는 포함하지 않는다.
+        결과는 호출되는 함수가 먼저 오도록 정렬되어 그대로 소스에 이어 붙일 수 있다
+        (namespace가 있는 헬퍼는 같은 네임스페이스로 감싸야 한다).
+        업로드된 파일에서 선언한 타입/매크로를 쓰는 헬퍼는 빼고, skipped에 이름을 추가한다.
+        """
+        selected_names = {utility.get('name') for utility in selected}
+        ordered: List[Dict] = []
+        visited: Set[int] = set()
+
+        def visit(calls: Set[str], caller_file: Optional[str]):
+            # 헬퍼 체인이 길어도 재귀 한도에 걸리지 않도록 명시적 스택으로 후위 순회
+            stack = [(None, iter(sorted(calls)), caller_file)]
+            while stack:
+                entry, pending, current_file = stack[-1]
+                for name in pending:
+                    if name.rpartition('::')[2] in selected_names:
+                        continue
+                    targets = [t for t in self._resolve(name, current_file) if id(t) not in visited]
+                    for target in targets:
+                        visited.add(id(target))
+                    if targets:
+                        for target in targets[1:]:
+                            stack.append((target, iter(sorted(target['calls'])), target['file']))
+                        stack.append((targets[0], iter(sorted(targets[0]['calls'])), targets[0]['file']))
+                        break
+                else:
+                    stack.pop()
+                    if entry is not None:
+                        ordered.append(entry)
+
+        for utility in selected:
+            visit(find_calls(utility.get('code', '')), utility.get('source_file'))
+
+        # 호출되는 헬퍼가 먼저 오므로 빠진 헬퍼를 호출하는 헬퍼도 순서대로 뺄 수 있음
+        declared = set().union(*(context['declared'] for context in self.contexts.values()))
+        unresolved: Set[str] = set()
+        closure = []
+        for helper in ordered:
+            if (helper['identifiers'] - {helper['name']}) & declared or \
+                    {call.rpartition('::')[2] for call in helper['calls']} & unresolved:
+                unresolved.add(helper['name'])
+                if skipped is not None:
+                    skipped.append(helper['name'])
+                continue
+            closure.append(helper)
+        return closure
+
+    def stats(self) -> Dict:
+        functions = sum(len(funcs) for entries in self.files.values() for funcs in entries.values())
+        return {'files': len(self.files), 'functions': functions}
@@ -1,83 +1,292 @@
 import os
 import re
+import math
 import json
-import time
-import hashlib
-import pickle
 import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional
 from aws_config import get_bedrock_client
+from disk_cache import DiskCache
+from project_fingerprint import fingerprint_project
+from scan_planner import ScanPlan, ScanRules, plan_scan
+from code_metrics import compute_metrics, maintainability_index
+from function_extractor import FunctionExtractor, language_for_path
+from rate_limiter import bedrock_rate_limiter, call_with_retry, call_with_retry_async
+from sampling import stratify, stratified_sample, stratified_total
+
+# 코드 분석용 모델
+ANALYSIS_MODEL_ID = 'anthropic.claude-3-haiku-20240307-v1:0'
+# 분석 프롬프트/결과 형식을 바꾸면 올려서 이전 캐시를 무효화
+ANALYSIS_PROMPT_VERSION = '3'
+# 동시에 진행하는 파일 분석 요청 수 (분당 요청 수는 aws_config.BEDROCK_REQUESTS_PER_MINUTE로 제한)
+ANALYSIS_MAX_CONCURRENCY = 8
+
+# 작은 파일 묶음 분석: 이 크기 이하 파일은 여러 개를 한 요청에 담는다
+ANALYSIS_PACK_MAX_FILE_CHARS = 2000
+# 묶음 하나의 입력 토큰 예산과 최대 파일 수 (응답 max_tokens 한도도 함께 고려)
+ANALYSIS_PACK_TOKEN_BUDGET = 6000
+ANALYSIS_PACK_MAX_FILES = 10
+# 파일 하나 분석 결과에 필요한 응답 토큰 (묶음 요청의 max_tokens 계산용)
+ANALYSIS_RESPONSE_TOKENS_PER_FILE = 300
+
+# 큰 파일 조각 분석: 이보다 큰 파일은 함수 단위 조각으로 나눠 분석 (단일 프롬프트는 앞 2000자만 봄)
+ANALYSIS_CHUNK_MIN_FILE_CHARS = 2000
+# 조각 하나의 최대 크기 (묶음 요청에 그대로 들어가는 크기)
+ANALYSIS_CHUNK_CHARS = ANALYSIS_PACK_MAX_FILE_CHARS
+# 파일 하나에서 AI로 보내는 조각의 입력 토큰 한도 (넘는 조각은 로컬 지표로 평가)
+ANALYSIS_FILE_TOKEN_BUDGET = 20000
+
+# 표본 분석: 시간 예산 안에 끝나지 않는 큰 프로젝트는 층화 표본만 AI로 분석하고 나머지는 로컬 지표로 평가
+# 요청 하나의 평균 응답 시간 가정 (시간 예산을 요청 수로 환산할 때 사용)
+ANALYSIS_SECONDS_PER_REQUEST = 5.0
+# 표본 최소 크기와 신뢰구간 수준
+ANALYSIS_SAMPLE_MIN_FILES = 30
+ANALYSIS_SAMPLE_CONFIDENCE = 0.95
+# 층을 나누는 파일 크기 구간 경계 (글자 수)
+ANALYSIS_SAMPLE_SIZE_BOUNDS = (ANALYSIS_PACK_MAX_FILE_CHARS, 4 * ANALYSIS_PACK_MAX_FILE_CHARS)
+
+# 파일 분석 항목 (단일/묶음 프롬프트 공통)
+ANALYSIS_ITEMS = """다음 항목들을 1-10 점수로 평가해주세요:
+- cyclomatic_complexity: 순환복잡도 (1-50)
+- maintainability_index: 유지보수성 지수 (1-100)
+- estimated_dev_hours: 예상 개발 시간 (시간 단위)
+- difficulty_score: 난이도 점수 (1-10)
+- developer_level: 필요 개발자 수준 (Entry/Junior/Mid/Senior/Architect)
+- pattern_score: 패턴 사용 점수 (1-10)
+- optimization_score: 최적화 점수 (1-10)
+- best_practices_score: 모범사례 준수도 (1-10)
+- tech_stack_identification: 사용된 기술 스택 (프레임워크, 라이브러리 등을 간단히 나열)"""
+# 결과 행을 만들 때 반드시 있어야 하는 항목
+_REQUIRED_ANALYSIS_KEYS = ('cyclomatic_complexity', 'maintainability_index', 'estimated_dev_hours',
+                           'difficulty_score', 'developer_level', 'pattern_score',
+                           'optimization_score', 'best_practices_score')
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (코드는 평균 4자 정도가 토큰 하나)"""
+    return len(text) // 4 + 1
+
+
+def _line_windows(lines: List[str], max_chars: int) -> List[str]:
+    """줄 목록을 max_chars 이하 조각으로 이어 붙이기 (한 줄이 더 길면 잘라서 넣음)"""
+    windows, current, size = [], [], 0
+    for line in lines:
+        line = line[:max_chars]
+        if current and size + len(line) + 1 > max_chars:
+            windows.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current and any(line.strip() for line in current):
+        windows.append('\n'.join(current))
+    return windows
+
+
+def _number(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+_DEVELOPER_LEVELS = ["Entry", "Junior", "Mid", "Senior", "Architect"]
+
+
+def _run_coroutine(coroutine):
+    """동기 코드에서 코루틴 실행 (이미 이벤트 루프가 도는 스레드면 별도 스레드의 새 루프에서)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
+
+
+def _reduce_chunk_analyses(analyses: List[Dict], weights: List[int]) -> Dict:
+    """코드 조각별 분석 결과를 파일 하나의 결과로 합치기
+
+    순환복잡도와 개발 시간은 합, 난이도와 개발자 수준은 가장 높은 값,
+    나머지 점수는 조각 크기로 가중 평균한다.
+    """
+    total_weight = sum(weights) or 1
+
+    def weighted(key):
+        return sum(_number(a.get(key)) * w for a, w in zip(analyses, weights)) / total_weight
+
+    levels = [a.get('developer_level') for a in analyses if a.get('developer_level') in _DEVELOPER_LEVELS]
+    tech = []
+    for analysis in analyses:
+        for name in str(analysis.get('tech_stack_identification') or '').split(','):
+            name = name.strip()
+            if name and name not in tech and name != 'AI 분석 불가':
+                tech.append(name)
+
+    return {
+        'cyclomatic_complexity': min(50, int(sum(_number(a.get('cyclomatic_complexity'), 1) for a in analyses))),
+        'maintainability_index': round(weighted('maintainability_index')),
+        'estimated_dev_hours': round(sum(_number(a.get('estimated_dev_hours')) for a in analyses), 1),
+        'difficulty_score': int(max(_number(a.get('difficulty_score'), 1) for a in analyses)),
+        'developer_level': max(levels, key=_DEVELOPER_LEVELS.index) if levels else 'Mid',
+        'pattern_score': round(weighted('pattern_score')),
+        'optimization_score': round(weighted('optimization_score')),
+        'best_practices_score': round(weighted('best_practices_score')),
+        'tech_stack_identification': ', '.join(tech[:8]) if tech else 'AI 분석 불가',
+    }
+
+# 분석 결과 캐시 (SQLite WAL, 용량 제한 + LRU 제거, 최근 항목은 메모리 L1)
+ANALYSIS_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_storage", "code_analysis_cache.db")
+ANALYSIS_CACHE_MAX_BYTES = 128 * 1024 * 1024
+ANALYSIS_CACHE_MEMORY_ITEMS = 256
 
 class CodeAnalyzer:
-    # 클래스 레벨 캐시 (서버가 켜져 있는 동안 유지)
-    _cache = {}
-    _cache_file = "code_analysis_cache.pkl"
+    # 클래스 레벨 캐시 (요청마다 CodeAnalyzer를 만들어도 한 번만 열고 공유)
+    _cache = None
+    _cache_lock = threading.Lock()
     
-    def __init__(self):
+    def __init__(self, bedrock_client=None):
+        # bedrock_client: 공유 클라이언트 (services.Services가 전달, 없으면 새로 생성)
         self.supported_extensions = {'.py', '.js', '.java', '.cpp', '.c', '.cs', '.php', '.rb', '.go', '.ts'}
         self.language_map = {'.py': 'Python', '.js': 'JavaScript', '.cpp': 'C++', '.java': 'Java', '.c': 'C', '.cs': 'C#', '.php': 'PHP', '.rb': 'Ruby', '.go': 'Go', '.ts': 'TypeScript'}
-        try:
-            self.bedrock_client = get_bedrock_client()
+        if bedrock_client is not None:
+            self.bedrock_client = bedrock_client
             self.use_ai = True
-        except:
-            self.bedrock_client = None
-            self.use_ai = False
+        else:
+            try:
+                self.bedrock_client = get_bedrock_client()
+                self.use_ai = True
+            except:
+                self.bedrock_client = None
+                self.use_ai = False
+        self.max_concurrency = ANALYSIS_MAX_CONCURRENCY
+        # 큰 파일을 함수 단위로 나눌 때 사용
+        self.extractor = FunctionExtractor()
+        # 분석 대상 파일 선택 규칙 (제외 패턴, 파일 크기 상한)
+        self.scan_rules = ScanRules()
+        # 프로젝트 분석 시간 예산(초), 넘을 것 같으면 표본 분석 (None이면 항상 전체 분석)
+        self.time_budget = None
         
-        # 캐시 파일에서 로드
-        self._load_cache()
+        self.cache = self._get_cache()
 
-    def _load_cache(self):
-        """캐시 파일에서 캐시 로드"""
-        try:
-            if os.path.exists(self._cache_file):
-                with open(self._cache_file, 'rb') as f:
-                    self._cache = pickle.load(f)
-                print(f"📋 캐시 파일에서 {len(self._cache)}개 항목 로드")
-        except Exception as e:
-            print(f"캐시 로드 오류: {e}")
-            self._cache = {}
-    
-    def _save_cache(self):
-        """캐시를 파일에 저장"""
-        try:
-            with open(self._cache_file, 'wb') as f:
-                pickle.dump(self._cache, f)
-        except Exception as e:
-            print(f"캐시 저장 오류: {e}")
+    @classmethod
+    def _get_cache(cls) -> DiskCache:
+        """프로세스 전체에서 공유하는 분석 결과 캐시 (첫 사용 시 열기)"""
+        with cls._cache_lock:
+            if cls._cache is None:
+                cls._cache = DiskCache(ANALYSIS_CACHE_FILE, ANALYSIS_CACHE_MAX_BYTES, ANALYSIS_CACHE_MEMORY_ITEMS)
+            return cls._cache
     
-    def _get_cache_key(self, project_path):
+    def _model_tag(self):
+        """모델/프롬프트가 바뀌거나 AI 없이 분석한 결과는 다른 키로 저장"""
+        model = ANALYSIS_MODEL_ID if self.use_ai else 'fallback'
+        return f"{model}:{ANALYSIS_PROMPT_VERSION}"
+
+    def _get_cache_key(self, project_path, entries=None):
         """프로젝트 파일 구조와 내용을 기반으로 캐시 키 생성"""
-        file_info = []
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                if Path(file).suffix in self.supported_extensions:
-                    file_path = os.path.join(root, file)
-                    # 상대 경로 사용 (임시 디렉토리 경로 제거)
-                    rel_path = os.path.relpath(file_path, project_path)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
-                        file_info.append(f"{rel_path}:{content_hash}")
-                    except:
-                        continue
-        file_info.sort()
+        if entries is None:
+            entries = fingerprint_project(project_path, self.supported_extensions,
+                                          plan=self.plan_project(project_path))
         # 프로젝트 경로 대신 파일 구조만 사용
-        cache_data = '|'.join(file_info)
-        return hashlib.md5(cache_data.encode()).hexdigest()
+        cache_data = '|'.join(f"{entry.rel_path}:{entry.digest}" for entry in entries)
+        return f"project:{self._model_tag()}:{hashlib.md5(cache_data.encode()).hexdigest()}"
+
+    def plan_project(self, project_path: str) -> ScanPlan:
+        """분석 대상 파일 고르기 (제외 규칙과 크기 상한 적용, 파일 내용은 읽지 않음)"""
+        return plan_scan(project_path, self.supported_extensions, self.scan_rules)
+
+    def estimate_cost(self, plan: ScanPlan) -> Dict:
+        """파일 크기만으로 계산한 분석 비용 추정 (캐시를 하나도 못 쓰는 경우 기준의 대략적인 상한)
+
+        작은 파일(small)은 묶음 요청, 큰 파일(large)은 함수 조각 묶음 요청으로 계산한다.
+        바이트 수를 글자 수로 보고 토큰은 estimate_tokens와 같은 비율로 센다.
+        """
+        tiers = plan.size_tiers((('small', ANALYSIS_PACK_MAX_FILE_CHARS), ('large', None)))
+        small = tiers['small']
+        input_tokens = small['bytes'] // 4 + small['files']
+        requests = 0
+        if small['files']:
+            requests += max(math.ceil(input_tokens / ANALYSIS_PACK_TOKEN_BUDGET),
+                            math.ceil(small['files'] / ANALYSIS_PACK_MAX_FILES))
+        for _, _, stat in plan.files:
+            if stat.st_size > ANALYSIS_PACK_MAX_FILE_CHARS:
+                tokens = min(ANALYSIS_FILE_TOKEN_BUDGET, stat.st_size // 4 + 1)
+                chunks = math.ceil(tokens / (ANALYSIS_CHUNK_CHARS // 4))
+                input_tokens += tokens
+                requests += math.ceil(chunks / ANALYSIS_PACK_MAX_FILES)
+        if plan.files:
+            # 프로젝트 종합 평가
+            requests += 1
+        if not self.use_ai:
+            input_tokens = requests = 0
+        return {
+            'files': len(plan.files),
+            'bytes': plan.total_bytes,
+            'tiers': tiers,
+            'input_tokens': input_tokens,
+            'requests': requests,
+            'skipped': dict(plan.skipped),
+            'ignored_dirs': plan.ignored_dirs,
+        }
+
+    def _choose_sample(self, plan: ScanPlan, entries, time_budget: float):
+        """시간 예산 안에 끝나지 않으면 AI로 분석할 층화 표본 고르기
+
+        entries: 캐시에 없는 파일들. 예산 안에 모두 분석할 수 있으면 None,
+        아니면 {층 키: 표본 FileEntry 목록}과 {층 키: 층 전체 FileEntry 목록}을 돌려준다.
+        층은 언어(확장자), 최상위 디렉토리, 크기 구간으로 나누고 층이 표본보다 많으면 거칠게 합친다.
+        """
+        paths = {entry.rel_path for entry in entries}
+        estimate = self.estimate_cost(ScanPlan([f for f in plan.files if f[0] in paths], {}, 0))
+        throughput = min(bedrock_rate_limiter.rate, self.max_concurrency / ANALYSIS_SECONDS_PER_REQUEST)
+        # 종합 평가 요청 하나는 남겨 둠
+        allowed = max(0, int(time_budget * throughput) - 1)
+        if estimate['requests'] <= allowed + 1:
+            return None
+        n = max(ANALYSIS_SAMPLE_MIN_FILES, int(len(entries) * allowed / estimate['requests']))
+        if n >= len(entries):
+            return None
+
+        def size_tier(entry):
+            return sum(entry.size > bound for bound in ANALYSIS_SAMPLE_SIZE_BOUNDS)
+
+        def top_dir(entry):
+            parts = entry.rel_path.split(os.sep)
+            return parts[0] if len(parts) > 1 else ''
+
+        key_levels = (
+            lambda e: (Path(e.rel_path).suffix, top_dir(e), size_tier(e)),
+            lambda e: (Path(e.rel_path).suffix, size_tier(e)),
+            lambda e: (Path(e.rel_path).suffix,),
+            lambda e: (),
+        )
+        strata = stratify(entries, key_levels, n)
+        # 내용 해시 순으로 고르면 무작위 추출과 같고 다시 실행해도 같은 표본 (캐시 재사용)
+        sample = stratified_sample(strata, n, order=lambda e: e.digest)
+        return sample, strata
+
+    def _get_file_cache_key(self, file_path, content_hash):
+        """파일 하나의 분석 결과 캐시 키 (내용 해시 기준, 확장자에 따라 언어가 달라서 함께 넣음)"""
+        return f"file:{self._model_tag()}:{Path(file_path).suffix}:{content_hash}"
     
     def _get_cached_result(self, cache_key):
         """캐시에서 결과 조회"""
-        return self._cache.get(cache_key)
+        return self.cache.get(cache_key)
     
     def _set_cached_result(self, cache_key, result):
-        """캐시에 결과 저장"""
-        self._cache[cache_key] = result
-        self._save_cache()  # 즉시 파일에 저장
+        """캐시에 결과 저장 (항목 하나만 기록)"""
+        try:
+            self.cache.set(cache_key, result)
+        except Exception as e:
+            print(f"캐시 저장 오류: {e}")
     
 
-    def _analyze_summary(self, results):
-        """파일 분석 결과를 종합하여 최종 분석 수행"""
+    def _analyze_summary(self, results, totals=None):
+        """파일 분석 결과를 종합하여 최종 분석 수행
+
+        totals: 표본 분석에서 추정한 total_estimated_hours/avg_complexity (results는 AI 분석한 파일만)
+        """
         if not self.use_ai or not results:
             return {"result": "분석 불가", "desc": "AI 분석을 사용할 수 없습니다."}
         
@@ -85,6 +294,9 @@ class CodeAnalyzer:
         avg_difficulty = sum(r['difficulty_score'] for r in results) / len(results)
         total_hours = sum(r['estimated_dev_hours'] for r in results)
         avg_complexity = sum(r['cyclomatic_complexity'] for r in results) / len(results)
+        if totals:
+            total_hours = totals['total_estimated_hours']
+            avg_complexity = totals['avg_complexity']
         developer_levels = [str(r['developer_level']) for r in results]
         tech_stacks = [str(r.get('tech_stack_identification', '')) for r in results if r.get('tech_stack_identification')]
         
@@ -107,17 +319,7 @@ JSON 형태로 응답:
 {{"result": "선택된 결과", "desc": "분석 근거 설명"}}"""
 
         try:
-            response = self.bedrock_client.invoke_model(
-                modelId="anthropic.claude-3-haiku-20240307-v1:0",
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1000,
-                    "messages": [{"role": "user", "content": prompt}]
-                })
-            )
-            
-            result = json.loads(response['body'].read())
-            ai_response = result['content'][0]['text']
+            ai_response = self._invoke_model(prompt)
             
             # JSON 추출 및 제어 문자 제거
             json_start = ai_response.find('{')
@@ -133,12 +335,29 @@ JSON 형태로 응답:
         except Exception as e:
             return {"result": "분석 오류", "desc": f"오류: {str(e)}"}
 
-    def _analyze_with_ai(self, content: str, file_path: str):
-        """AI를 사용한 코드 분석"""
-        if not self.use_ai:
-            return self._fallback_analysis(content)
-        
-        prompt = f"""다음 코드를 분석하여 JSON 형태로 결과를 반환해주세요:
+    def _invoke_model(self, prompt: str, max_tokens: int = 1000) -> str:
+        """분석 모델 호출 (분당 요청 한도 안에서, 쓰로틀링 시 재시도) 후 응답 텍스트 반환"""
+        return call_with_retry(lambda: self._invoke_model_once(prompt, max_tokens))
+
+    async def _invoke_model_async(self, prompt: str, max_tokens: int = 1000) -> str:
+        """_invoke_model의 비동기 버전"""
+        return await call_with_retry_async(lambda: self._invoke_model_once(prompt, max_tokens))
+
+    def _invoke_model_once(self, prompt: str, max_tokens: int) -> str:
+        response = self.bedrock_client.invoke_model(
+            #modelId='anthropic.claude-3-5-sonnet-20240620-v1:0',
+            modelId=ANALYSIS_MODEL_ID,
+            body=json.dumps({
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": max_tokens,
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        )
+        result = json.loads(response['body'].read())
+        return result['content'][0]['text']
+
+    def _file_prompt(self, content: str, file_path: str) -> str:
+        return f"""다음 코드를 분석하여 JSON 형태로 결과를 반환해주세요:
 
 파일: {file_path}
 코드:
@@ -146,79 +365,252 @@ JSON 형태로 응답:
 {content[:2000]}  # 처음 2000자만 분석
 ```
 
-다음 항목들을 1-10 점수로 평가해주세요:
-- cyclomatic_complexity: 순환복잡도 (1-50)
-- maintainability_index: 유지보수성 지수 (1-100)
-- estimated_dev_hours: 예상 개발 시간 (시간 단위)
-- difficulty_score: 난이도 점수 (1-10)
-- developer_level: 필요 개발자 수준 (Entry/Junior/Mid/Senior/Architect)
-- pattern_score: 패턴 사용 점수 (1-10)
-- optimization_score: 최적화 점수 (1-10)
-- best_practices_score: 모범사례 준수도 (1-10)
-- tech_stack_identification: 사용된 기술 스택 (프레임워크, 라이브러리 등을 간단히 나열)
+{ANALYSIS_ITEMS}
 
 JSON 형태로만 응답해주세요:"""
 
+    def _parse_file_response(self, ai_response: str, file_path: str):
+        """AI 응답에서 JSON 추출 (실패하면 None)"""
+        json_start = ai_response.find('{')
+        json_end = ai_response.rfind('}') + 1
+        if json_start != -1 and json_end != -1:
+            ai_analysis = json.loads(ai_response[json_start:json_end])
+            print(f"AI 분석 성공: {file_path}")
+            return ai_analysis
+        return None
+
+    def _pack_prompt(self, items, unit: str = '파일') -> str:
+        """작은 파일(또는 코드 조각) 여러 개를 한 번에 분석하는 프롬프트 (items: [(file_path, content)], 키는 f0, f1, ...)"""
+        sections = []
+        for i, (file_path, content) in enumerate(items):
+            sections.append(f"""### f{i}
+파일: {file_path}
+코드:
+```
+{content}
+```""")
+        keys = ', '.join(f'"f{i}"' for i in range(len(items)))
+        joined = '\n\n'.join(sections)
+        return f"""다음 {len(items)}개 {unit}을 각각 분석하여 JSON 형태로 결과를 반환해주세요:
+
+{joined}
+
+각 {unit}마다 {ANALYSIS_ITEMS}
+
+{unit} 키({keys})를 키로, 각 {unit}의 평가 항목 객체를 값으로 하는 JSON 객체 하나로만 응답해주세요:"""
+
+    def _parse_pack_response(self, ai_response: str, count: int):
+        """묶음 응답을 파일별 분석 결과로 분리 (없거나 항목이 빠진 파일은 None)"""
+        json_start = ai_response.find('{')
+        json_end = ai_response.rfind('}') + 1
+        if json_start == -1 or json_end == 0:
+            return [None] * count
+        try:
+            parsed = json.loads(re.sub(r'[\x00-\x1f\x7f-\x9f]', ' ', ai_response[json_start:json_end]))
+        except ValueError:
+            return [None] * count
+        if not isinstance(parsed, dict):
+            return [None] * count
+        analyses = []
+        for i in range(count):
+            analysis = parsed.get(f'f{i}')
+            if isinstance(analysis, dict) and all(key in analysis for key in _REQUIRED_ANALYSIS_KEYS):
+                analyses.append(analysis)
+            else:
+                analyses.append(None)
+        return analyses
+
+    def _plan_packs(self, items):
+        """분석할 파일을 묶음 요청과 단일 요청으로 나누기
+
+        items는 [(키, file_path, content)]. 작은 파일을 순서대로 토큰 예산까지 묶고,
+        큰 파일과 하나만 남은 묶음은 단일 요청으로 보낸다.
+        """
+        packs, singles = [], []
+        current, current_tokens = [], 0
+        for item in items:
+            content = item[2]
+            if len(content) > ANALYSIS_PACK_MAX_FILE_CHARS:
+                singles.append(item)
+                continue
+            tokens = estimate_tokens(item[1]) + estimate_tokens(content) + 10
+            if current and (current_tokens + tokens > ANALYSIS_PACK_TOKEN_BUDGET
+                            or len(current) >= ANALYSIS_PACK_MAX_FILES):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        singles.extend(pack[0] for pack in packs if len(pack) == 1)
+        return [pack for pack in packs if len(pack) > 1], singles
+
+    async def _analyze_pack_async(self, items, unit: str = '파일'):
+        """작은 파일 묶음을 한 요청으로 분석 (items: [(file_path, content)])
+
+        파일별 결과 목록을 돌려주고, 응답에서 결과를 찾지 못한 파일은 None으로 둔다.
+        """
         try:
-            response = self.bedrock_client.invoke_model(
-                #modelId='anthropic.claude-3-5-sonnet-20240620-v1:0',
-                modelId='anthropic.claude-3-haiku-20240307-v1:0',
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1000,
-                    "messages": [{"role": "user", "content": prompt}]
-                })
+            ai_response = await self._invoke_model_async(
+                self._pack_prompt(items, unit),
+                max_tokens=min(4096, ANALYSIS_RESPONSE_TOKENS_PER_FILE * len(items) + 200)
             )
-            
-            result = json.loads(response['body'].read())
-            ai_response = result['content'][0]['text']
-            
-            # JSON 추출
-            json_start = ai_response.find('{')
-            json_end = ai_response.rfind('}') + 1
-            if json_start != -1 and json_end != -1:
-                ai_analysis = json.loads(ai_response[json_start:json_end])
-                print(f"AI 분석 성공: {file_path}")
+        except Exception as e:
+            print(f"AI 묶음 분석 실패: {e}")
+            return [None] * len(items)
+        analyses = self._parse_pack_response(ai_response, len(items))
+        print(f"AI 묶음 분석: {unit} {len(items)}개 중 {sum(a is not None for a in analyses)}개 성공")
+        return analyses
+
+    def _split_into_chunks(self, content: str, file_path: str):
+        """큰 파일을 함수 단위 코드 조각 [(이름표, 코드)]으로 나누기
+
+        FunctionExtractor로 찾은 함수는 함수 하나가 한 조각이고 (너무 길면 줄 단위로 나눔),
+        함수 밖 코드(선언, 전역 코드)는 빈 줄을 빼고 이어 붙여 조각으로 만든다.
+        지원하지 않는 언어는 전체를 줄 단위로 나눈다.
+        """
+        language = language_for_path(file_path)
+        try:
+            functions = self.extractor.extract_functions(content, language) if language else []
+        except Exception as e:
+            print(f"함수 추출 실패 (줄 단위로 분할): {e}")
+            functions = []
+
+        lines = content.split('\n')
+        covered = bytearray(len(lines))
+        chunks = []
+        for func in functions:
+            start = max(0, func.get('line', 1) - 1)
+            code = func.get('code', '')
+            end = min(len(lines), start + code.count('\n') + 1)
+            # 중첩 함수처럼 이미 포함된 범위는 건너뜀
+            if start >= end or any(covered[start:end]):
+                continue
+            covered[start:end] = b'\x01' * (end - start)
+            label = f"{file_path} - {func.get('name')} ({start + 1}행)"
+            chunks.extend((label, piece) for piece in _line_windows(code.split('\n'), ANALYSIS_CHUNK_CHARS))
+
+        rest = [line for number, line in enumerate(lines) if not covered[number] and line.strip()]
+        chunks.extend((f"{file_path} - 함수 밖 코드", piece) for piece in _line_windows(rest, ANALYSIS_CHUNK_CHARS))
+        return chunks
+
+    async def _analyze_chunked_async(self, content: str, file_path: str,
+                                     semaphore: Optional[asyncio.Semaphore] = None):
+        """큰 파일을 함수 단위 조각으로 나눠 동시에 분석하고 파일 하나의 점수로 합치기
+
+        조각들을 토큰 예산(ANALYSIS_FILE_TOKEN_BUDGET)만큼만 AI에 보내고 (복잡한 조각 우선),
+        나머지 조각과 응답을 받지 못한 조각은 로컬 지표로 평가한다.
+        조각 나누기와 지표 계산은 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        """
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        chunks = await asyncio.to_thread(self._split_into_chunks, content, file_path)
+        if not chunks:
+            return await asyncio.to_thread(self._fallback_analysis, content, file_path)
+
+        complexities = await asyncio.to_thread(
+            lambda: [compute_metrics(code, file_path).cyclomatic_complexity for _, code in chunks]
+        )
+        order = sorted(range(len(chunks)), key=lambda i: -complexities[i])
+        selected, used = [], 0
+        for i in order:
+            tokens = estimate_tokens(chunks[i][1])
+            if used + tokens > ANALYSIS_FILE_TOKEN_BUDGET and selected:
+                continue
+            selected.append(i)
+            used += tokens
+        selected.sort()
+
+        items = [(i, chunks[i][0], chunks[i][1]) for i in selected]
+        packs, singles = self._plan_packs(items)
+        groups = packs + [[item] for item in singles]
+        analyses = [None] * len(chunks)
+
+        async def analyze_group(group):
+            async with semaphore:
+                results = await self._analyze_pack_async([(label, code) for _, label, code in group], '코드 조각')
+            for (i, _, _), ai_analysis in zip(group, results):
+                analyses[i] = ai_analysis
+
+        await asyncio.gather(*(analyze_group(group) for group in groups))
+        print(f"AI 조각 분석: {file_path} 조각 {len(chunks)}개 중 {sum(a is not None for a in analyses)}개 AI 평가")
+
+        def fill_missing():
+            for i, (_, code) in enumerate(chunks):
+                if analyses[i] is None:
+                    analyses[i] = self._fallback_analysis(code, file_path)
+
+        await asyncio.to_thread(fill_missing)
+        return _reduce_chunk_analyses(analyses, [len(code) for _, code in chunks])
+
+    def _analyze_with_ai(self, content: str, file_path: str):
+        """AI를 사용한 코드 분석 (큰 파일은 함수 단위 조각으로 나눠 분석)"""
+        if not self.use_ai:
+            return self._fallback_analysis(content, file_path)
+        if len(content) > ANALYSIS_CHUNK_MIN_FILE_CHARS:
+            return _run_coroutine(self._analyze_chunked_async(content, file_path))
+        
+        try:
+            ai_analysis = self._parse_file_response(self._invoke_model(self._file_prompt(content, file_path)), file_path)
+            if ai_analysis is not None:
                 return ai_analysis
-            
         except Exception as e:
             print(f"AI 분석 실패: {e}")
         
-        return self._fallback_analysis(content)
+        return self._fallback_analysis(content, file_path)
+
+    async def _analyze_with_ai_async(self, content: str, file_path: str):
+        """_analyze_with_ai의 비동기 버전 (호출 대기 중에 다른 파일 분석 진행)"""
+        if not self.use_ai:
+            return self._fallback_analysis(content, file_path)
+        
+        try:
+            ai_response = await self._invoke_model_async(self._file_prompt(content, file_path))
+            ai_analysis = self._parse_file_response(ai_response, file_path)
+            if ai_analysis is not None:
+                return ai_analysis
+        except Exception as e:
+            print(f"AI 분석 실패: {e}")
+        
+        return self._fallback_analysis(content, file_path)
     
-    def _fallback_analysis(self, content):
-        """AI 실패시 기본 분석"""
-        complexity = 1 + sum(len(re.findall(rf'\b{k}\b', content, re.IGNORECASE)) 
-                           for k in ['if', 'for', 'while', 'try', 'case'])
+    def _fallback_analysis(self, content, file_path=None):
+        """AI 실패시 기본 분석 (토큰 기반 지표 사용)"""
+        metrics = compute_metrics(content, file_path)
+        complexity = metrics.cyclomatic_complexity
+        total_lines = metrics.total_lines
         
-        difficulty = min(10, 1 + len([k for k in ['async', 'threading', 'regex'] if k in content.lower()]) + 
-                        (2 if len(content.split('\n')) > 200 else 1 if len(content.split('\n')) > 100 else 0))
+        difficulty = min(10, 1 + sum(1 for k in ('async', 'thread', 'regex') if metrics.mentions(k)) + 
+                        (2 if total_lines > 200 else 1 if total_lines > 100 else 0))
         
         levels = ["Entry", "Junior", "Mid", "Senior", "Architect"]
         dev_level = levels[min(4, (difficulty - 1) // 2)]
         
         return {
             'cyclomatic_complexity': min(complexity, 50),
-            'maintainability_index': max(0, min(100, int(100 - max(0, (len(content.split('\n')) - 100) / 10)))),
-            'estimated_dev_hours': round(len(content.split('\n')) * 0.1, 1),
+            'maintainability_index': maintainability_index(metrics),
+            'estimated_dev_hours': round(total_lines * 0.1, 1),
             'difficulty_score': difficulty,
             'developer_level': dev_level,
-            'pattern_score': min(10, 1 + len([p for p in ['class', 'interface', 'factory'] if p in content.lower()])),
-            'optimization_score': min(10, 5 + len([o for o in ['cache', 'async', 'parallel'] if o in content.lower()])),
-            'best_practices_score': min(10, 1 + len([b for b in ['try:', 'def ', 'class '] if b in content]))
+            'pattern_score': min(10, 1 + sum(1 for p in ('class', 'interface', 'factory') if metrics.mentions(p))),
+            'optimization_score': min(10, 5 + sum(1 for o in ('cache', 'async', 'parallel') if metrics.mentions(o))),
+            'best_practices_score': min(10, 1 + sum(1 for b in ('try', 'def', 'class') if b in metrics.keyword_counts))
         }
     
     def analyze_file(self, file_path: str):
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
-        
-        lines = content.split('\n')
-        total_lines = len(lines)
-        code_lines = len([l for l in lines if l.strip() and not l.strip().startswith(('#', '//', '/*', '*'))])
-        comment_lines = len([l for l in lines if l.strip().startswith(('#', '//', '/*', '*'))])
-        
-        # AI 분석 수행
-        ai_analysis = self._analyze_with_ai(content, file_path)
+        return self._analyze_content(file_path, content)
+
+    def _analyze_content(self, file_path: str, content: str):
+        """이미 읽은 파일 내용 분석"""
+        return self._build_file_result(file_path, content, self._analyze_with_ai(content, file_path))
+
+    def _build_file_result(self, file_path: str, content: str, ai_analysis):
+        """파일 통계와 AI 분석 결과로 파일 분석 행 생성"""
+        metrics = compute_metrics(content, file_path)
+        total_lines = metrics.total_lines
+        code_lines = metrics.code_lines
+        comment_lines = metrics.comment_lines
         
         # 기술 스택 식별
         ext = Path(file_path).suffix
@@ -244,26 +636,206 @@ JSON 형태로만 응답해주세요:"""
             'tech_stack': tech_stack
         }
     
-    def analyze_project(self, project_path: str):
+    def analyze_project(self, project_path: str, time_budget: Optional[float] = None):
+        """analyze_project_async의 동기 버전
+
+        이벤트 루프 안에서 불리면 루프를 막지 않도록 별도 스레드에서 실행한다.
+        """
+        return _run_coroutine(self.analyze_project_async(project_path, time_budget))
+
+    async def analyze_project_async(self, project_path: str, time_budget: Optional[float] = None):
+        """프로젝트 분석 결과 {'files': [...], 'summary': {...}} (파일은 상대 경로 순)"""
+        files = {}
+        summary = {}
+        async for event in self.analyze_project_events(project_path, time_budget=time_budget):
+            if event['type'] == 'file':
+                files[event['index']] = event['file']
+            elif event['type'] == 'summary':
+                summary = event['summary']
+        return {'files': [files[index] for index in sorted(files)], 'summary': summary}
+
+    def _extrapolate(self, results, entries, sampling) -> Dict:
+        """표본 분석 결과로 프로젝트 합계 외삽 (캐시에서 가져온 AI 결과는 확정값으로 더함)
+
+        층별로 표본 평균 x 층 크기를 더하고, 유한 모집단 수정을 적용한 신뢰구간을 함께 낸다.
+        """
+        sample, strata = sampling
+        position = {id(entry): index for index, entry in enumerate(entries)}
+        estimated = {position[id(entry)] for members in strata.values() for entry in members}
+        exact = [r for index, r in enumerate(results) if index not in estimated]
+
+        extrapolated = {}
+        for key in ('estimated_dev_hours', 'cyclomatic_complexity'):
+            known = sum(_number(r[key]) for r in exact)
+            total, low, high = stratified_total(
+                [(len(strata[stratum]), [_number(results[position[id(entry)]][key]) for entry in members])
+                 for stratum, members in sample.items()],
+                ANALYSIS_SAMPLE_CONFIDENCE,
+            )
+            extrapolated[key] = (known + total, known + max(0.0, low), known + high)
+
+        hours = extrapolated['estimated_dev_hours']
+        complexity = [value / len(results) for value in extrapolated['cyclomatic_complexity']]
+        return {
+            'sampled_files': sum(len(members) for members in sample.values()),
+            'local_files': len(estimated) - sum(len(members) for members in sample.values()),
+            'cached_files': len(exact),
+            'strata': len(strata),
+            'confidence': ANALYSIS_SAMPLE_CONFIDENCE,
+            'total_estimated_hours': {'estimate': round(hours[0], 1), 'low': round(hours[1], 1),
+                                      'high': round(hours[2], 1)},
+            'avg_complexity': {'estimate': round(complexity[0], 2), 'low': round(complexity[1], 2),
+                               'high': round(complexity[2], 2)},
+        }
+
+    async def analyze_project_events(self, project_path: str, heartbeat: Optional[float] = None,
+                                     time_budget: Optional[float] = None):
+        """프로젝트 분석 진행 이벤트를 끝나는 순서대로 내보내는 async generator
+
+        캐시에 없는 파일만 동시에 최대 max_concurrency개씩 AI 분석한다.
+        AI 호출은 프로세스 공용 토큰 버킷으로 분당 요청 수를 맞추고,
+        쓰로틀링 응답을 받으면 백오프 후 재시도한다.
+        time_budget(초, 없으면 self.time_budget) 안에 끝나지 않을 만큼 파일이 많으면
+        층화 표본만 AI로 분석하고 나머지는 로컬 지표로 평가한 뒤 (행에 'local_estimate': True)
+        합계를 신뢰구간과 함께 외삽한다 (summary['sampling']).
+
+        이벤트 종류:
+        - {'type': 'plan', 'estimate'}: 파일을 읽기 전에 맨 처음 한 번 (대상 파일 수와 비용 추정)
+        - {'type': 'file', 'index', 'file', 'cached', 'done', 'total'}: 파일 하나 분석 완료
+        - {'type': 'progress', 'done', 'total'}: heartbeat초 동안 끝난 파일이 없을 때 (연결 유지용)
+        - {'type': 'summary', 'summary'}: 모든 파일이 끝난 뒤 마지막에 한 번
+        """
+        # 제외 규칙과 크기 상한으로 대상 파일을 먼저 고르고 비용 추정
+        plan = await asyncio.to_thread(self.plan_project, project_path)
+        estimate = self.estimate_cost(plan)
+        print(f"🗺️ 분석 대상 {estimate['files']}개 ({estimate['bytes']} bytes), 제외 {estimate['skipped']}, "
+              f"예상 요청 {estimate['requests']}회 / 입력 토큰 {estimate['input_tokens']}")
+        yield {'type': 'plan', 'estimate': estimate}
+
+        # 파일을 병렬로 읽어 해시 (읽은 내용은 분석 단계에서 재사용)
+        entries = await asyncio.to_thread(fingerprint_project, project_path, self.supported_extensions,
+                                          plan=plan)
+        total = len(entries)
+
         # 캐시 키 생성
-        cache_key = self._get_cache_key(project_path)
+        cache_key = self._get_cache_key(project_path, entries)
         
-        # 캐시에서 결과 조회
+        # 캐시에서 결과 조회 (파일이 하나도 안 바뀐 경우)
         cached_result = self._get_cached_result(cache_key)
         if cached_result:
             print(f"📋 캐시된 분석 결과 사용: {project_path}")
-            return cached_result
+            for index, file_result in enumerate(cached_result['files']):
+                yield {'type': 'file', 'index': index, 'file': file_result, 'cached': True,
+                       'done': index + 1, 'total': total}
+            yield {'type': 'summary', 'summary': cached_result['summary']}
+            return
         
         print(f"🔍 새로운 분석 시작: {project_path}")
-        results = []
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                if Path(file).suffix in self.supported_extensions:
-                    results.append(self.analyze_file(os.path.join(root, file)))
-                # AI rate limit 고려, 실제 값이 얼마인지 확인후 처리 필요
-                # 여기서는 매 요청마다 2초 대기
-                if self.use_ai:
-                    time.sleep(2)
+        results = [None] * total
+        pending = []
+        done = 0
+        for index, entry in enumerate(entries):
+            # 파일 단위 캐시: 내용이 같은 파일은 이전 분석 결과 재사용
+            file_result = self._get_cached_result(self._get_file_cache_key(entry.path, entry.digest))
+            if file_result is None:
+                pending.append(index)
+            else:
+                file_result['file_path'] = entry.path
+                results[index] = file_result
+                done += 1
+                yield {'type': 'file', 'index': index, 'file': file_result, 'cached': True,
+                       'done': done, 'total': total}
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 분석이 끝난 파일 번호 (None이면 전체 종료)
+        finished = asyncio.Queue()
+
+        def store(index, content, ai_analysis):
+            entry = entries[index]
+            file_result = self._build_file_result(entry.path, content, ai_analysis)
+            self._set_cached_result(self._get_file_cache_key(entry.path, entry.digest), file_result)
+            results[index] = file_result
+            finished.put_nowait(index)
+
+        async def estimate_locally(item):
+            # 표본에서 빠진 파일은 로컬 지표로만 평가 (AI 결과가 아니므로 캐시하지 않음)
+            index, file_path, content = item
+            file_result = await asyncio.to_thread(
+                lambda: self._build_file_result(file_path, content, self._fallback_analysis(content, file_path))
+            )
+            file_result['local_estimate'] = True
+            results[index] = file_result
+            finished.put_nowait(index)
+
+        async def analyze(item):
+            index, file_path, content = item
+            if self.use_ai and len(content) > ANALYSIS_CHUNK_MIN_FILE_CHARS:
+                # 큰 파일은 앞부분만 잘라 보내지 않고 함수 단위로 나눠 분석 (조각별로 semaphore 사용)
+                ai_analysis = await self._analyze_chunked_async(content, file_path, semaphore)
+            else:
+                async with semaphore:
+                    ai_analysis = await self._analyze_with_ai_async(content, file_path)
+            store(index, content, ai_analysis)
+
+        async def analyze_pack(pack):
+            async with semaphore:
+                analyses = await self._analyze_pack_async([(file_path, content) for _, file_path, content in pack])
+            # 묶음 응답에서 결과를 찾지 못한 파일은 하나씩 다시 요청
+            retry = []
+            for item, ai_analysis in zip(pack, analyses):
+                if ai_analysis is None:
+                    retry.append(analyze(item))
+                else:
+                    store(item[0], item[2], ai_analysis)
+            await asyncio.gather(*retry)
+
+        # 시간 예산을 넘을 것 같으면 층화 표본만 AI 분석
+        budget = self.time_budget if time_budget is None else time_budget
+        sampling = None
+        if self.use_ai and budget and pending:
+            sampling = self._choose_sample(plan, [entries[index] for index in pending], budget)
+        position = {id(entry): index for index, entry in enumerate(entries)}
+        ai_indices = set(pending)
+        if sampling is not None:
+            ai_indices = {position[id(entry)] for sample in sampling[0].values() for entry in sample}
+            print(f"🎯 표본 분석: 파일 {len(pending)}개 중 {len(ai_indices)}개 AI 분석 (층 {len(sampling[1])}개)")
+
+        # 해시할 때 읽은 내용을 그대로 분석에 사용
+        items = [(index, entries[index].path, entries[index].read_text()) for index in pending]
+        local_items = [item for item in items if item[0] not in ai_indices]
+        items = [item for item in items if item[0] in ai_indices]
+        if self.use_ai:
+            # 작은 파일은 여러 개를 한 요청으로 묶어 호출 수와 고정 프롬프트 비용을 줄임
+            packs, singles = self._plan_packs(items)
+        else:
+            packs, singles = [], items
+
+        async def run_all():
+            try:
+                await asyncio.gather(*(analyze_pack(pack) for pack in packs), *(analyze(item) for item in singles),
+                                     *(estimate_locally(item) for item in local_items))
+            finally:
+                finished.put_nowait(None)
+
+        runner = asyncio.ensure_future(run_all())
+        try:
+            while True:
+                try:
+                    index = await asyncio.wait_for(finished.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield {'type': 'progress', 'done': done, 'total': total}
+                    continue
+                if index is None:
+                    break
+                done += 1
+                yield {'type': 'file', 'index': index, 'file': results[index], 'cached': False,
+                       'done': done, 'total': total}
+            await runner
+        finally:
+            # 스트림을 끝까지 읽지 않고 닫으면 남은 분석 취소
+            if not runner.done():
+                runner.cancel()
+        print(f"📂 파일 {len(results)}개 중 {len(pending)}개 분석, {len(results) - len(pending)}개 캐시 사용")
         
         if results:
             summary = {
@@ -275,15 +847,23 @@ JSON 형태로만 응답해주세요:"""
             }
             
             # 최종 분석 수행
-            final_analysis = self._analyze_summary(results)
+            if sampling is None:
+                final_analysis = await asyncio.to_thread(self._analyze_summary, results)
+            else:
+                summary['sampling'] = self._extrapolate(results, entries, sampling)
+                summary['total_estimated_hours'] = summary['sampling']['total_estimated_hours']['estimate']
+                summary['avg_complexity'] = summary['sampling']['avg_complexity']['estimate']
+                analyzed = [r for r in results if not r.get('local_estimate')]
+                final_analysis = await asyncio.to_thread(self._analyze_summary, analyzed, summary)
             summary.update(final_analysis)
         else:
             summary = {}
         
         result = {'files': results, 'summary': summary}
         
-        # 결과를 캐시에 저장
-        self._set_cached_result(cache_key, result)
-        print(f"💾 분석 결과 캐시 저장 완료: {project_path}")
+        # 결과를 캐시에 저장 (표본 결과는 전체 분석 결과로 쓰지 않도록 저장하지 않음)
+        if sampling is None:
+            self._set_cached_result(cache_key, result)
+            print(f"💾 분석 결과 캐시 저장 완료: {project_path}")
         
-        return result
+        yield {'type': 'summary', 'summary': summary}
@@ -0,0 +1,230 @@
+import os
+import re
+import math
+import keyword
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, NamedTuple, Optional
+
+
+# 언어 계열별 토큰 패턴 (줄바꿈은 따로 잡아 줄 단위 분류에 사용)
+_C_TOKEN_RE = re.compile(r'''
+    (?P<nl>\n)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?|`(?:\\.|[^`\\])*`?)
+  | (?P<ident>[^\W\d]\w*|\$\w+)
+  | (?P<number>\d[\w.']*|\.\d\w*)
+  | (?P<op>>>>=?|<<=|>>=|\.\.\.|->|::|\+\+|--|&&|\|\||\?\?|\?\.|[-+*/%&|^!=<>]=?|[^\s\w])
+''', re.VERBOSE | re.DOTALL)
+
+_SCRIPT_TOKEN_RE = re.compile(r'''
+    (?P<nl>\n)
+  | (?P<ws>[ \t\r\f\v]+)
+  | (?P<comment>\#[^\n]*)
+  | (?P<string>(?:[rRbBuUfF]{1,2})?(?:"""(?:\\.|[^\\])*?(?:"""|\Z)|\'\'\'(?:\\.|[^\\])*?(?:\'\'\'|\Z)
+                                    |"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?))
+  | (?P<ident>[^\W\d]\w*)
+  | (?P<number>\d[\w.]*|\.\d\w*)
+  | (?P<op>\*\*=?|//=?|>>=?|<<=?|->|:=|&&|\|\||[-+*/%&|^!=<>@]=?|[^\s\w])
+''', re.VERBOSE | re.DOTALL)
+
+_C_KEYWORDS = frozenset((
+    # C/C++/C#/Java/JavaScript/TypeScript/Go/PHP 공통 키워드
+    'abstract', 'async', 'await', 'auto', 'bool', 'break', 'case', 'catch', 'char', 'class', 'const',
+    'constexpr', 'continue', 'default', 'defer', 'delete', 'do', 'double', 'else', 'elseif', 'enum',
+    'export', 'extends', 'extern', 'false', 'final', 'finally', 'float', 'for', 'foreach', 'func',
+    'function', 'go', 'goto', 'if', 'implements', 'import', 'inline', 'int', 'interface', 'let',
+    'long', 'namespace', 'new', 'null', 'nullptr', 'package', 'private', 'protected', 'public',
+    'return', 'short', 'signed', 'sizeof', 'static', 'struct', 'super', 'switch', 'template', 'this',
+    'throw', 'throws', 'true', 'try', 'typedef', 'typename', 'typeof', 'union', 'unsigned', 'using',
+    'var', 'virtual', 'void', 'volatile', 'while', 'yield',
+))
+_PYTHON_KEYWORDS = frozenset(keyword.kwlist)
+_RUBY_KEYWORDS = frozenset((
+    'alias', 'and', 'begin', 'break', 'case', 'class', 'def', 'defined', 'do', 'else', 'elsif', 'end',
+    'ensure', 'false', 'for', 'if', 'in', 'module', 'next', 'nil', 'not', 'or', 'redo', 'rescue',
+    'retry', 'return', 'self', 'super', 'then', 'true', 'undef', 'unless', 'until', 'when', 'while',
+    'yield',
+))
+
+# 순환복잡도에 더하는 분기 (키워드와 단락 평가/삼항 연산자)
+_C_DECISIONS = frozenset(('if', 'elseif', 'for', 'foreach', 'while', 'case', 'catch', '&&', '||', '?', '??'))
+_PYTHON_DECISIONS = frozenset(('if', 'elif', 'for', 'while', 'except', 'and', 'or'))
+_RUBY_DECISIONS = frozenset(('if', 'elsif', 'unless', 'while', 'until', 'for', 'when', 'rescue', 'and', 'or', '&&', '||'))
+
+# 언어 계열: (토큰 패턴, 키워드, 분기)
+_FAMILIES = {
+    'c': (_C_TOKEN_RE, _C_KEYWORDS, _C_DECISIONS),
+    'python': (_SCRIPT_TOKEN_RE, _PYTHON_KEYWORDS, _PYTHON_DECISIONS),
+    'ruby': (_SCRIPT_TOKEN_RE, _RUBY_KEYWORDS, _RUBY_DECISIONS),
+}
+
+FAMILY_BY_EXTENSION = {
+    '.py': 'python', '.rb': 'ruby',
+    '.c': 'c', '.h': 'c', '.cpp': 'c', '.cc': 'c', '.cxx': 'c', '.hpp': 'c', '.hh': 'c', '.hxx': 'c',
+    '.cs': 'c', '.java': 'c', '.js': 'c', '.jsx': 'c', '.ts': 'c', '.tsx': 'c', '.go': 'c', '.php': 'c',
+}
+
+
+class CodeMetrics(NamedTuple):
+    """파일 하나의 정적 지표 (compute_metrics 결과, 캐시되므로 읽기 전용으로 사용)"""
+    family: str
+    total_lines: int
+    code_lines: int
+    comment_lines: int
+    blank_lines: int
+    # McCabe 순환복잡도 (1 + 분기 수)
+    cyclomatic_complexity: int
+    # Halstead: 고유/전체 연산자(키워드 포함)와 피연산자(이름, 숫자, 문자열) 수
+    distinct_operators: int
+    distinct_operands: int
+    total_operators: int
+    total_operands: int
+    keyword_counts: Dict[str, int]
+    # 소문자로 바꾼 식별자 (키워드 제외)
+    names: FrozenSet[str]
+
+    @property
+    def halstead_volume(self) -> float:
+        vocabulary = self.distinct_operators + self.distinct_operands
+        length = self.total_operators + self.total_operands
+        return round(length * math.log2(vocabulary), 1) if vocabulary > 1 else 0.0
+
+    def mentions(self, *fragments: str) -> bool:
+        """키워드나 식별자 중에 fragments 중 하나를 포함하는 것이 있는지"""
+        for fragment in fragments:
+            if fragment in self.keyword_counts or any(fragment in name for name in self.names):
+                return True
+        return False
+
+
+def maintainability_index(metrics: CodeMetrics) -> int:
+    """유지보수성 지수 (0-100, Halstead 볼륨/순환복잡도/코드 줄 수로 계산하는 표준 식)"""
+    if metrics.code_lines == 0:
+        return 100
+    volume = max(metrics.halstead_volume, 1.0)
+    raw = 171 - 5.2 * math.log(volume) - 0.23 * metrics.cyclomatic_complexity - 16.2 * math.log(metrics.code_lines)
+    return max(0, min(100, int(raw * 100 / 171)))
+
+
+# 내용 해시 -> CodeMetrics (최근 것만 유지)
+METRICS_CACHE_SIZE = 32
+_metrics_cache: "OrderedDict[tuple, CodeMetrics]" = OrderedDict()
+_metrics_lock = threading.Lock()
+
+
+def family_for_path(path: Optional[str]) -> str:
+    """파일 확장자로 언어 계열 판단 (모르면 C 계열)"""
+    if not path:
+        return 'c'
+    return FAMILY_BY_EXTENSION.get(os.path.splitext(path)[1].lower(), 'c')
+
+
+def compute_metrics(content: str, path: Optional[str] = None) -> CodeMetrics:
+    """토큰을 한 번만 훑어서 줄 수, 순환복잡도, Halstead, 키워드 수를 함께 계산
+
+    같은 내용으로 여러 번 불러도 계산은 한 번만 한다 (분석 결과 행과 fallback 분석이 공유).
+    캐시는 파일 전체가 아니라 내용 해시로 잡아서 큰 파일을 메모리에 붙잡아 두지 않는다.
+    """
+    family = family_for_path(path)
+    key = (hashlib.blake2b(content.encode('utf-8', errors='surrogatepass'), digest_size=16).digest(), family)
+    with _metrics_lock:
+        metrics = _metrics_cache.get(key)
+        if metrics is not None:
+            _metrics_cache.move_to_end(key)
+            return metrics
+    metrics = _compute_metrics(content, family)
+    with _metrics_lock:
+        _metrics_cache[key] = metrics
+        while len(_metrics_cache) > METRICS_CACHE_SIZE:
+            _metrics_cache.popitem(last=False)
+    return metrics
+
+
+def _compute_metrics(content: str, family: str) -> CodeMetrics:
+    token_re, keywords, decision_tokens = _FAMILIES[family]
+
+    code_lines = comment_lines = blank_lines = 0
+    line_code = line_comment = False
+    decisions = 0
+    keyword_counts = {}
+    operators = {}
+    operands = {}
+    identifiers = set()
+    total_operators = total_operands = 0
+
+    for match in token_re.finditer(content):
+        kind = match.lastgroup
+        if kind == 'nl':
+            if line_code:
+                code_lines += 1
+            elif line_comment:
+                comment_lines += 1
+            else:
+                blank_lines += 1
+            line_code = line_comment = False
+            continue
+        if kind == 'ws':
+            continue
+
+        text = match.group()
+        if kind == 'comment':
+            breaks = text.count('\n')
+            if breaks:
+                # 여러 줄 주석: 시작 줄은 기존 상태대로, 중간 줄은 주석 줄
+                if line_code:
+                    code_lines += 1
+                else:
+                    comment_lines += 1
+                comment_lines += breaks - 1
+                line_code = False
+            line_comment = True
+            continue
+
+        if kind == 'ident' and text in keywords:
+            keyword_counts[text] = keyword_counts.get(text, 0) + 1
+            operators[text] = operators.get(text, 0) + 1
+            total_operators += 1
+            if text in decision_tokens:
+                decisions += 1
+        elif kind == 'op':
+            operators[text] = operators.get(text, 0) + 1
+            total_operators += 1
+            if text in decision_tokens:
+                decisions += 1
+        else:
+            operands[text] = operands.get(text, 0) + 1
+            total_operands += 1
+            if kind == 'ident':
+                identifiers.add(text)
+            elif kind == 'string':
+                # 여러 줄 문자열은 모두 코드 줄
+                breaks = text.count('\n')
+                code_lines += breaks
+                if breaks:
+                    line_comment = False
+        line_code = True
+
+    if line_code:
+        code_lines += 1
+    elif line_comment:
+        comment_lines += 1
+    else:
+        blank_lines += 1
+
+    return CodeMetrics(
+        family=family,
+        total_lines=code_lines + comment_lines + blank_lines,
+        code_lines=code_lines,
+        comment_lines=comment_lines,
+        blank_lines=blank_lines,
+        cyclomatic_complexity=1 + decisions,
+        distinct_operators=len(operators),
+        distinct_operands=len(operands),
+        total_operators=total_operators,
+        total_operands=total_operands,
+        keyword_counts=keyword_counts,
+        names=frozenset(name.lower() for name in identifiers),
+    )
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# 조회 시 last_access를 다시 기록하는 최소 간격 (초)
+# LRU 제거 순서에는 이 정도 오차면 충분하고, 자주 읽는 항목마다 쓰기가 생기지 않음
+ACCESS_UPDATE_INTERVAL = 60.0
+
+class DiskCache:
+    """SQLite 기반 영구 캐시 (용량 제한 + LRU 제거)
+
+    값은 JSON으로 저장하고, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 항목부터 제거한다.
+    서버 재시작 후에도 유지되며 여러 스레드/프로세스에서 같이 사용할 수 있다.
+    memory_items를 주면 최근 사용한 항목을 메모리(L1)에 두어 SQLite 조회 없이 반환한다.
+    조회 시각(last_access)은 저장된 값이 access_interval초보다 오래됐을 때만 다시 기록한다.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, memory_items: int = 0,
+                 access_interval: float = ACCESS_UPDATE_INTERVAL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.access_interval = access_interval
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self._lock = threading.Lock()
+        # L1: 키 -> 직렬화된 값 (반환할 때마다 새 객체로 디코딩하므로 호출자가 수정해도 안전)
+        self._memory = OrderedDict()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache(last_access)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시 조회 (없으면 None), 조회된 항목은 최근 사용으로 갱신"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return json.loads(data)
+            row = self._conn.execute("SELECT value, last_access FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            data, last_access = row
+            now = time.time()
+            if now - last_access >= self.access_interval:
+                self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self._remember(key, data)
+        return json.loads(data)
+
+    def set(self, key: str, value: Any):
+        """캐시 저장 후 용량을 넘으면 오래된 항목 제거"""
+        data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, size, time.time())
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._remember(key, data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key: str, data: str):
+        """L1에 저장하고 memory_items를 넘으면 가장 오래된 항목 제거"""
+        if not self.memory_items:
+            return
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 LRU 순서로 제거"""
+        # 다른 프로세스가 같은 파일에 쓴 양도 반영
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if self._total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM cache ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+            self._memory.pop(key, None)
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", evicted)
+        print(f"🧹 캐시 용량 초과: {len(evicted)}개 항목 제거")
+
+    def clear(self):
+        """모든 항목과 통계 초기화"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._memory.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.memory_hits = 0
+
+    def stats(self) -> Dict:
+        """히트/미스 통계와 현재 사용량"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'memory_hits': self.memory_hits,
+            'memory_entries': len(self._memory),
+            'entries': entries,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,153 +1,684 @@
+import os
 import re
-from typing import List, Dict
+import time
+import asyncio
+import bisect
+import codecs
+import difflib
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Dict, Optional
+
+from language_extractors import EXTRACTORS, leading_comment
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# C/C++ 토큰 패턴
+# 주석, 문자열, 문자 리터럴을 각각 하나의 토큰으로 묶어서
+# 그 안에 있는 중괄호/괄호가 구조 분석에 섞이지 않도록 한다
+_TOKEN_RE = re.compile(r'''
+    (?:\s+|//(?:\\\r?\n|[^\n])*|/\*.*?(?:\*/|\Z))*     # 공백과 주석은 토큰 앞에서 함께 소비
+    (?:
+      (?P<string>(?:u8|[uUL])?R"(?P<delim>[^()\\\s]{0,16})\(.*?\)(?P=delim)"
+                |(?:u8|[uUL])?"(?:\\.|[^"\\\n])*"?)
+    | (?P<char>(?:u8|[uUL])?'(?:\\.|[^'\\\n])*'?)
+    | (?P<ident>[A-Za-z_]\w*)
+    | (?P<number>\.?\d(?:[eEpP][+-]|[\w.'])*)
+    | (?P<op>::|->|&&|[{}()\[\];,<>=*&~:])
+    | (?P<hash>\#)
+    | (?P<other>.)
+    | (?P<eof>\Z)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+# 전처리 지시문의 나머지 부분 (역슬래시 줄 연결 포함)
+_DIRECTIVE_RE = re.compile(r'(?:\\\r?\n|[^\n])*')
+
+# 함수 본문 건너뛰기용 패턴
+# 본문 안에서는 중괄호와, 중괄호를 숨길 수 있는 토큰의 시작 문자만 찾고
+# 나머지 문자는 정규식 엔진이 한 번에 건너뛴다
+_BODY_SCAN_RE = re.compile(r'[{}"\'/]|^[ \t]*\#', re.MULTILINE)
+_COMMENT_RE = re.compile(r'//(?:\\\r?\n|[^\n])*|/\*.*?(?:\*/|\Z)', re.DOTALL)
+_STRING_RE = re.compile(r'"(?:\\.|[^"\\\n])*"?')
+_RAW_STRING_RE = re.compile(r'R"([^()\\\s]{0,16})\(.*?\)\1"', re.DOTALL)
+_CHAR_RE = re.compile(r"'(?:\\.|[^'\\\n])*'?")
+
+# 중괄호 인덱스용 패턴: _skip_body와 같은 규칙으로 중괄호를 숨기는 영역을 한 번에 찾음
+# (모든 분기가 고정 문자로 시작해야 정규식 엔진이 후보 위치로 바로 건너뛴다)
+_MASK_RE = re.compile(r'''
+      //(?:\\\r?\n|[^\n])* | /\*.*?(?:\*/|\Z)
+    | "(?<=R")([^()\\\s]{0,16})\(.*?\)\1"
+    | "(?:\\[^\n]|[^"\\\n])*"?
+    | '(?<![\w.]')(?:\\[^\n]|[^'\\\n])*'?
+    | \#(?:\\\r?\n|[^\n])*
+''', re.VERBOSE | re.DOTALL)
+
+# 이 크기 이상인 파일은 NumPy로 중괄호 짝을 미리 계산
+BRACE_INDEX_MIN_SIZE = 64 * 1024
+
+# 스트리밍 추출: 한 번에 읽는 크기, 파일 추출 시 스트리밍으로 바꾸는 크기
+STREAM_CHUNK_SIZE = 1024 * 1024
+STREAM_MIN_SIZE = 32 * 1024 * 1024
+
+# 청크 끝에서 잘렸을 수 있는 raw 문자열 시작 (닫는 구분자는 뒤 청크에 있을 수 있음)
+_RAW_OPEN_RE = re.compile(r'R"([^()\\\s]{0,16})\(')
+
+# 조건부 컴파일 지시문 (있는 파일만 영역 맵 사전 계산)
+_CONDITIONAL_RE = re.compile(r'^[ \t]*\#[ \t]*(?:if|ifdef|ifndef|elif|else|endif)\b', re.MULTILINE)
+_PP_COMMENT_RE = re.compile(r'/\*.*?(?:\*/|\Z)|//.*', re.DOTALL)
+_PP_TOKEN_RE = re.compile(r'\s*(?:(0[xX][0-9a-fA-F]+|\d+)[uUlL]*|(\w+)|(&&|\|\||[<>=!]=|[!()<>]))')
+
+# /build 대상(Linux g++ -std=c++17)에서 정의된 매크로 (값을 모르면 None)
+_TARGET_MACROS = {
+    '__linux__': 1, '__linux': 1, 'linux': 1, '__unix__': 1, '__unix': 1,
+    '__gnu_linux__': 1, '__GNUC__': None, '__cplusplus': 201703, '__STDC__': 1,
+}
+# /build 대상에서 정의되지 않는 매크로
+_TARGET_UNDEFINED = frozenset((
+    '_WIN32', '_WIN64', 'WIN32', '_WINDOWS', '_MSC_VER', '_WINDLL', '__MINGW32__',
+    '__MINGW64__', '__CYGWIN__', '__APPLE__', '__MACH__', '__ANDROID__',
+))
+
+# 함수 이름이 될 수 없는 식별자 (제어문, 연산자형 키워드, 속성 매크로)
+_NON_NAMES = frozenset((
+    'if', 'for', 'while', 'switch', 'return', 'sizeof', 'catch', 'do', 'else',
+    'case', 'new', 'delete', 'throw', 'typeid', 'decltype', 'alignof', 'alignas',
+    'static_assert', 'noexcept', 'operator', 'defined', '__declspec',
+    '__attribute__', 'static_cast', 'dynamic_cast', 'const_cast',
+    'reinterpret_cast',
+))
+
+# 닫는 괄호와 본문 사이에 올 수 있는 한정자
+_TRAILERS = frozenset(('const', 'volatile', 'override', 'final', 'mutable', '&', '&&'))
+_TRAILER_GROUPS = frozenset(('noexcept', 'throw', '__attribute__'))
+
+# 반환 타입 앞에서 떼어낼 지정자 (원본 시그니처에는 포함하지 않음)
+_SPECIFIERS = frozenset(('inline', 'static', 'virtual', 'explicit', 'extern',
+                         'constexpr', 'friend', '__inline', '__forceinline'))
+
+# DLL로 내보낼 수 없는 엔트리 포인트
+_ENTRY_POINTS = frozenset(('main', 'wmain', '_tmain', 'WinMain', 'wWinMain', '_tWinMain', 'DllMain'))
+
+# 추출 결과 캐시 키에 포함되는 버전 (추출 규칙이 바뀌면 올려서 기존 캐시 무효화)
+EXTRACTOR_VERSION = '7'
+
+# 확장자 -> 언어 (cpp는 이 모듈의 토크나이저, 나머지는 language_extractors.EXTRACTORS)
+LANGUAGE_BY_EXTENSION = {
+    '.c': 'cpp', '.cc': 'cpp', '.cpp': 'cpp', '.cxx': 'cpp', '.h': 'cpp', '.hh': 'cpp', '.hpp': 'cpp',
+    '.py': 'python', '.java': 'java', '.go': 'go',
+    '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript',
+}
+
+# 디렉토리 추출 시 제외할 디렉토리
+_SKIP_DIRS = frozenset(('node_modules', '__pycache__', 'build', 'dist', 'venv', 'vendor'))
+
+# 여러 파일 추출용 프로세스 풀 (첫 사용 시 생성하여 요청 간 공유)
+_process_pool = None
+
 
 class FunctionExtractor:
-    def __init__(self):
-        # C/C++ 함수 패턴 (템플릿 제외)
-        self.function_patterns = [
-            # C++ 함수 (std::string, 네임스페이스 포함)
-            r'^\s*(?:inline\s+|static\s+|virtual\s+|explicit\s+)*([a-zA-Z_:][a-zA-Z0-9_:<>,\s*&\[\]]*)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)\s*(?:const\s*)?(?:override\s*)?$',
-            # 기본 C 함수
-            r'^\s*([a-zA-Z_][a-zA-Z0-9_*\s]*)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]*)\)\s*$'
-        ]
-        
-    def extract_functions(self, code: str) -> List[Dict]:
-        """소스 코드에서 함수 시그니처 추출"""
-        functions = []
-        lines = code.split('\n')
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # 주석이나 전처리기 지시문 제외
-            if line.startswith('//') or line.startswith('#') or line.startswith('/*') or not line:
-                i += 1
-                continue
-            
-            # 함수 선언 찾기 (여러 줄에 걸쳐 있을 수 있음)
-            func_declaration = self._extract_function_declaration(lines, i)
-            if func_declaration:
-                func_info, end_line = func_declaration
-                
-                # 템플릿 함수 완전 제외 (DLL 빌드 불가)
-                full_code = '\n'.join(lines[i:end_line+10])  # 앞뒤 코드 확인
-                if 'template' in full_code.lower() or func_info.get('name', '').startswith('template'):
-                    print(f"❌ 템플릿 함수 제외: {func_info.get('name', 'Unknown')} (DLL 빌드 불가)")
-                    i = end_line + 1
-                    continue
-                
-                # main, WinMain 등 엔트리 포인트 제외
-                if func_info['name'] in ['main', 'WinMain', 'DllMain']:
-                    i = end_line + 1
+    """C/C++ 소스에서 자유 함수 정의를 추출하는 토크나이저 기반 추출기
+
+    파일을 한 번만 앞에서부터 스캔하면서 선언부, 본문, 본문 끝을 함께 찾는다.
+    문자열/문자/주석/전처리 지시문 안의 중괄호는 무시하며,
+    namespace와 extern "C" 블록 안으로는 들어가고 class/struct 본문과
+    함수 본문은 통째로 건너뛴다.
+    다른 언어는 language_extractors의 언어별 추출기로 넘긴다.
+    """
+
+    def __init__(self, cache=None):
+        # cache: get/set을 제공하는 캐시 (예: DiskCache), 파일 내용 해시로 추출 결과 재사용
+        self.cache = cache
+
+    def extract_functions(self, code: str, language: str = 'cpp') -> List[Dict]:
+        """소스 코드에서 함수 시그니처 추출
+
+        language: 'cpp'(기본), 'python', 'java', 'javascript', 'typescript', 'go'
+        """
+        if language == 'cpp':
+            return [span.to_dict() for span in self.extract_spans(code)]
+
+        extractor = EXTRACTORS.get(language)
+        if extractor is None:
+            return []
+        key = _cache_key(code, language)
+        functions = self.cache.get(key) if self.cache is not None else None
+        if functions is None:
+            functions = extractor(code)
+            if self.cache is not None:
+                self.cache.set(key, functions)
+        return functions
+
+    def extract_functions_from_file(self, file_path: str) -> List[Dict]:
+        """파일 확장자로 언어를 판단해 함수 추출 (지원하지 않는 파일은 빈 목록)
+
+        STREAM_MIN_SIZE 이상인 C/C++ 파일은 전체를 읽지 않고 스트리밍으로 추출한다.
+        """
+        language = language_for_path(file_path)
+        if language is None:
+            return []
+        if language == 'cpp' and os.path.getsize(file_path) >= STREAM_MIN_SIZE:
+            for encoding in ('utf-8', 'cp949', 'latin-1'):
+                try:
+                    with open(file_path, 'rb') as f:
+                        return list(self.extract_functions_stream(f, encoding=encoding))
+                except UnicodeDecodeError:
                     continue
-                
-                # 함수 본문 추출
-                func_body = self._extract_function_body(lines, end_line)
-                func_info['code'] = func_body
-                
-                functions.append(func_info)
-                
-                # 함수 본문 끝까지 건너뛰기
-                i = self._find_function_end(lines, end_line) + 1
+        return self.extract_functions(_read_source(file_path), language)
+
+    def extract_functions_stream(self, file_obj, chunk_size: int = STREAM_CHUNK_SIZE,
+                                 encoding: str = 'utf-8') -> Iterator[Dict]:
+        """파일 객체를 청크 단위로 읽으면서 완성된 C/C++ 함수를 하나씩 내보내는 제너레이터
+
+        수백 MB짜리 생성 코드(amalgamation, 테이블 코드)도 파일 전체를 메모리에 올리지 않는다.
+        읽은 텍스트를 마지막 선언 경계까지만 확정하고 나머지만 버퍼에 남기며,
+        조건부 컴파일 상태(#if 스택, #define)는 청크 사이에 이어서 평가한다.
+        메모리 사용량은 청크 크기와 가장 큰 선언(함수 본문, 비활성 분기) 크기에만 비례한다.
+        바이너리 파일 객체는 encoding으로 디코딩하며, 결과는 캐시하지 않는다.
+        """
+        decoder = None
+        conditionals = _ConditionalState()
+        buffer = ''
+        line = 1
+        read_size = chunk_size
+        eof = False
+        while not eof:
+            data = file_obj.read(read_size)
+            eof = not data
+            if isinstance(data, bytes):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(encoding)()
+                data = decoder.decode(data, final=eof)
+            buffer += data
+
+            view = buffer if eof else buffer[:_stream_stable_end(buffer)]
+            bounds = [m.span() for m in _MASK_RE.finditer(view)]
+            disabled = _disabled_branches(view, bounds, conditionals.copy())
+            braces = None
+            if np is not None and len(view) >= BRACE_INDEX_MIN_SIZE:
+                braces = _build_brace_index(view, bounds, disabled)
+            spans, _, boundary = self._scan(view, 0, len(view), _LineCounter(view, 0, line),
+                                            _RegionMap(disabled, braces))
+            if eof:
+                boundary = len(view)
+
+            for span in spans:
+                if span.end <= boundary:
+                    yield span.to_dict()
+
+            # 확정된 구간의 지시문만 조건부 컴파일 상태에 반영하고 버퍼에서 제거
+            _disabled_branches(view, [b for b in bounds if b[0] < boundary], conditionals)
+            line += view.count('\n', 0, boundary)
+            buffer = buffer[boundary:]
+            # 선언이 청크보다 길어 경계가 없으면 읽는 양을 늘려 재스캔 비용을 선형으로 유지
+            read_size = chunk_size if boundary else max(chunk_size, len(buffer))
+
+    def extract_functions_from_directory(self, directory: str) -> Dict[str, List[Dict]]:
+        """디렉토리 아래 지원 언어 파일을 프로세스 풀에서 병렬 추출
+
+        반환: {파일 경로: 함수 목록} (함수가 있는 파일만)
+        """
+        paths = []
+        for root, dirs, files in os.walk(directory):
+            # 불필요한 디렉토리 제외
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in _SKIP_DIRS]
+            for file in sorted(files):
+                if language_for_path(file):
+                    paths.append(os.path.join(root, file))
+
+        languages = [language_for_path(path) for path in paths]
+        results = self.extract_many([_read_source(path) for path in paths], languages)
+        all_functions = {}
+        for path, result in zip(paths, results):
+            if result['error']:
+                print(f"파일 처리 오류 ({path}): {result['error']}")
+            elif result['functions']:
+                all_functions[path] = result['functions']
+        return all_functions
+
+    def extract_many(self, sources: List[str], languages: Optional[List[str]] = None) -> List[Dict]:
+        """여러 소스를 프로세스 풀에서 병렬로 추출
+
+        입력 순서대로 {'functions': [...], 'spans': [...], 'elapsed': 초, 'error': 오류 메시지 또는 None}
+        형태의 결과를 반환한다. 파일이 하나뿐이면 현재 프로세스에서 처리한다.
+        spans는 extract_incremental에 그대로 넘길 수 있다 (C/C++만, 다른 언어는 빈 목록).
+        languages를 생략하면 모두 C/C++로 본다. 캐시에 있는 파일은 풀에 보내지 않는다.
+        """
+        languages = languages or ['cpp'] * len(sources)
+        results, misses = self._lookup_many(sources, languages)
+        codes = [sources[i] for i in misses]
+        langs = [languages[i] for i in misses]
+        if len(codes) < 2:
+            extracted = [_extract_timed(code, lang) for code, lang in zip(codes, langs)]
+        else:
+            extracted = None
+            for _ in range(2):
+                pool = _get_process_pool()
+                try:
+                    extracted = list(pool.map(_extract_timed, codes, langs))
+                    break
+                except BrokenProcessPool:
+                    _reset_process_pool(pool)
+            if extracted is None:
+                print("⚠️ 추출 프로세스 풀을 쓸 수 없어 현재 프로세스에서 추출")
+                extracted = [_extract_timed(code, lang) for code, lang in zip(codes, langs)]
+        return self._merge_many(sources, languages, results, misses, extracted)
+
+    async def extract_many_async(self, sources: List[str], languages: Optional[List[str]] = None) -> List[Dict]:
+        """extract_many의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        loop = asyncio.get_running_loop()
+        languages = languages or ['cpp'] * len(sources)
+        # 해시 계산과 캐시 조회/저장도 스레드에서 실행
+        results, misses = await asyncio.to_thread(self._lookup_many, sources, languages)
+        jobs = [(sources[i], languages[i]) for i in misses]
+        if len(jobs) < 2:
+            extracted = [await loop.run_in_executor(None, _extract_timed, *job) for job in jobs]
+        else:
+            extracted = None
+            for _ in range(2):
+                pool = _get_process_pool()
+                try:
+                    extracted = await asyncio.gather(*(loop.run_in_executor(pool, _extract_timed, *job) for job in jobs))
+                    break
+                except BrokenProcessPool:
+                    _reset_process_pool(pool)
+            if extracted is None:
+                print("⚠️ 추출 프로세스 풀을 쓸 수 없어 스레드에서 추출")
+                extracted = [await loop.run_in_executor(None, _extract_timed, *job) for job in jobs]
+        return await asyncio.to_thread(self._merge_many, sources, languages, results, misses, extracted)
+
+    def _lookup_many(self, sources: List[str], languages: List[str]) -> tuple:
+        """캐시에 있는 소스는 바로 결과를 만들고, 없는 소스의 인덱스 목록 반환"""
+        results = [None] * len(sources)
+        misses = []
+        for i, (code, language) in enumerate(zip(sources, languages)):
+            started = time.perf_counter()
+            if language == 'cpp':
+                spans = self._cached_spans(code)
+                functions = None if spans is None else [span.to_dict() for span in spans]
             else:
-                i += 1
-        
-        return functions
-    
-    def _extract_function_declaration(self, lines: List[str], start_line: int) -> tuple:
-        """함수 선언 추출 (여러 줄 지원)"""
-        declaration_lines = []
-        
-        # 함수 선언이 여러 줄에 걸쳐 있을 수 있음
-        for i in range(start_line, min(start_line + 5, len(lines))):
-            line = lines[i].strip()
-            if not line or line.startswith('//'):
+                spans = []
+                functions = self.cache.get(_cache_key(code, language)) if self.cache is not None else None
+            if functions is None:
+                misses.append(i)
+                continue
+            results[i] = {
+                'functions': functions,
+                'spans': spans,
+                'elapsed': round(time.perf_counter() - started, 4),
+                'error': None,
+                'cached': True
+            }
+        return results, misses
+
+    def _merge_many(self, sources: List[str], languages: List[str], results: List,
+                    misses: List[int], extracted: List[Dict]) -> List[Dict]:
+        """풀에서 추출한 결과를 span으로 복원하고 캐시에 저장한 뒤 입력 순서로 합침"""
+        for i, result in zip(misses, extracted):
+            code = sources[i]
+            language = languages[i]
+            if self.cache is not None and not result['error']:
+                value = result['offsets'] if language == 'cpp' else result['functions']
+                self.cache.set(_cache_key(code, language), value)
+            results[i] = _attach_spans(code, result)
+            results[i]['cached'] = False
+        return results
+
+    def extract_spans(self, code: str) -> List['FunctionSpan']:
+        """소스 코드에서 함수 위치(FunctionSpan) 목록 추출
+
+        각 span은 code 문자열을 공유하고 오프셋만 저장하므로,
+        코드 텍스트는 호출자가 필요로 할 때만 만들어진다.
+        캐시가 있으면 같은 내용의 파일은 다시 파싱하지 않는다.
+        """
+        spans = self._cached_spans(code)
+        if spans is None:
+            regions = _build_region_map(code, len(code) >= BRACE_INDEX_MIN_SIZE)
+            spans = self._scan(code, 0, len(code), _LineCounter(code), regions)[0]
+            if self.cache is not None:
+                self.cache.set(_cache_key(code), [span.offsets() for span in spans])
+        return spans
+
+    def _cached_spans(self, code: str) -> Optional[List['FunctionSpan']]:
+        """캐시된 오프셋으로 span 복원 (캐시가 없거나 미스면 None)"""
+        if self.cache is None:
+            return None
+        offsets = self.cache.get(_cache_key(code))
+        if offsets is None:
+            return None
+        return [FunctionSpan(code, *item) for item in offsets]
+
+    def extract_incremental(self, previous: List['FunctionSpan'], code: str) -> Dict:
+        """이전 extract_spans 결과와 새 텍스트로 변경된 영역만 다시 추출
+
+        변경되지 않은 함수는 오프셋만 옮기고, 변경된 줄이 포함된
+        구간(변경되지 않은 함수 사이의 선언 영역)만 다시 스캔한다.
+        여러 줄에 걸친 주석/raw 문자열이나 전처리 지시문이 바뀌었거나
+        다시 스캔한 구간이 깔끔하게 끝나지 않으면 전체를 다시 추출한다.
+
+        반환: {'spans': 새 텍스트 기준 전체 span, 'added': [...], 'modified': [...],
+               'removed': [이전 span...], 'full_parse': 전체 재추출 여부}
+        """
+        if not previous:
+            spans = self.extract_spans(code)
+            return {'spans': spans, 'added': list(spans), 'modified': [], 'removed': [], 'full_parse': True}
+
+        old_code = previous[0].source
+        old_lines = old_code.split('\n')
+        new_lines = code.split('\n')
+        old_starts = _line_starts(old_lines)
+        new_starts = _line_starts(new_lines)
+        equal_blocks, changes = _diff_lines(old_lines, new_lines)
+
+        if not _is_local_change(old_lines, new_lines, changes):
+            spans = self.extract_spans(code)
+            return self._classify(previous, spans, spans, True)
+
+        # 변경 없는 줄 블록 안에 완전히 들어가는 함수는 위치만 이동
+        block_firsts = [block[0] for block in equal_blocks]
+        kept = []
+        affected = []
+        for span in previous:
+            first = bisect.bisect_right(old_starts, span.start) - 1
+            last = bisect.bisect_right(old_starts, span.end - 1) - 1
+            idx = bisect.bisect_right(block_firsts, first) - 1
+            if idx >= 0 and last < equal_blocks[idx][1]:
+                i1, _, j1, _ = equal_blocks[idx]
+                kept.append(span.shifted(code, new_starts[j1] - old_starts[i1], j1 - i1))
+            else:
+                affected.append(span)
+
+        # 유지된 함수 사이의 구간 중 변경된 줄이 있는 곳만 다시 스캔
+        # (삭제만 된 곳은 앞뒤 줄을 모두 변경된 것으로 본다)
+        dirty = [(j1 - 1 if j1 == j2 else j1, max(j2, j1 + 1)) for j1, j2, _, _ in changes]
+        reparsed = []
+        regions = _build_region_map(code, False)
+        gap_start = 0
+        for span in kept + [None]:
+            gap_end = span.start if span else len(code)
+            first_line = bisect.bisect_right(new_starts, gap_start) - 1
+            last_line = bisect.bisect_right(new_starts, max(gap_start, gap_end - 1)) - 1
+            if any(lo <= last_line and hi > first_line for lo, hi in dirty):
+                line_of = _LineCounter(code, gap_start, first_line + 1)
+                spans, clean, _ = self._scan(code, gap_start, gap_end, line_of, regions)
+                if not clean:
+                    spans = self.extract_spans(code)
+                    return self._classify(previous, spans, spans, True)
+                reparsed.extend(spans)
+            if span:
+                gap_start = span.end
+
+        all_spans = sorted(kept + reparsed, key=lambda s: s.start)
+        return self._classify(affected, reparsed, all_spans, False)
+
+    def _classify(self, old_spans: List['FunctionSpan'], new_spans: List['FunctionSpan'],
+                  all_spans: List['FunctionSpan'], full_parse: bool) -> Dict:
+        """이름 기준으로 이전/새 span을 짝지어 추가/수정/삭제 분류"""
+        remaining = {}
+        for span in old_spans:
+            remaining.setdefault(span.name, []).append(span)
+
+        added = []
+        modified = []
+        for span in new_spans:
+            candidates = remaining.get(span.name)
+            if not candidates:
+                added.append(span)
                 continue
-                
-            declaration_lines.append(line)
-            
-            # 여는 중괄호를 찾으면 함수 시작
-            if '{' in line:
+            old = candidates.pop(0)
+            if old.code != span.code:
+                modified.append(span)
+
+        removed = [span for spans in remaining.values() for span in spans]
+        removed.sort(key=lambda s: s.start)
+        return {'spans': all_spans, 'added': added, 'modified': modified,
+                'removed': removed, 'full_parse': full_parse}
+
+    def _scan(self, code: str, pos: int, endpos: int, line_of, regions: Optional['_RegionMap'] = None) -> tuple:
+        """code[pos:endpos] 구간을 선언 단위로 스캔
+
+        regions가 있으면 (_build_region_map) 비활성 전처리 분기는 건너뛰고,
+        중괄호 인덱스가 있으면 함수 본문 끝을 사전에서 바로 찾는다.
+
+        반환: (span 목록, 구간이 선언 경계에서 깔끔하게 끝났는지 여부,
+               마지막 선언 경계 위치 - 이 앞까지의 결과는 뒤에 오는 텍스트와 무관)
+        """
+        spans = []
+        match = _TOKEN_RE.match
+        clean = True
+        boundary = pos
+
+        scopes = []     # namespace / extern 블록 스택
+        stmt = []       # 현재 선언문에 속한 (종류, 텍스트, 시작, 끝) 토큰들
+        disabled = regions.disabled if regions else None
+        braces = regions.braces if regions else None
+
+        while pos < endpos:
+            m = match(code, pos, endpos)
+            kind = m.lastgroup
+            pos = m.end()
+            if kind == 'eof':
                 break
-        
-        if not declaration_lines:
+            start = m.start(kind)
+
+            if kind == 'hash' and _at_line_start(code, start):
+                # 비활성 분기(#if 0, #ifdef _WIN32 등)는 다음 분기 지시문까지 건너뜀
+                branch_end = disabled.get(start) if disabled else None
+                if branch_end is not None and branch_end <= endpos:
+                    pos = branch_end
+                    continue
+                # 전처리 지시문은 선언 구조와 무관하므로 통째로 건너뜀
+                pos = _DIRECTIVE_RE.match(code, pos, endpos).end()
+                continue
+
+            text = m.group(kind)
+            if text == ';':
+                stmt = []
+                boundary = pos
+            elif text == '}':
+                if scopes:
+                    scopes.pop()
+                stmt = []
+                boundary = pos
+            elif text == '{':
+                scope = self._scope_kind(stmt)
+                if scope:
+                    scopes.append(scope)
+                    boundary = pos
+                else:
+                    body_end = braces.get(pos) if braces else None
+                    if body_end is None or body_end > endpos:
+                        body_end = self._skip_body(code, pos, endpos, disabled)
+                    if body_end is None:
+                        body_end = endpos
+                        clean = False
+                    else:
+                        boundary = body_end
+                    span = self._build_span(code, stmt, body_end, line_of)
+                    if span:
+                        spans.append(span)
+                    pos = body_end
+                stmt = []
+            else:
+                stmt.append((kind, text, start, pos))
+
+        return spans, clean and not stmt, boundary
+
+    def _scope_kind(self, stmt: List[tuple]) -> Optional[str]:
+        """여는 중괄호가 함수를 담을 수 있는 스코프(namespace, extern "C")를 여는지 판단"""
+        if not stmt:
             return None
-            
-        # 선언 합치기
-        full_declaration = ' '.join(declaration_lines)
-        
-        # 중괄호 앞까지만 추출
-        if '{' in full_declaration:
-            full_declaration = full_declaration.split('{')[0].strip()
-        
-        # 패턴 매칭
-        for pattern in self.function_patterns:
-            match = re.search(pattern, full_declaration)
-            if match:
-                return_type = match.group(1).strip()
-                func_name = match.group(2).strip()
-                params = match.group(3).strip()
-                
-                # 원본 시그니처 그대로 사용
-                original_signature = f"{return_type} {func_name}({params})"
-                header_signature = f"LIBRARY_API {return_type} {func_name}({params});"
-                
-                return ({
-                    'name': func_name,
-                    'description': f'{func_name} 함수',
-                    'parameters': params if params else 'void',
-                    'return_type': f'{return_type} - 함수 반환값',
-                    'purpose': f'{func_name} 함수의 기능을 수행합니다',
-                    'header_declaration': header_signature,
-                    'original_signature': original_signature,  # 원본 시그니처 보존
-                    'line': start_line + 1
-                }, start_line + len(declaration_lines) - 1)
-        
+        first = stmt[0][1]
+        if first == 'namespace' or (first == 'inline' and len(stmt) > 1 and stmt[1][1] == 'namespace'):
+            return 'namespace'
+        if first == 'extern' and len(stmt) == 2 and stmt[1][0] == 'string':
+            return 'extern'
         return None
-    
-    def _extract_function_body(self, lines: List[str], start_line: int) -> str:
-        """함수 본문 추출 (중괄호 매칭)"""
-        body_lines = []
-        brace_count = 0
-        started = False
-        
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            body_lines.append(line)
-            
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                    started = True
-                elif char == '}':
-                    brace_count -= 1
-                    
-            if started and brace_count == 0:
+
+    def _skip_body(self, code: str, pos: int, endpos: int,
+                   disabled: Optional[Dict[int, int]] = None) -> Optional[int]:
+        """여는 중괄호 다음 위치에서 짝이 맞는 닫는 중괄호 다음 위치를 반환 (없으면 None)
+
+        disabled의 비활성 전처리 분기 안의 중괄호는 세지 않는다.
+        """
+        depth = 1
+        search = _BODY_SCAN_RE.search
+        while True:
+            m = search(code, pos, endpos)
+            if not m:
+                return None
+            start = pos = m.end()
+            char = code[start - 1]
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return pos
+            elif char == '/':
+                comment = _COMMENT_RE.match(code, start - 1, endpos)
+                if comment:
+                    pos = comment.end()
+            elif char == '"':
+                if code[start - 2:start - 1] == 'R':
+                    raw = _RAW_STRING_RE.match(code, start - 2, endpos)
+                    if raw:
+                        pos = raw.end()
+                        continue
+                pos = _STRING_RE.match(code, start - 1, endpos).end()
+            elif char == "'":
+                # 1'000 같은 숫자 구분자는 문자 리터럴이 아님
+                prev = code[start - 2:start - 1]
+                if not (prev.isalnum() or prev in ('_', '.')):
+                    pos = _CHAR_RE.match(code, start - 1, endpos).end()
+            else:
+                branch_end = disabled.get(start - 1) if disabled else None
+                if branch_end is not None and branch_end <= endpos:
+                    pos = branch_end
+                else:
+                    pos = _DIRECTIVE_RE.match(code, pos, endpos).end()
+
+    def _match_definition(self, stmt: List[tuple]) -> Optional[tuple]:
+        """선언문 토큰에서 (이름 인덱스, 여는 괄호 인덱스, 닫는 괄호 인덱스) 찾기"""
+        depth = 0
+        for idx, tok in enumerate(stmt):
+            text = tok[1]
+            if text == '(':
+                if depth == 0 and idx > 0:
+                    prev = stmt[idx - 1]
+                    if prev[0] == 'ident' and prev[1] not in _NON_NAMES:
+                        close = self._match_paren(stmt, idx)
+                        if close is None:
+                            return None
+                        trailer = self._check_trailer(stmt, close + 1)
+                        if trailer == 'ctor':
+                            return None
+                        if trailer:
+                            return idx - 1, idx, close
+                depth += 1
+            elif text == ')':
+                depth -= 1
+        return None
+
+    def _match_paren(self, stmt: List[tuple], open_idx: int) -> Optional[int]:
+        depth = 0
+        for idx in range(open_idx, len(stmt)):
+            text = stmt[idx][1]
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    return idx
+        return None
+
+    def _check_trailer(self, stmt: List[tuple], idx: int):
+        """닫는 괄호 뒤 토큰이 함수 한정자로만 이루어졌는지 확인"""
+        while idx < len(stmt):
+            text = stmt[idx][1]
+            if text in _TRAILERS:
+                idx += 1
+            elif text in _TRAILER_GROUPS:
+                idx += 1
+                if idx < len(stmt) and stmt[idx][1] == '(':
+                    close = self._match_paren(stmt, idx)
+                    if close is None:
+                        return False
+                    idx = close + 1
+            elif text == '->':
+                return True
+            elif text == ':':
+                return 'ctor'
+            else:
+                return False
+        return True
+
+    def _return_type_start(self, stmt: List[tuple], name_idx: int) -> int:
+        """함수 이름 앞에서 반환 타입이 시작되는 토큰 인덱스"""
+        idx = name_idx - 1
+        angle = 0
+        while idx >= 0:
+            kind, text = stmt[idx][0], stmt[idx][1]
+            if angle:
+                if text == '>':
+                    angle += 1
+                elif text == '<':
+                    angle -= 1
+                elif text in ('{', '}', ';'):
+                    break
+            elif text == '>':
+                angle = 1
+            elif not (kind == 'ident' or text in ('::', '*', '&', '&&')):
                 break
-                
-        return '\n'.join(body_lines)
-    
-    def _find_function_end(self, lines: List[str], start_line: int) -> int:
-        """함수 끝 위치 찾기"""
-        brace_count = 0
-        started = False
-        
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                    started = True
-                elif char == '}':
-                    brace_count -= 1
-                    
-            if started and brace_count == 0:
-                return i
-                
-        return len(lines) - 1
-    
+            idx -= 1
+        return idx + 1
+
+    def _build_span(self, code: str, stmt: List[tuple], body_end: int, line_of) -> Optional['FunctionSpan']:
+        """선언문 토큰과 본문 범위로 함수 span 생성"""
+        definition = self._match_definition(stmt)
+        if not definition:
+            return None
+        name_idx, open_idx, close_idx = definition
+        func_name = stmt[name_idx][1]
+
+        # 클래스 멤버 정의(Foo::bar)와 소멸자는 독립 함수로 내보낼 수 없음
+        if name_idx > 0 and stmt[name_idx - 1][1] in ('::', '~'):
+            return None
+
+        code_start_idx = self._return_type_start(stmt, name_idx)
+        if code_start_idx == name_idx:
+            return None
+
+        # 템플릿 함수 완전 제외 (DLL 빌드 불가)
+        if any(tok[1] == 'template' for tok in stmt):
+            print(f"❌ 템플릿 함수 제외: {func_name} (DLL 빌드 불가)")
+            return None
+
+        # main, WinMain 등 엔트리 포인트 제외
+        if func_name in _ENTRY_POINTS:
+            return None
+
+        # inline, static 등 지정자는 반환 타입에서 제외 (코드에는 그대로 남김)
+        sig_idx = code_start_idx
+        while sig_idx < name_idx and stmt[sig_idx][1] in _SPECIFIERS:
+            sig_idx += 1
+        if sig_idx == name_idx:
+            return None
+
+        start = stmt[code_start_idx][2]
+        return FunctionSpan(
+            code, start, body_end,
+            stmt[sig_idx][2], stmt[close_idx][3], stmt[-1][3],
+            stmt[name_idx][2], stmt[name_idx][3],
+            stmt[open_idx][3],
+            line_of(start)
+        )
+
     def generate_header(self, functions: List[Dict]) -> str:
         """헤더 파일 생성"""
         header = """#ifndef UTILITY_LIBRARY_H
@@ -165,10 +696,10 @@ extern "C" {
 
 // 함수 선언
 """
-        
+
         for func in functions:
             header += f"{func['header_declaration']}\n"
-        
+
         header += """
 #ifdef __cplusplus
 }
@@ -176,5 +707,567 @@ extern "C" {
 
 #endif // UTILITY_LIBRARY_H
 """
-        
+
         return header
+
+
+class FunctionSpan:
+    """공유 소스 버퍼 위의 함수 위치 정보
+
+    오프셋은 모두 source 문자열 기준이며 끝 오프셋은 포함하지 않는다.
+    - start, end: 함수 전체 (지정자 ~ 닫는 중괄호)
+    - sig_start, sig_end: 원본 시그니처 (반환 타입 ~ 닫는 괄호)
+    - decl_end: 본문 앞 선언 끝 (sig_end ~ decl_end는 noexcept, -> 반환 타입 등 뒤쪽 한정자)
+    - name_start, name_end: 함수 이름
+    - params_start: 여는 괄호 바로 다음 (매개변수는 params_start ~ sig_end - 1)
+    """
+
+    __slots__ = ('source', 'start', 'end', 'sig_start', 'sig_end', 'decl_end',
+                 'name_start', 'name_end', 'params_start', 'line')
+
+    def __init__(self, source: str, start: int, end: int, sig_start: int, sig_end: int, decl_end: int,
+                 name_start: int, name_end: int, params_start: int, line: int):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.sig_start = sig_start
+        self.sig_end = sig_end
+        self.decl_end = decl_end
+        self.name_start = name_start
+        self.name_end = name_end
+        self.params_start = params_start
+        self.line = line
+
+    @property
+    def name(self) -> str:
+        return self.source[self.name_start:self.name_end]
+
+    @property
+    def code(self) -> str:
+        return self.source[self.start:self.end]
+
+    @property
+    def return_type(self) -> str:
+        return ' '.join(self.source[self.sig_start:self.name_start].split())
+
+    @property
+    def parameters(self) -> str:
+        return ' '.join(self.source[self.params_start:self.sig_end - 1].split())
+
+    @property
+    def trailer(self) -> str:
+        """닫는 괄호 뒤 한정자와 후행 반환 타입 (예: 'noexcept -> int', 없으면 빈 문자열)"""
+        return ' '.join(self.source[self.sig_end:self.decl_end].split())
+
+    @property
+    def signature(self) -> str:
+        """원본 시그니처 (공백 정규화)"""
+        return _with_trailer(f"{self.return_type} {self.name}({self.parameters})", self.trailer)
+
+    def offsets(self) -> tuple:
+        """소스 문자열을 제외한 위치 정보 (프로세스 간 전달용)"""
+        return (self.start, self.end, self.sig_start, self.sig_end, self.decl_end,
+                self.name_start, self.name_end, self.params_start, self.line)
+
+    def shifted(self, source: str, offset: int, lines: int) -> 'FunctionSpan':
+        """같은 함수가 새 소스에서 offset 문자, lines 줄 이동한 위치의 span"""
+        return FunctionSpan(
+            source, self.start + offset, self.end + offset,
+            self.sig_start + offset, self.sig_end + offset, self.decl_end + offset,
+            self.name_start + offset, self.name_end + offset,
+            self.params_start + offset, self.line + lines
+        )
+
+    def to_dict(self) -> Dict:
+        """기존 extract_functions 결과와 같은 형태의 dict로 변환"""
+        func_name = self.name
+        return_type = self.return_type
+        params = self.parameters
+        signature = _with_trailer(f"{return_type} {func_name}({params})", self.trailer)
+        return {
+            'name': func_name,
+            'description': f'{func_name} 함수',
+            'parameters': params if params else 'void',
+            'return_type': f'{return_type} - 함수 반환값',
+            'purpose': f'{func_name} 함수의 기능을 수행합니다',
+            'header_declaration': f"LIBRARY_API {signature};",
+            'original_signature': signature,  # 원본 시그니처 보존 (후행 반환 타입 포함)
+            'line': self.line,
+            'line_number': self.line,
+            'docstring': leading_comment(self.source, self.start),
+            'language': 'cpp',
+            'code': self.code
+        }
+
+    def __repr__(self):
+        return f"FunctionSpan({self.name!r}, line={self.line}, {self.start}:{self.end})"
+
+
+def _with_trailer(signature: str, trailer: str) -> str:
+    return f"{signature} {trailer}" if trailer else signature
+
+
+class _LineCounter:
+    """오프셋을 1부터 시작하는 줄 번호로 변환 (오름차순 조회 시 전체 선형 비용)"""
+
+    def __init__(self, code: str, offset: int = 0, line: int = 1):
+        self.code = code
+        self.offset = offset
+        self.line = line
+
+    def __call__(self, offset: int) -> int:
+        if offset >= self.offset:
+            self.line += self.code.count('\n', self.offset, offset)
+        else:
+            self.line -= self.code.count('\n', offset, self.offset)
+        self.offset = offset
+        return self.line
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    """split('\\n') 결과에서 각 줄의 시작 오프셋 목록"""
+    starts = [0]
+    offset = 0
+    for line in lines:
+        offset += len(line) + 1
+        starts.append(offset)
+    return starts
+
+
+def _diff_lines(old_lines: List[str], new_lines: List[str]) -> tuple:
+    """줄 단위 diff
+
+    반환: (같은 줄 블록 [(i1, i2, j1, j2)], 변경 범위 [(새 j1, j2, 이전 i1, i2)])
+    공통 앞/뒤 부분을 먼저 잘라내서 몇 줄만 바뀐 큰 파일도 빠르게 비교한다.
+    """
+    old_len, new_len = len(old_lines), len(new_lines)
+    prefix = 0
+    limit = min(old_len, new_len)
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < limit - prefix
+           and old_lines[old_len - 1 - suffix] == new_lines[new_len - 1 - suffix]):
+        suffix += 1
+
+    matcher = difflib.SequenceMatcher(None, old_lines[prefix:old_len - suffix],
+                                      new_lines[prefix:new_len - suffix], autojunk=False)
+    equal_blocks = []
+    changes = []
+    if prefix:
+        equal_blocks.append((0, prefix, 0, prefix))
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            equal_blocks.append((i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+        else:
+            changes.append((j1 + prefix, j2 + prefix, i1 + prefix, i2 + prefix))
+    if suffix:
+        equal_blocks.append((old_len - suffix, old_len, new_len - suffix, new_len))
+    return equal_blocks, changes
+
+
+def _is_local_change(old_lines: List[str], new_lines: List[str], changes: List[tuple]) -> bool:
+    """변경이 줄 경계를 넘는 구문(블록 주석, raw 문자열, 줄 연결, 전처리 분기)을 건드리지 않는지 확인"""
+    for j1, j2, i1, i2 in changes:
+        for line in old_lines[i1:i2] + new_lines[j1:j2]:
+            if ('/*' in line or '*/' in line or 'R"' in line or line.rstrip().endswith('\\')
+                    or line.lstrip().startswith('#')):
+                return False
+    return True
+
+
+def _at_line_start(code: str, pos: int) -> bool:
+    """pos 앞에 같은 줄의 공백 외 문자가 없는지 확인"""
+    line_start = code.rfind('\n', 0, pos) + 1
+    return not code[line_start:pos].strip()
+
+
+class _RegionMap:
+    """파일마다 한 번 계산하는 영역 맵
+
+    disabled: 비활성 분기를 시작하는 지시문의 # 위치 -> 그 분기를 끝내는 지시문의 # 위치
+    braces: 여는 중괄호 다음 위치 -> 짝이 맞는 닫는 중괄호 다음 위치 (NumPy, 큰 파일만)
+    """
+    __slots__ = ('disabled', 'braces')
+
+    def __init__(self, disabled: Dict[int, int], braces: Optional[Dict[int, int]]):
+        self.disabled = disabled
+        self.braces = braces
+
+
+def _build_region_map(code: str, with_braces: bool) -> Optional[_RegionMap]:
+    """주석/문자열을 구분하는 한 번의 정규식 스캔으로 영역 맵 생성
+
+    조건부 컴파일 지시문이 없고 중괄호 인덱스도 필요 없으면 None (추가 비용 없음).
+    """
+    has_conditionals = _CONDITIONAL_RE.search(code) is not None
+    with_braces = with_braces and np is not None
+    if not (has_conditionals or with_braces):
+        return None
+
+    bounds = [m.span() for m in _MASK_RE.finditer(code)]
+    disabled = _disabled_branches(code, bounds) if has_conditionals else {}
+    braces = _build_brace_index(code, bounds, disabled) if with_braces else None
+    return _RegionMap(disabled, braces)
+
+
+def _disabled_branches(code: str, bounds: List[tuple],
+                       state: Optional['_ConditionalState'] = None) -> Dict[int, int]:
+    """#if/#elif/#else/#endif를 /build 대상 기준으로 평가해 비활성 분기 구간 계산
+
+    state를 넘기면 그 상태에서 이어서 평가하고 state를 갱신한다 (스트리밍 추출).
+    """
+    if state is None:
+        state = _ConditionalState()
+    disabled = {}
+    for start, end in bounds:
+        if code[start] != '#' or not _at_line_start(code, start):
+            continue
+        branch = state.feed(start, code[start + 1:end])
+        if branch:
+            disabled[branch[0]] = branch[1]
+
+    # 닫히지 않은 비활성 분기는 파일 끝까지
+    for frame in state.stack:
+        if frame[0] and frame[3] is not None:
+            disabled[frame[3]] = len(code)
+    return disabled
+
+
+class _ConditionalState:
+    """조건부 컴파일 지시문을 하나씩 평가하는 상태 (#define/#undef 포함)
+
+    알 수 없는 조건은 첫 분기를 활성으로 보고 나머지 분기를 비활성으로 둔다
+    (같은 함수의 플랫폼별 정의가 중복으로 추출되지 않도록).
+    """
+
+    def __init__(self):
+        self.defines = dict(_TARGET_MACROS)
+        self.undefined = set(_TARGET_UNDEFINED)
+        # [바깥 활성 여부, 활성 분기를 이미 골랐는지, 현재 분기 활성 여부, 비활성 시작 위치]
+        self.stack = []
+
+    def copy(self) -> '_ConditionalState':
+        state = _ConditionalState()
+        state.defines = dict(self.defines)
+        state.undefined = set(self.undefined)
+        state.stack = [list(frame) for frame in self.stack]
+        return state
+
+    def feed(self, start: int, body: str) -> Optional[tuple]:
+        """start 위치의 지시문(# 다음 내용) 처리
+
+        반환: 이 지시문에서 끝나는 비활성 분기가 있으면 (비활성 시작 위치, start)
+        """
+        text = _PP_COMMENT_RE.sub(' ', re.sub(r'\\\r?\n', ' ', body)).strip()
+        directive, rest = re.match(r'(\w*)(.*)', text, re.DOTALL).groups()
+        rest = rest.strip()
+        stack = self.stack
+        active = stack[-1][2] if stack else True
+
+        if directive in ('if', 'ifdef', 'ifndef'):
+            if not active:
+                stack.append([False, True, False, None])
+                return None
+            if directive == 'if':
+                value = _ConditionParser(rest, self.defines, self.undefined).evaluate()
+            else:
+                value = _ConditionParser(f"defined {rest.split()[0] if rest else ''}",
+                                         self.defines, self.undefined).evaluate()
+                if directive == 'ifndef' and value is not None:
+                    value = not value
+            taken = value is not False
+            stack.append([True, taken, taken, None if taken else start])
+
+        elif directive in ('elif', 'else') and stack:
+            frame = stack[-1]
+            if not frame[0]:
+                return None
+            if frame[2]:
+                # 이미 활성 분기를 지났으므로 이후 분기는 모두 비활성
+                frame[2] = False
+                frame[3] = start
+            elif not frame[1]:
+                value = _ConditionParser(rest, self.defines, self.undefined).evaluate() if directive == 'elif' else True
+                if value is not False:
+                    branch = (frame[3], start)
+                    frame[1] = frame[2] = True
+                    frame[3] = None
+                    return branch
+
+        elif directive == 'endif' and stack:
+            frame = stack.pop()
+            if frame[0] and frame[3] is not None:
+                return (frame[3], start)
+
+        elif directive == 'define' and active and rest:
+            name, _, value = rest.partition(' ')
+            name = name.split('(')[0]
+            self.defines[name] = int(value) if value.strip().isdigit() else None
+            self.undefined.discard(name)
+
+        elif directive == 'undef' and active and rest:
+            self.defines.pop(rest.split()[0], None)
+            self.undefined.add(rest.split()[0])
+        return None
+
+
+class _ConditionParser:
+    """#if 조건식 평가기 (결과: True / False / None=알 수 없음)
+
+    defined, !, &&, ||, 비교 연산, 괄호, 정수만 지원하며
+    그 밖의 연산이 있으면 알 수 없음으로 본다.
+    """
+
+    def __init__(self, expr: str, defines: Dict, undefined: set):
+        self.expr = expr
+        self.tokens = []
+        self.pos = 0
+        self.defines = defines
+        self.undefined = undefined
+
+    def evaluate(self) -> Optional[bool]:
+        try:
+            self._tokenize()
+            value = self._or()
+        except (IndexError, ValueError):
+            return None
+        if self.pos != len(self.tokens) or value is None:
+            return None
+        return bool(value)
+
+    def _tokenize(self):
+        expr = self.expr
+        pos = 0
+        while expr[pos:].strip():
+            m = _PP_TOKEN_RE.match(expr, pos)
+            if not m:
+                raise ValueError(expr[pos:])
+            number, ident, op = m.groups()
+            if number:
+                base = 16 if number[:2] in ('0x', '0X') else 8 if number.startswith('0') else 10
+                self.tokens.append(('number', int(number, base)))
+            elif ident:
+                self.tokens.append(('ident', ident))
+            else:
+                self.tokens.append(('op', op))
+            pos = m.end()
+
+    def _peek(self) -> Optional[str]:
+        if self.pos < len(self.tokens) and self.tokens[self.pos][0] == 'op':
+            return self.tokens[self.pos][1]
+        return None
+
+    def _or(self):
+        values = [self._and()]
+        while self._peek() == '||':
+            self.pos += 1
+            values.append(self._and())
+        if len(values) == 1:
+            return values[0]
+        if any(v for v in values if v is not None):
+            return 1
+        return None if None in values else 0
+
+    def _and(self):
+        values = [self._compare()]
+        while self._peek() == '&&':
+            self.pos += 1
+            values.append(self._compare())
+        if len(values) == 1:
+            return values[0]
+        if any(v == 0 for v in values if v is not None):
+            return 0
+        return None if None in values else 1
+
+    def _compare(self):
+        left = self._unary()
+        op = self._peek()
+        if op not in ('==', '!=', '<', '>', '<=', '>='):
+            return left
+        self.pos += 1
+        right = self._unary()
+        if left is None or right is None:
+            return None
+        return int({'==': left == right, '!=': left != right, '<': left < right,
+                    '>': left > right, '<=': left <= right, '>=': left >= right}[op])
+
+    def _unary(self):
+        if self._peek() == '!':
+            self.pos += 1
+            value = self._unary()
+            return None if value is None else int(not value)
+        return self._primary()
+
+    def _primary(self):
+        kind, value = self.tokens[self.pos]
+        self.pos += 1
+        if kind == 'number':
+            return value
+        if kind == 'op':
+            if value != '(':
+                raise ValueError(value)
+            result = self._or()
+            if self._peek() != ')':
+                raise ValueError(')')
+            self.pos += 1
+            return result
+        if value == 'defined':
+            paren = self._peek() == '('
+            if paren:
+                self.pos += 1
+            name = self.tokens[self.pos][1]
+            self.pos += 1
+            if paren:
+                if self._peek() != ')':
+                    raise ValueError(')')
+                self.pos += 1
+            if name in self.defines:
+                return 1
+            return 0 if name in self.undefined else None
+        if value in ('true', 'false'):
+            return int(value == 'true')
+        if value in self.defines:
+            return self.defines[value]
+        # 정의되지 않은 것이 확실한 매크로는 0으로 평가
+        return 0 if value in self.undefined else None
+
+
+def _build_brace_index(code: str, bounds: List[tuple], disabled: Dict[int, int]) -> Dict[int, int]:
+    """여는 중괄호 다음 위치 -> 짝이 맞는 닫는 중괄호 다음 위치 사전 (NumPy 필요)
+
+    주석/문자열/문자/전처리 지시문/비활성 분기를 가린 뒤 중괄호 깊이를 누적합으로 구하고,
+    (깊이, 위치) 순으로 정렬하면 각 여는 중괄호 바로 다음 항목이 짝이 된다.
+    짝이 없는 중괄호는 사전에 넣지 않는다 (_skip_body로 처리).
+    줄 처음이 아닌 곳에 #이 있으면 _skip_body와 규칙이 달라지므로 빈 사전을 반환한다.
+    """
+    chars = np.frombuffer(code.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    size = len(chars)
+    visible = np.ones(size, dtype=bool)
+    if bounds or disabled:
+        regions = np.array(bounds + list(disabled.items()), dtype=np.int64).reshape(-1, 2)
+        starts = regions[:len(bounds), 0]
+        for start in starts[chars[starts] == ord('#')].tolist():
+            if not _at_line_start(code, start):
+                return {}
+        edges = (np.bincount(regions[:, 0], minlength=size + 1)
+                 - np.bincount(regions[:, 1], minlength=size + 1))
+        visible = np.cumsum(edges[:size]) == 0
+
+    opens = np.flatnonzero((chars == ord('{')) & visible)
+    closes = np.flatnonzero((chars == ord('}')) & visible)
+    if len(opens) == 0 or len(closes) == 0:
+        return {}
+
+    # 위치 순으로 합친 뒤 깊이 계산
+    # 여는 중괄호는 연 뒤의 깊이, 닫는 중괄호는 닫기 전의 깊이가 같은 수준
+    positions = np.concatenate((opens, closes))
+    is_open = np.concatenate((np.ones(len(opens), dtype=bool), np.zeros(len(closes), dtype=bool)))
+    order = np.argsort(positions, kind='stable')
+    positions = positions[order]
+    is_open = is_open[order]
+    depth = np.cumsum(np.where(is_open, 1, -1))
+    level = depth + ~is_open
+
+    # 같은 수준 안에서 위치 순으로 놓으면 여는 중괄호 바로 다음이 짝
+    pairs = np.lexsort((positions, level))
+    positions = positions[pairs]
+    is_open = is_open[pairs]
+    level = level[pairs]
+    matched = np.flatnonzero(is_open[:-1] & ~is_open[1:] & (level[:-1] == level[1:]))
+    return dict(zip((positions[matched] + 1).tolist(), (positions[matched + 1] + 1).tolist()))
+
+
+def _stream_stable_end(text: str) -> int:
+    """닫히지 않은 raw 문자열 시작 위치 (없으면 전체 길이)
+
+    raw 문자열은 닫는 구분자가 없으면 일반 문자열로 토큰화되므로,
+    뒤 청크에서 닫힐 수 있는 부분은 다음 청크를 읽은 뒤에 스캔한다.
+    """
+    pos = 0
+    while True:
+        m = _RAW_OPEN_RE.search(text, pos)
+        if not m:
+            return len(text)
+        close = text.find(f'){m.group(1)}"', m.end())
+        if close < 0:
+            return m.start()
+        pos = close + len(m.group(1)) + 2
+
+
+def _cache_key(code: str, language: str = 'cpp') -> str:
+    """파일 내용 해시 + 언어 + 추출기 버전으로 만든 캐시 키"""
+    digest = hashlib.sha256(code.encode('utf-8', 'surrogatepass')).hexdigest()
+    return f"extract:{EXTRACTOR_VERSION}:{language}:{digest}"
+
+
+def language_for_path(path: str) -> Optional[str]:
+    """파일 확장자로 추출 언어 판단 (지원하지 않으면 None)"""
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+
+
+def _read_source(file_path: str) -> str:
+    """소스 파일 읽기 (utf-8 -> cp949 -> latin-1 순으로 디코딩)"""
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    for encoding in ('utf-8', 'cp949'):
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return content.decode('latin-1')
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _process_pool
+
+
+def _reset_process_pool(broken: Optional[ProcessPoolExecutor] = None):
+    """작업 프로세스가 죽어 깨진 풀 버리기 (다음 _get_process_pool에서 새로 생성)
+
+    broken을 주면 그 풀이 아직 현재 풀일 때만 버린다 (다른 호출이 이미 새로 만든 경우).
+    """
+    global _process_pool
+    pool = _process_pool
+    if pool is None or (broken is not None and pool is not broken):
+        return
+    _process_pool = None
+    print("⚠️ 추출 프로세스 풀이 중단되어 새로 생성")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_timed(code: str, language: str = 'cpp') -> Dict:
+    """프로세스 풀 작업 단위: 한 파일 추출 + 소요 시간 측정
+
+    span은 소스 문자열을 참조하므로 오프셋 튜플로만 돌려보내고,
+    부모 프로세스에서 _attach_spans로 다시 만든다.
+    """
+    started = time.perf_counter()
+    try:
+        if language == 'cpp':
+            spans = FunctionExtractor().extract_spans(code)
+            functions = [span.to_dict() for span in spans]
+            offsets = [span.offsets() for span in spans]
+        else:
+            functions = FunctionExtractor().extract_functions(code, language)
+            offsets = []
+        error = None
+    except Exception as e:
+        functions = []
+        offsets = []
+        error = str(e)
+    return {
+        'functions': functions,
+        'offsets': offsets,
+        'elapsed': round(time.perf_counter() - started, 4),
+        'error': error
+    }
+
+
+def _attach_spans(code: str, result: Dict) -> Dict:
+    """워커가 돌려준 오프셋 튜플을 부모 프로세스의 소스 문자열 기준 span으로 복원"""
+    result['spans'] = [FunctionSpan(code, *offsets) for offsets in result.pop('offsets')]
+    return result
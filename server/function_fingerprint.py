@@ -0,0 +1,209 @@
+import re
+import hashlib
+from typing import Dict, List, Optional, Set
+
+
+# 핑거프린트용 토큰 패턴 (주석/공백은 버리고 문자열은 내용 그대로 비교)
+_FINGERPRINT_TOKEN_RE = {
+    'default': re.compile(r'''
+        (?P<skip>\s+|//[^\n]*|/\*.*?(?:\*/|\Z))
+      | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+      | (?P<ident>[A-Za-z_]\w*)
+      | (?P<number>\d[\w.']*)
+      | (?P<op>::|->|\S)
+    ''', re.VERBOSE | re.DOTALL),
+    'python': re.compile(r'''
+        (?P<skip>\s+|\#[^\n]*)
+      | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+      | (?P<ident>[A-Za-z_]\w*)
+      | (?P<number>\d[\w.]*)
+      | (?P<op>\S)
+    ''', re.VERBOSE | re.DOTALL),
+}
+
+# 이름을 바꾸지 않는 식별자 (지원 언어 키워드와 기본 타입)
+_KEEP_IDENTIFIERS = frozenset((
+    # C/C++
+    'auto', 'bool', 'break', 'case', 'catch', 'char', 'class', 'const', 'constexpr', 'continue',
+    'default', 'delete', 'do', 'double', 'else', 'enum', 'extern', 'false', 'float', 'for',
+    'goto', 'if', 'inline', 'int', 'long', 'mutable', 'namespace', 'new', 'noexcept', 'nullptr',
+    'operator', 'private', 'protected', 'public', 'return', 'short', 'signed', 'sizeof', 'static',
+    'static_cast', 'dynamic_cast', 'reinterpret_cast', 'const_cast', 'struct', 'switch', 'template',
+    'this', 'throw', 'true', 'try', 'typedef', 'typename', 'union', 'unsigned', 'using', 'virtual',
+    'void', 'volatile', 'wchar_t', 'while', 'NULL', 'LIBRARY_API',
+    'size_t', 'ssize_t', 'int8_t', 'int16_t', 'int32_t', 'int64_t',
+    'uint8_t', 'uint16_t', 'uint32_t', 'uint64_t', 'uintptr_t', 'intptr_t',
+    # Python
+    'def', 'lambda', 'None', 'True', 'False', 'and', 'or', 'not', 'in', 'is', 'elif', 'pass',
+    'with', 'as', 'yield', 'async', 'await', 'import', 'from', 'global', 'nonlocal', 'raise',
+    'except', 'finally', 'self',
+    # Java / JavaScript / TypeScript / Go
+    'function', 'var', 'let', 'null', 'undefined', 'typeof', 'instanceof', 'final', 'abstract',
+    'extends', 'implements', 'interface', 'boolean', 'byte', 'String', 'func', 'go', 'defer',
+    'chan', 'map', 'range', 'select', 'type', 'package', 'fallthrough', 'string', 'error',
+))
+
+
+# 타입 자리에 올 수 없는 키워드 (예: 'return x;'의 x를 선언으로 보지 않도록)
+_NOT_TYPES = frozenset((
+    'return', 'case', 'goto', 'throw', 'delete', 'new', 'else', 'do', 'sizeof', 'typeof', 'instanceof',
+    'in', 'is', 'not', 'and', 'or', 'await', 'yield', 'default', 'public', 'private', 'protected', 'go',
+    'defer', 'range', 'select', 'package', 'import', 'using', 'namespace', 'break', 'continue',
+))
+# 매개변수 목록에서 이름이 타입보다 앞에 오는 언어 (a int, a: number)
+_NAME_FIRST_LANGUAGES = frozenset(('python', 'go', 'javascript', 'typescript'))
+# 선언 이름 바로 뒤에 올 수 있는 토큰 (int x; int x = 0; int x[4]; for (auto& x : xs))
+_AFTER_DECLARATION = frozenset((';', '=', '[', ':', ',', ')', '{'))
+# 선언 앞(타입 앞)에 올 수 있는 토큰
+_BEFORE_DECLARATION = frozenset(('', '(', ';', '{', '}', ','))
+
+
+def _matching(tokens: List[tuple], i: int, opening: str, closing: str, step: int) -> int:
+    """i의 괄호와 짝이 맞는 괄호 위치 (없으면 -1), step이 -1이면 앞쪽으로 찾기"""
+    depth = 0
+    while 0 <= i < len(tokens):
+        text = tokens[i][1]
+        if text == opening:
+            depth += 1
+        elif text == closing:
+            depth -= 1
+            if depth == 0:
+                return i
+        i += step
+    return -1
+
+
+def _parameter_names(tokens: List[tuple], name: Optional[str], language: str) -> Set[str]:
+    """함수 이름 뒤 첫 괄호의 매개변수 이름"""
+    open_index = next((i for i in range(len(tokens) - 1)
+                       if tokens[i + 1][1] == '(' and (not name or tokens[i][1] == name)), -1) + 1
+    if open_index <= 0:
+        return set()
+    close_index = _matching(tokens, open_index, '(', ')', 1)
+    if close_index < 0:
+        return set()
+
+    names = set()
+    segment: List[tuple] = []
+    depth = 0
+    for kind, text in tokens[open_index + 1:close_index] + [('op', ',')]:
+        if text in ('(', '[', '{', '<'):
+            depth += 1
+        elif text in (')', ']', '}', '>') and depth:
+            depth -= 1
+        if text != ',' or depth:
+            segment.append((kind, text))
+            continue
+        # 기본값과 배열 크기는 제외하고 이름 후보만
+        cut = next((i for i, (_, t) in enumerate(segment) if t in ('=', '[')), len(segment))
+        candidates = [t for k, t in segment[:cut] if k == 'ident' and t not in _KEEP_IDENTIFIERS]
+        if candidates:
+            names.add(candidates[0] if language in _NAME_FIRST_LANGUAGES else candidates[-1])
+        segment = []
+    return names
+
+
+def _declared_at(tokens: List[tuple], i: int, language: str) -> bool:
+    """tokens[i]가 지역 변수 선언의 이름인지 (언어별 간단한 패턴)"""
+    text_at = lambda j: tokens[j][1] if 0 <= j < len(tokens) else ''
+    prev_text, next_text = text_at(i - 1), text_at(i + 1)
+    if prev_text in ('.', '->', '::'):
+        return False
+
+    if language == 'python':
+        # x = ..., for x in, ... as x
+        return ((next_text == '=' and text_at(i + 2) != '=' and prev_text not in ('(', ',', '='))
+                or prev_text in ('for', 'as'))
+    if prev_text in ('let', 'var') or (prev_text == 'const' and language in ('javascript', 'typescript')):
+        return True
+    if next_text == ':' and text_at(i + 2) == '=':
+        return True         # Go: x := ...
+
+    # 타입 뒤의 이름: [앞 토큰] 타입 [* & 반복] 이름 [; = [ : , ) {]
+    if next_text not in _AFTER_DECLARATION:
+        return False
+    j = i - 1
+    while text_at(j) in ('*', '&'):
+        j -= 1
+    if text_at(j) == '>':
+        j = _matching(tokens, j, '>', '<', -1) - 1
+    if j < 0 or tokens[j][0] != 'ident' or tokens[j][1] in _NOT_TYPES:
+        return False
+    # 네임스페이스 한정 타입 (std::string)
+    while text_at(j - 1) == '::' and j >= 2 and tokens[j - 2][0] == 'ident':
+        j -= 2
+    before = text_at(j - 1)
+    return before in _BEFORE_DECLARATION or (before in _KEEP_IDENTIFIERS and before not in _NOT_TYPES)
+
+
+def function_fingerprint(code: str, name: Optional[str] = None, language: str = 'cpp') -> str:
+    """정규화한 토큰열의 해시
+
+    공백, 주석, 함수명과 선언된 이름(매개변수, 지역 변수)이 달라도 같은 값이 된다.
+    타입 이름, 전역 변수/상수, 호출하는 외부 함수, 멤버/네임스페이스 이름은 그대로 두어
+    동작이나 의존성이 다른 함수가 같은 핑거프린트를 갖지 않도록 한다.
+    """
+    token_re = _FINGERPRINT_TOKEN_RE.get(language, _FINGERPRINT_TOKEN_RE['default'])
+    tokens = [(m.lastgroup, m.group()) for m in token_re.finditer(code) if m.lastgroup != 'skip']
+
+    declared = _parameter_names(tokens, name, language)
+    declared.update(text for i, (kind, text) in enumerate(tokens)
+                    if kind == 'ident' and text not in _KEEP_IDENTIFIERS and _declared_at(tokens, i, language))
+
+    renamed = {}
+    if name:
+        renamed[name] = 'v0'
+    normalized = []
+    for i, (kind, text) in enumerate(tokens):
+        if kind == 'ident' and (text in declared or text == name):
+            prev_text = tokens[i - 1][1] if i > 0 else ''
+            next_text = tokens[i + 1][1] if i + 1 < len(tokens) else ''
+            if not (prev_text in ('.', '->', '::') or next_text == '::'):
+                text = renamed.setdefault(text, f'v{len(renamed)}')
+        normalized.append(text)
+
+    joined = '\x1f'.join([language] + normalized)
+    return hashlib.sha256(joined.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class RefactorStore:
+    """함수 핑거프린트 -> 이전 AI 리팩토링 결과 영구 저장소
+
+    cache는 get/set을 제공하는 캐시 (예: DiskCache).
+    version에는 모델 ID와 프롬프트 버전을 넣어, 바뀌면 이전 결과를 쓰지 않는다.
+    리팩토링 대상에서 빠진 함수는 빈 목록으로 저장해 다시 묻지 않는다.
+    """
+
+    def __init__(self, cache, version: str):
+        self.cache = cache
+        self.version = version
+
+    def _key(self, func: Dict) -> str:
+        fingerprint = function_fingerprint(func.get('code', ''), func.get('name'), func.get('language', 'cpp'))
+        return f"refactor:{self.version}:{fingerprint}"
+
+    def lookup(self, func: Dict) -> Optional[List[Dict]]:
+        """저장된 리팩토링 결과 (없으면 None)
+
+        이름만 다른 같은 함수면 결과의 함수명도 새 이름으로 바꿔서 돌려준다.
+        """
+        record = self.cache.get(self._key(func))
+        if record is None:
+            return None
+        source_name = record['source_name']
+        name = func.get('name')
+        utilities = record['utilities']
+        if name and source_name and name != source_name:
+            pattern = re.compile(rf'\b{re.escape(source_name)}\b')
+            for utility in utilities:
+                if utility.get('name') != source_name:
+                    continue
+                utility['name'] = name
+                for field in ('code', 'header_declaration'):
+                    if isinstance(utility.get(field), str):
+                        utility[field] = pattern.sub(name, utility[field])
+        return utilities
+
+    def record(self, func: Dict, utilities: List[Dict]):
+        """함수 하나의 리팩토링 결과 저장"""
+        self.cache.set(self._key(func), {'source_name': func.get('name'), 'utilities': utilities})
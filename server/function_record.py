@@ -0,0 +1,123 @@
+import sys
+from typing import Any, Dict, Iterator, Optional
+
+
+# 슬롯에 직접 저장하는 필드 (문자열 필드 중 파일명/언어는 intern)
+_FIELDS = ('name', 'code', 'parameters', 'return_type', 'line', 'language', 'docstring', 'source_file')
+_FIELD_SET = frozenset(_FIELDS)
+_INTERNED = frozenset(('language', 'source_file'))
+
+_RETURN_SUFFIX = ' - 함수 반환값'
+
+
+def _base_return_type(record: 'FunctionRecord') -> str:
+    return_type = record.get('return_type', '')
+    return return_type[:-len(_RETURN_SUFFIX)] if return_type.endswith(_RETURN_SUFFIX) else return_type
+
+
+def _raw_parameters(record: 'FunctionRecord') -> str:
+    parameters = record.get('parameters', '')
+    return '' if parameters == 'void' else parameters
+
+
+def _file_extension(record: 'FunctionRecord') -> Optional[str]:
+    source_file = record.get('source_file')
+    if source_file is None:
+        return None
+    return source_file.split('.')[-1] if '.' in source_file else 'txt'
+
+
+def _signature(record: 'FunctionRecord') -> str:
+    if record.get('language', 'cpp') != 'cpp' and 'original_signature' in record:
+        return record['original_signature']
+    return f"{record.get('return_type', 'void')} {record.get('name')}({record.get('parameters', '')})"
+
+
+# 다른 필드로 다시 만들 수 있는 키 (추출기와 /analyze가 채우던 값과 같으면 저장하지 않음)
+_DERIVED = (
+    ('description', lambda r: f"{r.get('name')} 함수"),
+    ('purpose', lambda r: f"{r.get('name')} 함수의 기능을 수행합니다"),
+    ('header_declaration', lambda r: f"LIBRARY_API {_base_return_type(r)} {r.get('name')}({_raw_parameters(r)});"),
+    ('original_signature', lambda r: f"{_base_return_type(r)} {r.get('name')}({_raw_parameters(r)})"),
+    ('line_number', lambda r: r.get('line')),
+    ('type', lambda r: 'function'),
+    ('file', lambda r: r.get('source_file')),
+    ('path', lambda r: r.get('source_file')),
+    ('file_extension', _file_extension),
+    ('signature', _signature),
+)
+_DERIVED_BITS = {key: 1 << bit for bit, (key, _) in enumerate(_DERIVED)}
+_DERIVED_FUNCS = dict(_DERIVED)
+
+
+class FunctionRecord:
+    """추출/리팩토링된 함수 하나를 담는 메모리 절약형 레코드
+
+    핵심 필드만 슬롯에 저장하고, description/purpose/signature/file 등
+    다른 필드로 만들 수 있는 값은 들어 있었는지만 비트로 기억했다가 조회할 때 만든다.
+    원래 값이 만든 값과 다르거나 AI가 추가한 키는 extra에 그대로 보관한다.
+    dict처럼 get/[]/in으로 읽을 수 있고, API 응답에서는 to_dict로 기존 JSON 모양을 돌려준다.
+    """
+
+    __slots__ = _FIELDS + ('_derived', '_extra')
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FunctionRecord':
+        record = cls.__new__(cls)
+        record._derived = 0
+        record._extra = None
+        for key in _FIELDS:
+            if key in data:
+                value = data[key]
+                if key in _INTERNED and isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(record, key, value)
+
+        # 만든 값이 다른 키(예: signature -> original_signature)를 참조할 수 있으므로
+        # 나머지 키를 먼저 모두 extra에 넣고, 만든 값과 같은 키만 비트로 옮긴다
+        extra = {key: value for key, value in data.items() if key not in _FIELD_SET}
+        record._extra = extra
+        for key in [key for key in extra if key in _DERIVED_FUNCS]:
+            if _DERIVED_FUNCS[key](record) == extra[key]:
+                record._derived |= _DERIVED_BITS[key]
+                del extra[key]
+        record._extra = extra or None
+        return record
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        if self._derived & _DERIVED_BITS.get(key, 0):
+            return _DERIVED_FUNCS[key](self)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self) -> Iterator[str]:
+        for key in _FIELDS:
+            if hasattr(self, key):
+                yield key
+        for key, _ in _DERIVED:
+            if self._derived & _DERIVED_BITS[key] and not (self._extra and key in self._extra):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def to_dict(self) -> Dict:
+        """API 응답용 dict (레코드로 바꾸기 전과 같은 키와 값)"""
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        return f"FunctionRecord({self.get('name')!r}, {self.get('source_file')!r})"
+
+
+_MISSING = object()
@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+# 큐별 워커 수: 짧은 대화형 작업이 오래 걸리는 일괄 작업(레포 전체 분석 등) 뒤에서 기다리지 않도록 분리
+JOB_QUEUES = {'interactive': 2, 'batch': 1}
+# 끝난 작업 기록 보관 기간 (초, 시작할 때 지난 기록 삭제)
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+# 작업 상태
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobFailed(Exception):
+    """핸들러가 실패를 알릴 때 사용 (result를 주면 실패한 작업에도 결과로 남김)"""
+
+    def __init__(self, message: str, result: Any = None):
+        super().__init__(message)
+        self.result = result
+
+
+class JobContext:
+    """실행 중인 작업 정보 (핸들러에 전달, 진행 상황 기록용)"""
+
+    def __init__(self, queue: 'JobQueue', job_id: str):
+        self._queue = queue
+        self.job_id = job_id
+
+    def progress(self, **progress):
+        """진행 상황 기록 (예: done=3, total=10), 상태 조회에 그대로 나옴"""
+        self._queue._update(self.job_id, progress=json.dumps(progress, ensure_ascii=False, default=str))
+
+
+class JobQueue:
+    """SQLite에 저장하는 우선순위 작업 큐
+
+    submit은 작업을 기록만 하고 바로 작업 ID를 돌려준다. 큐마다 정해진 수의 워커가
+    이벤트 루프에서 우선순위가 높은 작업(같으면 먼저 들어온 작업)부터 하나씩 꺼내 실행한다.
+    핸들러는 (payload, JobContext)를 받는 async 함수나 일반 함수(스레드에서 실행)이고,
+    반환값(JSON 직렬화 가능)이 작업 결과가 된다. 예외가 나면 실패로 기록한다
+    (JobFailed로 실패하면 함께 넘긴 결과도 남긴다).
+
+    작업과 결과는 SQLite에 남으므로 서버가 재시작해도 유지되고,
+    실행 중에 서버가 멈춘 작업은 다음 시작 때 다시 대기 상태로 돌아가 처음부터 실행된다.
+    실행 중인 작업을 취소하면 async 핸들러는 바로 중단되고, 스레드에서 도는 핸들러는
+    끝까지 실행되지만 결과를 버린다.
+    """
+
+    def __init__(self, path: str, queues: Optional[Dict[str, int]] = None,
+                 retention: float = JOB_RETENTION_SECONDS):
+        self.path = path
+        self.queues = dict(queues or JOB_QUEUES)
+        self._lock = threading.Lock()
+        # 작업 종류 -> (핸들러, 큐 이름)
+        self._handlers: Dict[str, tuple] = {}
+        # 실행 중인 작업 ID -> asyncio.Task
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._workers: List[asyncio.Task] = []
+        self._loop = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, queue TEXT NOT NULL, priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, progress TEXT,"
+            " created REAL NOT NULL, started REAL, finished REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs(queue, status, priority)")
+
+        with self._lock:
+            # 이전 실행에서 끝나지 못한 작업은 다시 대기열로
+            recovered = self._conn.execute(
+                "UPDATE jobs SET status = ?, started = NULL, progress = NULL WHERE status = ?", (QUEUED, RUNNING)
+            ).rowcount
+            self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))}) AND finished < ?",
+                (*FINISHED_STATES, time.time() - retention)
+            )
+        if recovered:
+            print(f"♻️ 중단된 작업 {recovered}개 다시 대기열에 추가")
+
+    def register(self, kind: str, handler: Callable, queue: str = 'batch'):
+        """작업 종류별 핸들러와 실행할 큐 등록"""
+        if queue not in self.queues:
+            raise ValueError(f"알 수 없는 큐: {queue}")
+        self._handlers[kind] = (handler, queue)
+
+    def submit(self, kind: str, payload: Dict, priority: int = 0) -> str:
+        """작업 등록 후 작업 ID 반환 (priority가 클수록 같은 큐에서 먼저 실행)"""
+        if kind not in self._handlers:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        queue = self._handlers[kind][1]
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, queue, priority, status, payload, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, queue, priority, QUEUED, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+        self._wake(queue)
+        print(f"📥 작업 등록: {kind} ({queue}) {job_id}")
+        return job_id
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Dict]:
+        """작업 상태 (없으면 None), 대기 중이면 같은 큐에서 앞에 있는 작업 수(queue_position) 포함"""
+        with self._lock:
+            row = self._conn.execute("SELECT rowid, * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = {
+                'job_id': row['id'], 'kind': row['kind'], 'queue': row['queue'], 'priority': row['priority'],
+                'status': row['status'], 'error': row['error'],
+                'progress': json.loads(row['progress']) if row['progress'] else None,
+                'created': row['created'], 'started': row['started'], 'finished': row['finished'],
+            }
+            if row['status'] == QUEUED:
+                job['queue_position'] = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE queue = ? AND status = ?"
+                    " AND (priority > ? OR (priority = ? AND rowid < ?))",
+                    (row['queue'], QUEUED, row['priority'], row['priority'], row['rowid'])
+                ).fetchone()[0]
+            if with_result:
+                job['result'] = json.loads(row['result']) if row['result'] else None
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """대기 중이거나 실행 중인 작업 취소 (이미 끝난 작업은 그대로)"""
+        with self._lock:
+            cancelled = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            ).rowcount
+        task = self._running.get(job_id)
+        if cancelled and task is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+        if cancelled:
+            print(f"🛑 작업 취소: {job_id}")
+        return self.get(job_id)
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        """최근 작업 목록 (결과 제외)"""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            )]
+        return [job for job in map(self.get, ids) if job is not None]
+
+    def stats(self) -> Dict:
+        """큐별 상태별 작업 수"""
+        stats = {queue: {} for queue in self.queues}
+        with self._lock:
+            for queue, status, count in self._conn.execute(
+                "SELECT queue, status, COUNT(*) FROM jobs GROUP BY queue, status"
+            ):
+                stats.setdefault(queue, {})[status] = count
+        return stats
+
+    async def start(self):
+        """현재 이벤트 루프에서 큐별 워커 시작"""
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        for queue, workers in self.queues.items():
+            self._wakeups[queue] = asyncio.Event()
+            for _ in range(workers):
+                self._workers.append(asyncio.ensure_future(self._worker(queue)))
+        print(f"⚙️ 작업 큐 시작: {self.queues}")
+
+    async def stop(self):
+        """워커 중지 (실행 중이던 작업은 다음 시작 때 다시 실행)"""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._loop = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _wake(self, queue: str):
+        event = self._wakeups.get(queue)
+        if event is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(event.set)
+
+    def _update(self, job_id: str, **fields):
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self, queue: str) -> Optional[sqlite3.Row]:
+        """대기 중인 작업 중 우선순위가 가장 높은 것을 실행 상태로 바꾸고 반환"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE queue = ? AND status = ? ORDER BY priority DESC, rowid LIMIT 1",
+                (queue, QUEUED)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ?",
+                                   (RUNNING, time.time(), row['id']))
+        return row
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        # 실행 중에 취소된 작업은 결과를 기록하지 않음
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 error, time.time(), job_id, RUNNING)
+            )
+
+    async def _worker(self, queue: str):
+        wakeup = self._wakeups[queue]
+        while True:
+            row = self._claim(queue)
+            if row is None:
+                wakeup.clear()
+                # clear 전에 들어온 작업을 놓치지 않도록 한 번 더 확인
+                row = self._claim(queue)
+                if row is None:
+                    await wakeup.wait()
+                    continue
+            await self._execute(row)
+
+    async def _execute(self, row: sqlite3.Row):
+        job_id, kind = row['id'], row['kind']
+        if kind not in self._handlers:
+            self._finish(job_id, FAILED, error=f"알 수 없는 작업 종류: {kind}")
+            return
+        handler = self._handlers[kind][0]
+        payload = json.loads(row['payload'])
+        context = JobContext(self, job_id)
+        if asyncio.iscoroutinefunction(handler):
+            task = asyncio.ensure_future(handler(payload, context))
+        else:
+            task = asyncio.ensure_future(asyncio.to_thread(handler, payload, context))
+
+        self._running[job_id] = task
+        started = time.time()
+        try:
+            await asyncio.wait({task})
+        finally:
+            self._running.pop(job_id, None)
+            # 워커가 중지되면 작업도 중단 (상태는 running으로 남아 재시작 후 다시 실행)
+            if not task.done():
+                task.cancel()
+
+        if task.cancelled():
+            print(f"🛑 작업 중단됨: {kind} {job_id}")
+        elif task.exception() is not None:
+            error = task.exception()
+            print(f"❌ 작업 실패: {kind} {job_id}: {error}")
+            self._finish(job_id, FAILED, result=error.result if isinstance(error, JobFailed) else None,
+                         error=str(error))
+        else:
+            print(f"✅ 작업 완료: {kind} {job_id} ({time.time() - started:.1f}초)")
+            self._finish(job_id, SUCCEEDED, result=task.result())
@@ -0,0 +1,279 @@
+"""C/C++ 이외 언어의 함수 추출기
+
+Python은 표준 라이브러리 ast로, Java/JavaScript/TypeScript/Go는 언어별
+선언 패턴과 주석/문자열을 건너뛰는 중괄호 스캐너로 파일을 한 번만 훑어서 추출한다.
+모든 추출기는 FunctionExtractor.extract_functions와 같은 형태의 dict 목록을 반환한다.
+"""
+import ast
+import re
+import textwrap
+from typing import List, Dict, Optional, Callable
+
+
+def make_function_dict(name: str, code: str, parameters: str, return_type: str,
+                       signature: str, line: int, docstring: str, language: str) -> Dict:
+    """언어 공통 함수 dict (FunctionSpan.to_dict와 같은 키)"""
+    summary = docstring.strip().split('\n')[0].strip() if docstring else ''
+    return {
+        'name': name,
+        'description': summary or f'{name} 함수',
+        'parameters': parameters,
+        'return_type': f'{return_type} - 함수 반환값' if return_type else '',
+        'purpose': f'{name} 함수의 기능을 수행합니다',
+        'header_declaration': '',   # C/C++ 외에는 DLL 헤더 선언 없음
+        'original_signature': signature,
+        'line': line,
+        'line_number': line,
+        'docstring': docstring,
+        'language': language,
+        'code': code
+    }
+
+
+def leading_comment(code: str, start: int) -> str:
+    """선언 바로 위의 주석 블록(/** ... */ 또는 연속된 // 줄)을 문서 주석으로 추출
+
+    Java 어노테이션(@Override 등) 줄은 건너뛴다.
+    선언이 줄의 처음에서 시작하지 않으면 문서 주석이 없는 것으로 본다
+    (한 줄에 여러 선언이 있는 아주 긴 줄에서 줄 시작을 찾느라 뒤로 훑지 않도록).
+    """
+    line_start = start
+    while line_start > 0 and code[line_start - 1] in ' \t':
+        line_start -= 1
+    if line_start > 0 and code[line_start - 1] != '\n':
+        return ''
+    lines = []
+    pos = line_start
+    while pos > 0:
+        prev_start = code.rfind('\n', 0, pos - 1) + 1
+        text = code[prev_start:pos - 1].strip()
+        if text.startswith('@') and not lines:
+            pos = prev_start
+            continue
+        if text.startswith('//'):
+            lines.append(text.lstrip('/').strip())
+            pos = prev_start
+            continue
+        if text.endswith('*/') and not lines:
+            comment_start = code.rfind('/*', 0, pos - 1)
+            if comment_start < 0:
+                break
+            body = code[comment_start + 2:code.rfind('*/', 0, pos)]
+            cleaned = [part.strip().lstrip('*').strip() for part in body.split('\n')]
+            return '\n'.join(part for part in cleaned if part)
+        break
+    return '\n'.join(reversed(lines))
+
+
+# ---------------------------------------------------------------- Python
+
+def extract_python(code: str) -> List[Dict]:
+    """ast로 모듈/클래스 수준의 함수와 메서드 추출 (함수 안의 중첩 함수는 제외)"""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError) as e:
+        print(f"❌ Python 구문 분석 실패: {e}")
+        return []
+
+    lines = code.splitlines(keepends=True)
+    functions = []
+    pending = list(reversed(tree.body))
+    while pending:
+        node = pending.pop()
+        if isinstance(node, ast.ClassDef):
+            pending.extend(reversed(node.body))
+            continue
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        first_line = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        source = textwrap.dedent(''.join(lines[first_line - 1:node.end_lineno])).rstrip('\n')
+
+        # 매개변수는 ast.unparse 대신 선언부 원문에서 잘라냄 (함수가 많은 파일에서 더 빠름)
+        body_line = node.body[0].lineno
+        head = ''.join(lines[node.lineno - 1:body_line - 1])
+        head += lines[body_line - 1][:_char_col(lines[body_line - 1], node.body[0].col_offset)]
+        head = head[head.index(node.name, _char_col(lines[node.lineno - 1], node.col_offset)):]
+        close = head.rfind(')', 0, head.rfind('->')) if node.returns else head.rfind(')')
+        params = ' '.join(head[head.index('(') + 1:close].split())
+        return_type = ast.unparse(node.returns) if node.returns else ''
+        prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+        signature = f"{prefix} {node.name}({params})" + (f" -> {return_type}" if return_type else '')
+        functions.append(make_function_dict(
+            node.name, source, params, return_type, signature,
+            node.lineno, ast.get_docstring(node) or '', 'python'
+        ))
+    return functions
+
+
+def _char_col(line: str, byte_col: int) -> int:
+    """ast의 UTF-8 바이트 열 번호를 문자 열 번호로 변환"""
+    if line.isascii():
+        return byte_col
+    return len(line.encode('utf-8')[:byte_col].decode('utf-8', 'ignore'))
+
+
+# ---------------------------------------------------------------- 중괄호 언어
+
+class _BraceScanner:
+    """중괄호 언어 공통 스캐너
+
+    skip: 주석/문자열 패턴 (이 안의 중괄호와 선언은 무시)
+    decl: 여는 괄호까지의 함수 선언 패턴 (name 또는 aname 그룹 필수, ret 그룹 선택)
+    tail: 닫는 괄호 다음부터 본문 여는 중괄호까지 (ret 그룹 선택)
+    class_decl: 메서드를 담는 클래스 본문 시작 패턴
+    method: 클래스 본문 바로 안에서만 쓰는 메서드 선언 패턴 (mname 그룹 필수)
+    """
+
+    def __init__(self, language: str, skip: str, decl: str, tail: str,
+                 keywords: frozenset, class_decl: Optional[str] = None, method: Optional[str] = None):
+        self.language = language
+        parts = [f'(?P<skip>{skip})', f'(?P<decl>{decl})']
+        if class_decl:
+            parts.append(f'(?P<cls>{class_decl})')
+        if method:
+            parts.append(f'(?P<method>{method})')
+        parts.append(r'(?P<open>\{)|(?P<close>\})')
+        self.scan_re = re.compile('|'.join(parts), re.MULTILINE | re.DOTALL)
+        self.brace_re = re.compile(rf'(?P<skip>{skip})|(?P<open>\{{)|(?P<close>\}})', re.DOTALL)
+        self.paren_re = re.compile(rf'(?P<skip>{skip})|(?P<open>\()|(?P<close>\))', re.DOTALL)
+        self.tail_re = re.compile(tail, re.DOTALL)
+        self.keywords = keywords
+
+    def extract(self, code: str) -> List[Dict]:
+        functions = []
+        contexts = []       # 열린 중괄호 종류 ('class' / 'block') 스택
+        search = self.scan_re.search
+        line = 1
+        line_pos = 0
+        pos = 0
+
+        while True:
+            m = search(code, pos)
+            if not m:
+                break
+            kind = m.lastgroup
+            pos = m.end()
+            if kind == 'skip':
+                continue
+            if kind == 'open':
+                contexts.append('block')
+                continue
+            if kind == 'close':
+                if contexts:
+                    contexts.pop()
+                continue
+            if kind == 'cls':
+                contexts.append('class')
+                continue
+            if kind == 'method' and (not contexts or contexts[-1] != 'class'):
+                # 메서드 패턴은 클래스 본문 바로 안에서만 사용
+                pos = m.end() - 1
+                continue
+
+            if kind == 'method':
+                name = m.group('mname')
+            else:
+                name = m.group('name') or self._group(m, 'aname')
+            if name in self.keywords:
+                pos = m.end() - 1
+                continue
+            params_start = m.end()
+            params_end = self._match(self.paren_re, code, params_start)
+            tail = self.tail_re.match(code, params_end) if params_end else None
+            if not tail:
+                # 함수 정의가 아님 (호출, 선언만 있는 경우 등): 괄호부터 다시 스캔
+                pos = m.end() - 1
+                continue
+            body_end = self._match(self.brace_re, code, tail.end()) or len(code)
+
+            start = m.start(kind) + len(m.group(kind)) - len(m.group(kind).lstrip())
+            line += code.count('\n', line_pos, start)
+            line_pos = start
+            params = ' '.join(code[params_start:params_end - 1].split())
+            return_type = ' '.join((self._group(m, 'ret') or self._group(tail, 'ret') or '').split())
+            header = ' '.join(code[start:params_end].split())
+            functions.append(make_function_dict(
+                name, code[start:body_end], params, return_type, header,
+                line, leading_comment(code, start), self.language
+            ))
+            pos = body_end
+        return functions
+
+    def _group(self, m, group: str) -> Optional[str]:
+        return m.group(group) if group in m.re.groupindex else None
+
+    def _match(self, pattern, code: str, pos: int) -> Optional[int]:
+        """여는 괄호/중괄호 다음 위치에서 짝이 맞는 닫는 위치 다음을 반환 (없으면 None)"""
+        depth = 1
+        for m in pattern.finditer(code, pos):
+            kind = m.lastgroup
+            if kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+        return None
+
+
+_C_COMMENTS = r'//[^\n]*|/\*.*?(?:\*/|\Z)'
+
+_CONTROL_KEYWORDS = frozenset((
+    'if', 'for', 'while', 'switch', 'catch', 'return', 'new', 'else', 'do', 'try',
+    'synchronized', 'function', 'with', 'typeof', 'await', 'yield', 'super', 'this',
+    'constructor',
+))
+
+_GO_SCANNER = _BraceScanner(
+    'go',
+    skip=_C_COMMENTS + r'|"(?:\\.|[^"\\\n])*"?|`[^`]*`?|\'(?:\\.|[^\'\\\n])*\'?',
+    decl=r'^func[ \t]+(?:\([^)\n]*\)[ \t]*)?(?P<name>\w+)[ \t]*(?:\[[^\]\n]*\][ \t]*)?\(',
+    tail=r'[ \t]*(?P<ret>[^{\n;]*?)[ \t]*\{',
+    keywords=frozenset(),
+)
+
+_JAVA_MODIFIERS = r'(?:public|protected|private|static|final|abstract|synchronized|native|default|strictfp)'
+
+_JAVA_SCANNER = _BraceScanner(
+    'java',
+    skip=_C_COMMENTS + r'|""".*?(?:"""|\Z)|"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?',
+    # 생성자는 반환 타입 자리에 한정자가 오므로 제외
+    decl=(rf'^[ \t]*(?:@[\w$.]+(?:\([^)\n]*\))?[ \t]+)*(?:{_JAVA_MODIFIERS}[ \t]+)*'
+          rf'(?:<[^>\n]*>[ \t]+)?(?!{_JAVA_MODIFIERS}\b)(?P<ret>[\w$.]+(?:<[^;{{}}()\n]*>)?(?:\[\])*)[ \t]+(?P<name>[\w$]+)[ \t]*\('),
+    tail=r'\s*(?:throws\s+[\w$.,\s<>]+?)?\s*\{',
+    keywords=_CONTROL_KEYWORDS | frozenset(('throw', 'case')),
+)
+
+_JS_SKIP = _C_COMMENTS + r'|"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?|`(?:\\.|[^`\\])*`?'
+_JS_DECL = (
+    r'^[ \t]*(?:export[ \t]+(?:default[ \t]+)?)?(?:declare[ \t]+)?(?:async[ \t]+)?function\b[ \t]*\*?[ \t]*'
+    r'(?P<name>[\w$]+)[ \t]*(?:<[^>\n]*>)?[ \t]*\('
+    r'|^[ \t]*(?:export[ \t]+)?(?:const|let|var)[ \t]+(?P<aname>[\w$]+)[ \t]*(?::[^=\n]+)?=[ \t]*'
+    r'(?:async[ \t]+)?(?:function\b[ \t]*\*?[ \t]*[\w$]*[ \t]*)?\('
+)
+_JS_CLASS = r'^[ \t]*(?:export[ \t]+(?:default[ \t]+)?)?(?:abstract[ \t]+)?class\b[^{;\n]*\{'
+_JS_METHOD = (r'^[ \t]*(?:(?:public|private|protected|static|async|readonly|override|abstract)[ \t]+)*'
+              r'\*?(?P<mname>[\w$]+)[ \t]*(?:<[^>\n]*>)?[ \t]*\(')
+_JS_TAIL = r'\s*(?::\s*(?P<ret>[^{;=]*?))?\s*(?:=>\s*)?\{'
+
+
+def _javascript_scanner(language: str) -> _BraceScanner:
+    """JavaScript/TypeScript: function 선언, const f = (...) => {...}, 클래스 메서드
+
+    정규식 리터럴 안의 중괄호는 구분하지 않는다.
+    """
+    return _BraceScanner(language, _JS_SKIP, _JS_DECL, _JS_TAIL, _CONTROL_KEYWORDS,
+                         class_decl=_JS_CLASS, method=_JS_METHOD)
+
+
+# ---------------------------------------------------------------- 레지스트리
+
+# 언어 -> 추출 함수 (C/C++은 FunctionExtractor 자체 토크나이저)
+EXTRACTORS: Dict[str, Callable[[str], List[Dict]]] = {
+    'python': extract_python,
+    'java': _JAVA_SCANNER.extract,
+    'javascript': _javascript_scanner('javascript').extract,
+    'typescript': _javascript_scanner('typescript').extract,
+    'go': _GO_SCANNER.extract,
+}
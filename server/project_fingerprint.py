@@ -0,0 +1,89 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from scan_planner import ScanPlan, plan_scan, sniff_content
+
+
+# 해시 계산용 스레드 수 (hashlib은 큰 버퍼를 해시할 때 GIL을 놓으므로 스레드로 병렬화됨)
+FINGERPRINT_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+
+class FileEntry:
+    """프로젝트 파일 하나의 메타데이터와 내용 해시
+
+    해시를 위해 읽은 바이트는 분석 단계에서 read_text로 한 번만 다시 쓰고 버린다.
+    """
+
+    __slots__ = ('rel_path', 'path', 'size', 'digest', 'skip_reason', '_data')
+
+    def __init__(self, rel_path: str, path: str, stat: os.stat_result):
+        self.rel_path = rel_path
+        self.path = path
+        self.size = stat.st_size
+        self.digest = None
+        # 내용을 보고 분석에서 뺀 이유 ('binary', 'minified', 'generated')
+        self.skip_reason = None
+        self._data = None
+
+    def read_text(self) -> str:
+        """파일 내용 (open(..., 'r', errors='ignore')와 같은 결과)"""
+        data = self._data
+        self._data = None
+        if data is None:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        text = data.decode('utf-8', errors='ignore')
+        # 텍스트 모드와 같게 줄바꿈 통일
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+
+def _hash_file(entry: FileEntry) -> FileEntry:
+    with open(entry.path, 'rb') as f:
+        data = f.read()
+    entry._data = data
+    entry.size = len(data)
+    entry.digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    entry.skip_reason = sniff_content(data)
+    if entry.skip_reason:
+        entry._data = None
+    return entry
+
+
+def _safe_hash(entry: FileEntry) -> Optional[FileEntry]:
+    try:
+        return _hash_file(entry)
+    except OSError:
+        return None
+
+
+def fingerprint_project(project_path: str, extensions: Iterable[str],
+                        workers: int = FINGERPRINT_WORKERS, plan: Optional[ScanPlan] = None) -> List[FileEntry]:
+    """프로젝트의 분석 대상 파일 목록과 내용 해시 (상대 경로 순)
+
+    대상 파일은 plan(없으면 기본 규칙으로 plan_scan)에서 가져와 스레드 풀에서 읽어 해시한다.
+    업로드/클론마다 디렉토리가 새로 만들어지므로 stat 정보로 해시를 재사용하지 않고,
+    중복 분석은 내용 해시 기반 캐시 키로 막는다.
+    바이너리/압축/생성 코드로 판별된 파일은 결과에서 빼고 plan.skipped에 센다.
+    """
+    if plan is None:
+        plan = plan_scan(project_path, extensions)
+    # 상대 경로 사용 (임시 디렉토리 경로 제거)
+    entries = [FileEntry(rel_path, path, stat) for rel_path, path, stat in plan.files]
+
+    hashed = []
+    if entries:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            hashed = [entry for entry in pool.map(_safe_hash, entries) if entry is not None]
+        print(f"🔎 파일 {len(hashed)}개 해시")
+
+    kept = []
+    for entry in hashed:
+        if entry.skip_reason:
+            plan.skipped[entry.skip_reason] = plan.skipped.get(entry.skip_reason, 0) + 1
+        else:
+            kept.append(entry)
+    return kept
@@ -0,0 +1,104 @@
+import time
+import random
+import asyncio
+import threading
+from typing import Any, Callable, Optional
+
+from aws_config import BEDROCK_REQUESTS_PER_MINUTE
+
+
+# 쓰로틀링 재시도 설정 (지수 백오프 + 지터)
+THROTTLE_MAX_RETRIES = 6
+THROTTLE_BASE_DELAY = 1.0
+THROTTLE_MAX_DELAY = 30.0
+
+_THROTTLING_CODES = ('ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException')
+
+
+class TokenBucket:
+    """분당 요청 수 제한용 토큰 버킷
+
+    토큰은 초당 rate_per_minute / 60개씩 차고 burst개까지 쌓인다.
+    요청마다 토큰을 하나 예약하고, 모자라면 채워질 때까지 기다린다.
+    예약은 락 안에서 계산만 하고 대기는 락 밖에서 하므로
+    여러 스레드와 여러 이벤트 루프에서 같은 버킷을 함께 쓸 수 있다.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._updated = time.monotonic()
+        self.configure(rate_per_minute, burst)
+        self._tokens = float(self.capacity)
+
+    def configure(self, rate_per_minute: float, burst: Optional[int] = None):
+        """한도 변경 (이미 쌓인 토큰은 새 용량까지만 유지)"""
+        with self._lock:
+            self.rate = rate_per_minute / 60.0
+            self.capacity = burst if burst is not None else max(1, int(self.rate))
+            self._tokens = min(getattr(self, '_tokens', 0.0), self.capacity)
+
+    def _reserve(self) -> float:
+        """토큰 하나를 예약하고 기다려야 할 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+# 프로세스 전체에서 공유하는 Bedrock 호출 제한
+bedrock_rate_limiter = TokenBucket(BEDROCK_REQUESTS_PER_MINUTE)
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Bedrock 쓰로틀링(요청 한도 초과) 오류인지 확인"""
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    if code in _THROTTLING_CODES:
+        return True
+    message = str(error)
+    return 'ThrottlingException' in message or 'Too many requests' in message
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(THROTTLE_MAX_DELAY, THROTTLE_BASE_DELAY * (2 ** attempt)))
+
+
+def call_with_retry(func: Callable[[], Any], limiter: TokenBucket = bedrock_rate_limiter,
+                    max_retries: int = THROTTLE_MAX_RETRIES) -> Any:
+    """토큰을 받은 뒤 func 호출, 쓰로틀링이면 백오프 후 재시도"""
+    for attempt in range(max_retries):
+        limiter.acquire()
+        try:
+            return func()
+        except Exception as e:
+            if not is_throttling_error(e) or attempt == max_retries - 1:
+                raise
+            delay = _backoff(attempt)
+            print(f"Throttling 감지, {delay:.1f}초 대기 후 재시도... (시도 {attempt + 1}/{max_retries})")
+            time.sleep(delay)
+
+
+async def call_with_retry_async(func: Callable[[], Any], limiter: TokenBucket = bedrock_rate_limiter,
+                                max_retries: int = THROTTLE_MAX_RETRIES) -> Any:
+    """call_with_retry의 비동기 버전 (블로킹 func는 스레드에서 실행)"""
+    for attempt in range(max_retries):
+        await limiter.acquire_async()
+        try:
+            return await asyncio.to_thread(func)
+        except Exception as e:
+            if not is_throttling_error(e) or attempt == max_retries - 1:
+                raise
+            delay = _backoff(attempt)
+            print(f"Throttling 감지, {delay:.1f}초 대기 후 재시도... (시도 {attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
@@ -0,0 +1,90 @@
+import math
+from typing import Callable, Dict, Hashable, List, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# 신뢰구간 계산에 사용하는 정규분포 분위수 (양측)
+_Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758}
+
+
+def allocate(sizes: Dict[Hashable, int], n: int) -> Dict[Hashable, int]:
+    """층별 표본 수 비례 배분 (각 층 최소 1개, 최대 층 크기)
+
+    층 수가 n보다 많으면 큰 층부터 하나씩 배분한다.
+    """
+    allocation = {key: 0 for key in sizes}
+    total = sum(sizes.values())
+    if total == 0 or n <= 0:
+        return allocation
+    n = min(n, total)
+    if len(sizes) >= n:
+        for key in sorted(sizes, key=lambda k: -sizes[k])[:n]:
+            allocation[key] = 1
+        return allocation
+
+    quotas = {key: n * size / total for key, size in sizes.items()}
+    for key, size in sizes.items():
+        allocation[key] = min(size, max(1, int(quotas[key])))
+    # 합이 n과 다르면 몫과의 차이가 가장 큰 층부터 하나씩 조정
+    left = n - sum(allocation.values())
+    while left > 0:
+        key = max((k for k in sizes if allocation[k] < sizes[k]), key=lambda k: quotas[k] - allocation[k])
+        allocation[key] += 1
+        left -= 1
+    while left < 0:
+        key = min((k for k in sizes if allocation[k] > 1), key=lambda k: quotas[k] - allocation[k])
+        allocation[key] -= 1
+        left += 1
+    return allocation
+
+
+def stratify(items: Sequence[T], key_levels: Sequence[Callable[[T], Hashable]],
+             max_strata: int) -> Dict[Hashable, List[T]]:
+    """층 나누기 (층 수가 max_strata를 넘으면 다음 수준의 더 거친 키로 다시 나눔)"""
+    strata = {}
+    for key_of in key_levels:
+        strata = {}
+        for item in items:
+            strata.setdefault(key_of(item), []).append(item)
+        if len(strata) <= max_strata:
+            break
+    return strata
+
+
+def stratified_sample(strata: Dict[Hashable, List[T]], n: int,
+                      order: Callable[[T], object]) -> Dict[Hashable, List[T]]:
+    """층별로 배분된 수만큼 order 기준 앞에서부터 고르기
+
+    order에 내용 해시처럼 무작위에 가까운 값을 쓰면 단순 무작위 추출과 같고,
+    같은 입력이면 같은 표본이 나온다 (이전 분석 캐시를 다시 쓸 수 있음).
+    """
+    allocation = allocate({key: len(items) for key, items in strata.items()}, n)
+    return {key: sorted(items, key=order)[:allocation[key]] for key, items in strata.items()}
+
+
+def stratified_total(strata: Sequence[Tuple[int, Sequence[float]]],
+                     confidence: float = 0.95) -> Tuple[float, float, float]:
+    """층화 표본으로 모집단 합계와 신뢰구간 추정 (strata: [(층 크기, 표본 값)])
+
+    층별 합계 N_h * 평균에 유한 모집단 수정을 적용한 분산을 더한다.
+    표본이 1개뿐인 층은 전체 표본의 분산을 대신 사용한다.
+    반환: (추정치, 하한, 상한)
+    """
+    values = [value for _, sample in strata for value in sample]
+    pooled = _variance(values) if len(values) > 1 else 0.0
+    total = variance = 0.0
+    for size, sample in strata:
+        if not sample:
+            continue
+        n = len(sample)
+        total += size * sum(sample) / n
+        if n < size:
+            s2 = _variance(sample) if n > 1 else pooled
+            variance += size * size * (1 - n / size) * s2 / n
+    margin = _Z_SCORES.get(confidence, 1.96) * math.sqrt(variance)
+    return total, total - margin, total + margin
+
+
+def _variance(values: Sequence[float]) -> float:
+    mean = sum(values) / len(values)
+    return sum((value - mean) ** 2 for value in values) / (len(values) - 1)
@@ -0,0 +1,229 @@
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 기본 제외 규칙 (.gitignore 문법, 숨김 디렉토리/의존성/빌드 결과/생성 코드)
+DEFAULT_IGNORE_RULES = (
+    '.*/', 'node_modules/', 'bower_components/', '__pycache__/', 'venv/', 'site-packages/',
+    'build/', 'dist/', 'out/', 'target/', 'obj/', 'coverage/',
+    'vendor/', 'third_party/', 'thirdparty/', 'Pods/',
+    '*.min.js', '*-min.js', '*.bundle.js', '*.chunk.js',
+    '*_pb2.py', '*_pb2_grpc.py', '*.pb.go', '*.pb.cc', '*.pb.h', '*.pb.c',
+    '*.g.cs', '*.designer.cs', '*.Designer.cs', '*.generated.*', '*_generated.*',
+)
+# 이보다 큰 파일은 사람이 쓴 코드가 아닐 가능성이 높아 분석하지 않음 (바이트)
+SCAN_MAX_FILE_BYTES = 512 * 1024
+# 내용 판별에 사용하는 앞부분 크기 (바이트)
+SNIFF_BYTES = 8192
+
+# 생성된 코드 표시 (파일 맨 앞 몇 줄에서 찾음, 소문자로 비교)
+_GENERATED_MARKERS = (b'@generated', b'do not edit', b'code generated by', b'auto-generated',
+                      b'autogenerated', b'this file was generated', b'this file is generated')
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """.gitignore 글롭 하나를 정규식으로 변환 (*, ?, [...], **)"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """.gitignore 문법의 제외 규칙 묶음 (한 디렉토리 기준)
+
+    '/'가 앞이나 중간에 있는 패턴은 기준 디렉토리에서부터, 없는 패턴은 모든 깊이의 이름과 비교한다.
+    '/'로 끝나는 패턴은 디렉토리에만 적용하고, '!'로 시작하는 패턴은 앞 규칙을 되돌린다.
+    git처럼 마지막으로 일치한 규칙이 결과를 정한다.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            regex = _glob_to_regex(line)
+            if not anchored:
+                regex = '(?:.*/)?' + regex
+            self.rules.append((re.compile(regex + r'\Z', re.DOTALL), negated, dir_only))
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional['IgnoreRules']:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                rules = cls(f)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """제외면 True, '!' 규칙으로 다시 포함이면 False, 일치하는 규칙이 없으면 None"""
+        result = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+
+class ScanRules:
+    """스캔 설정 (추가 제외 규칙, .gitignore 사용 여부, 파일 크기 상한)"""
+
+    def __init__(self, ignore: Iterable[str] = (), use_gitignore: bool = True,
+                 max_file_bytes: int = SCAN_MAX_FILE_BYTES):
+        self.ignore = IgnoreRules(list(DEFAULT_IGNORE_RULES) + list(ignore))
+        self.use_gitignore = use_gitignore
+        self.max_file_bytes = max_file_bytes
+
+
+class ScanPlan:
+    """읽기 전에 정한 분석 대상 파일 목록과 제외 통계
+
+    files: [(상대 경로, 절대 경로, os.stat_result)] (상대 경로 순)
+    skipped: 제외 이유별 파일 수 ('ignored', 'too_large', 이후 내용 판별에서 'binary', 'minified', 'generated')
+    """
+
+    def __init__(self, files: List[Tuple[str, str, os.stat_result]], skipped: Dict[str, int], ignored_dirs: int):
+        self.files = files
+        self.skipped = skipped
+        self.ignored_dirs = ignored_dirs
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(stat.st_size for _, _, stat in self.files)
+
+    def size_tiers(self, bounds: Iterable[Tuple[str, Optional[int]]]) -> Dict[str, Dict[str, int]]:
+        """크기 구간별 파일 수와 바이트 (bounds: [(이름, 상한 바이트 또는 None)], 작은 구간부터)"""
+        bounds = list(bounds)
+        tiers = {name: {'files': 0, 'bytes': 0} for name, _ in bounds}
+        for _, _, stat in self.files:
+            for name, limit in bounds:
+                if limit is None or stat.st_size <= limit:
+                    tiers[name]['files'] += 1
+                    tiers[name]['bytes'] += stat.st_size
+                    break
+        return tiers
+
+
+def plan_scan(project_path: str, extensions: Iterable[str], rules: Optional[ScanRules] = None) -> ScanPlan:
+    """os.scandir로 프로젝트를 훑어 분석 대상 파일을 고르기 (파일 내용은 읽지 않음)
+
+    제외 규칙(기본 규칙 + 설정 + 각 디렉토리의 .gitignore)에 걸리는 디렉토리는 들어가지 않고,
+    확장자가 대상이 아니거나 규칙에 걸리거나 크기 상한을 넘는 파일은 제외한다.
+    디렉토리 심볼릭 링크는 따라가지 않는다.
+    """
+    rules = rules or ScanRules()
+    extensions = set(extensions)
+    files = []
+    skipped = {'ignored': 0, 'too_large': 0}
+    ignored_dirs = 0
+
+    # (디렉토리 절대 경로, 상대 경로, 적용할 규칙 [(기준 상대 경로, IgnoreRules)])
+    stack = [(project_path, '', [('', rules.ignore)])]
+    while stack:
+        directory, rel_dir, active = stack.pop()
+        if rules.use_gitignore:
+            local = IgnoreRules.from_file(os.path.join(directory, '.gitignore'))
+            if local is not None:
+                active = active + [(rel_dir, local)]
+        try:
+            with os.scandir(directory) as it:
+                dir_entries = list(it)
+        except OSError:
+            continue
+
+        for entry in dir_entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if not is_dir and os.path.splitext(entry.name)[1] not in extensions:
+                continue
+
+            ignored = False
+            for base, ignore in active:
+                decision = ignore.match(rel_path[len(base) + 1:] if base else rel_path, is_dir)
+                if decision is not None:
+                    ignored = decision
+            if is_dir:
+                if ignored:
+                    ignored_dirs += 1
+                else:
+                    stack.append((entry.path, rel_path, active))
+                continue
+            if ignored:
+                skipped['ignored'] += 1
+                continue
+
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if stat.st_size > rules.max_file_bytes:
+                skipped['too_large'] += 1
+                continue
+            files.append((os.path.relpath(entry.path, project_path), entry.path, stat))
+
+    files.sort(key=lambda item: item[0])
+    return ScanPlan(files, skipped, ignored_dirs)
+
+
+def sniff_content(data: bytes) -> Optional[str]:
+    """파일 앞부분으로 분석하지 않을 파일 판별 ('binary', 'generated', 'minified' 또는 None)"""
+    head = data[:SNIFF_BYTES]
+    if b'\0' in head:
+        return 'binary'
+    header = b'\n'.join(head[:1024].split(b'\n', 5)[:5]).lower()
+    if any(marker in header for marker in _GENERATED_MARKERS):
+        return 'generated'
+    # 줄이 매우 길면 압축(minify)된 코드
+    lines = head.count(b'\n') + 1
+    if len(head) > 1000 and (len(head) / lines > 300 or max(map(len, head.split(b'\n'))) > 5000):
+        return 'minified'
+    return None
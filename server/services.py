@@ -0,0 +1,164 @@
+import os
+import json
+import threading
+from typing import Callable, Dict, Optional
+
+from aws_config import AWS_REGION, BEDROCK_REQUESTS_PER_MINUTE, get_bedrock_client
+from rate_limiter import bedrock_rate_limiter
+from code_analyzer import CodeAnalyzer, ANALYSIS_MAX_CONCURRENCY
+from scan_planner import ScanRules, SCAN_MAX_FILE_BYTES
+
+# 실행 중 바꿀 수 있는 설정 파일 (없으면 기본값 사용, /services/reload로 다시 읽음)
+SERVICE_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "service_config.json")
+
+DEFAULT_SERVICE_CONFIG = {
+    'aws_region': AWS_REGION,
+    # Bedrock 분당 요청 한도 (프로세스 공용 토큰 버킷)
+    'bedrock_requests_per_minute': BEDROCK_REQUESTS_PER_MINUTE,
+    # Bedrock 클라이언트 HTTP 커넥션 풀 크기 (동시 요청 수보다 크게)
+    'bedrock_max_pool_connections': 32,
+    'analysis_max_concurrency': ANALYSIS_MAX_CONCURRENCY,
+    # 프로젝트 분석 시간 예산(초), 넘을 것 같은 큰 프로젝트는 표본 분석 (None이면 항상 전체 분석)
+    'analysis_time_budget': None,
+    # 프로젝트 분석에서 추가로 제외할 경로 (.gitignore 문법)
+    'scan_ignore': [],
+    # 이보다 큰 파일은 분석하지 않음 (바이트)
+    'scan_max_file_bytes': SCAN_MAX_FILE_BYTES,
+}
+
+
+class Services:
+    """애플리케이션 전체에서 공유하는 분석기/에이전트 컨테이너
+
+    Bedrock 클라이언트, CodeAnalyzer, AgentWrapper, DocumentationAgent를 처음 쓸 때 한 번 만들고
+    요청마다 같은 객체를 돌려준다 (boto3 클라이언트와 분석 캐시가 계속 warm 상태로 유지됨).
+    reload()는 설정 파일을 다시 읽고, 클라이언트 설정이 바뀌었으면 다음 요청부터 새 객체를 만든다.
+    AWS를 쓸 수 없으면 클라이언트는 None이고 각 서비스는 기존처럼 fallback으로 동작한다.
+    aws_init(S3/DynamoDB 준비)이 성공하기 전에는 AgentWrapper를 만들지 않는다
+    (init_aws를 부르지 않았거나 실패하면 /analyze는 AI 없이 원본 함수를 사용).
+    """
+
+    def __init__(self, refactor_store=None, config_path: str = SERVICE_CONFIG_FILE,
+                 aws_init: Optional[Callable[[], None]] = None):
+        self.refactor_store = refactor_store
+        self.config_path = config_path
+        self._aws_init = aws_init
+        # AWS 리소스 초기화 성공 여부 (init_aws에서만 바뀜)
+        self.aws_ready = False
+        self._lock = threading.RLock()
+        self._bedrock_client = None
+        self._bedrock_ready = False
+        self._code_analyzer = None
+        self._agent_wrapper = None
+        self._doc_agent = None
+        self.config = self._load_config()
+        self._apply_limits()
+
+    def _load_config(self) -> Dict:
+        config = dict(DEFAULT_SERVICE_CONFIG)
+        if os.path.exists(self.config_path):
+            try:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    overrides = json.load(f)
+                config.update({key: value for key, value in overrides.items() if key in DEFAULT_SERVICE_CONFIG})
+            except Exception as e:
+                print(f"⚠️ 서비스 설정 읽기 실패 (기본값 사용): {e}")
+        return config
+
+    def _apply_limits(self):
+        """클라이언트를 다시 만들지 않아도 되는 설정 반영"""
+        bedrock_rate_limiter.configure(self.config['bedrock_requests_per_minute'])
+        if self._code_analyzer is not None:
+            self._configure_analyzer(self._code_analyzer)
+
+    def _configure_analyzer(self, analyzer: CodeAnalyzer):
+        analyzer.max_concurrency = self.config['analysis_max_concurrency']
+        analyzer.time_budget = self.config['analysis_time_budget']
+        analyzer.scan_rules = ScanRules(self.config['scan_ignore'], max_file_bytes=self.config['scan_max_file_bytes'])
+
+    def init_aws(self) -> bool:
+        """AWS 리소스 초기화 후 성공 여부 기록 (실패하면 에이전트를 쓰지 않음)"""
+        with self._lock:
+            try:
+                if self._aws_init is not None:
+                    self._aws_init()
+                self.aws_ready = True
+            except Exception as e:
+                print(f"AWS 초기화 실패 (무시): {e}")
+                self.aws_ready = False
+            if not self.aws_ready:
+                self._agent_wrapper = None
+            return self.aws_ready
+
+    def bedrock_client(self):
+        """공유 Bedrock 런타임 클라이언트 (만들 수 없으면 None)"""
+        with self._lock:
+            if not self._bedrock_ready:
+                try:
+                    self._bedrock_client = get_bedrock_client(
+                        self.config['aws_region'], self.config['bedrock_max_pool_connections']
+                    )
+                except Exception as e:
+                    print(f"❌ Bedrock 클라이언트 생성 실패: {e}")
+                    self._bedrock_client = None
+                self._bedrock_ready = True
+            return self._bedrock_client
+
+    def code_analyzer(self) -> CodeAnalyzer:
+        with self._lock:
+            if self._code_analyzer is None:
+                analyzer = CodeAnalyzer(self.bedrock_client())
+                self._configure_analyzer(analyzer)
+                self._code_analyzer = analyzer
+            return self._code_analyzer
+
+    def agent_wrapper(self):
+        """리팩토링/문서 생성 에이전트 (AWS 초기화 전이거나 실패했거나 Bedrock을 쓸 수 없으면 None)"""
+        with self._lock:
+            if not self.aws_ready:
+                return None
+            if self._agent_wrapper is None and self.bedrock_client() is not None:
+                from agents.agent_wrapper import AgentWrapper
+                self._agent_wrapper = AgentWrapper(self.refactor_store, self.bedrock_client())
+            return self._agent_wrapper
+
+    def doc_agent(self):
+        """빌드 문서 생성 에이전트 (Bedrock을 쓸 수 없으면 None)"""
+        with self._lock:
+            if self._doc_agent is None and self.bedrock_client() is not None:
+                from agents.doc_generator_agent import DocumentationAgent
+                self._doc_agent = DocumentationAgent(self.bedrock_client())
+            return self._doc_agent
+
+    def reload(self) -> Dict:
+        """설정 파일을 다시 읽어 반영 (클라이언트 설정이 바뀐 경우에만 서비스 재생성)
+
+        재생성할 때는 AWS 초기화도 다시 해서 결과를 기록하고, 아니면 이전 결과를 그대로 둔다.
+        """
+        with self._lock:
+            previous = self.config
+            self.config = self._load_config()
+            client_keys = ('aws_region', 'bedrock_max_pool_connections')
+            rebuilt = any(previous[key] != self.config[key] for key in client_keys)
+            if rebuilt:
+                # 새 요청부터 새 클라이언트 사용 (진행 중인 요청은 이전 객체로 끝까지 진행)
+                self._bedrock_client = None
+                self._bedrock_ready = False
+                self._code_analyzer = None
+                self._agent_wrapper = None
+                self._doc_agent = None
+                self.init_aws()
+            self._apply_limits()
+            print(f"🔄 서비스 설정 다시 읽기 완료 (재생성: {rebuilt})")
+            return {'config': dict(self.config), 'rebuilt': rebuilt, 'aws_ready': self.aws_ready}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'config': dict(self.config),
+                'aws_ready': self.aws_ready,
+                'bedrock_available': self._bedrock_client is not None,
+                'code_analyzer': self._code_analyzer is not None,
+                'agent_wrapper': self._agent_wrapper is not None,
+                'doc_agent': self._doc_agent is not None,
+            }
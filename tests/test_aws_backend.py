@@ -73,6 +73,217 @@ class TestAWSBackend(unittest.TestCase):
         # 지원하지 않는 파일 형식이므로 빈 결과 또는 오류 응답
         self.assertIn(response.status_code, [200, 400])
 
+    
+    def test_analyze_project_stream(self):
+        """스트리밍 분석: 시작, 파일별 결과, 요약 순서로 NDJSON 이벤트를 보내는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        import uuid
+        import shutil
+        from aws_backend import LOCAL_REPOS_DIR
+        marker = uuid.uuid4().hex
+        
+        response = self.client.post(
+            "/analyze_project/stream",
+            files=[
+                ("files", ("a.py", f"# {marker}\nprint('a')".encode(), "text/plain")),
+                ("files", ("b.js", f"// {marker}\nconsole.log(1);".encode(), "text/plain")),
+            ]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['content-type'].startswith('application/x-ndjson'))
+        events = [json.loads(line) for line in response.text.splitlines() if line]
+        upload_id = events[0]['upload_id']
+        shutil.rmtree(os.path.join(LOCAL_REPOS_DIR, f"upload_{upload_id}"), ignore_errors=True)
+        
+        self.assertEqual(events[0]['type'], 'start')
+        file_events = [e for e in events if e['type'] == 'file']
+        self.assertEqual(len(file_events), 2)
+        self.assertEqual(file_events[-1]['done'], 2)
+        self.assertEqual(events[-1]['type'], 'summary')
+        self.assertEqual(events[-1]['summary']['total_files'], 2)
+        self.assertEqual(events[-1]['upload_id'], upload_id)
+    
+    def test_analyze_project_job(self):
+        """분석 작업 등록 후 상태/결과 엔드포인트로 결과를 받는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        import uuid
+        import time
+        import shutil
+        from aws_backend import app, LOCAL_REPOS_DIR
+        marker = uuid.uuid4().hex
+        
+        # 작업 워커는 startup 이벤트에서 시작
+        with TestClient(app) as client:
+            response = client.post(
+                "/jobs/analyze_project",
+                files=[
+                    ("files", ("a.py", f"# {marker}\nprint('a')".encode(), "text/plain")),
+                    ("files", ("b.js", f"// {marker}\nconsole.log(1);".encode(), "text/plain")),
+                ]
+            )
+            self.assertEqual(response.status_code, 200)
+            job_id = response.json()['job_id']
+            upload_id = response.json()['upload_id']
+            
+            deadline = time.time() + 30
+            result = client.get(f"/jobs/{job_id}/result")
+            while result.status_code == 202 and time.time() < deadline:
+                time.sleep(0.1)
+                result = client.get(f"/jobs/{job_id}/result")
+            shutil.rmtree(os.path.join(LOCAL_REPOS_DIR, f"upload_{upload_id}"), ignore_errors=True)
+            
+            self.assertEqual(result.status_code, 200)
+            job = result.json()
+            self.assertEqual(job['status'], 'succeeded')
+            self.assertEqual(job['queue'], 'batch')
+            self.assertEqual(job['progress'], {'done': 2, 'total': 2})
+            self.assertEqual(job['result']['summary']['total_files'], 2)
+            self.assertEqual(job['result']['upload_id'], upload_id)
+            
+            self.assertEqual(client.get("/jobs/missing").status_code, 404)
+            self.assertEqual(client.post(f"/jobs/{job_id}/cancel").json()['status'], 'succeeded')
+
+    @patch('aws_backend.get_dynamodb_client', side_effect=RuntimeError("no aws"))
+    def test_reanalyze_removes_deleted_refactored_function(self, mock_dynamodb):
+        """에이전트가 켜져 있어도 다시 올린 파일에서 삭제된 함수의 리팩토링 결과를 지우는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        import shutil
+        import aws_backend
+        from agents.agent_wrapper import AgentWrapper
+        from disk_cache import DiskCache
+        from function_fingerprint import RefactorStore
+        
+        test_dir = tempfile.mkdtemp()
+        store = RefactorStore(DiskCache(os.path.join(test_dir, 'store.db')), 'test')
+        first = "int add(int a, int b) { return a + b; }\nint sub(int a, int b) { return a - b; }\n"
+        second = "int add(int a, int b) { return a + b; }\n"
+        # AI 리팩토링 결과처럼 source_file 없는 결과를 미리 저장 (Bedrock 호출 없이 재사용)
+        for name, op in (('add', '+'), ('sub', '-')):
+            code = f"int {name}(int a, int b) {{ return a {op} b; }}"
+            store.record({'name': name, 'code': code},
+                         [{'name': name, 'code': f"LIBRARY_API {code}", 'reusability_score': 8}])
+        wrapper = AgentWrapper(store, Mock())
+        headers = {'X-Session-Id': 'refactor-test'}
+        
+        def upload(content):
+            response = self.client.post("/analyze", headers=headers,
+                                        files=[("files", ("calc.cpp", content.encode(), "text/plain"))])
+            self.assertEqual(response.status_code, 200)
+            return {(u.get('source_file'), u['name']) for u in response.json()['utilities']}
+        
+        try:
+            self.client.post("/clear", headers=headers)
+            with patch.object(aws_backend.services, 'agent_wrapper', return_value=wrapper):
+                self.assertEqual(upload(first), {('calc.cpp', 'add'), ('calc.cpp', 'sub')})
+                self.assertEqual(upload(second), {('calc.cpp', 'add')})
+        finally:
+            self.client.post("/clear", headers=headers)
+            store.cache.close()
+            shutil.rmtree(test_dir, ignore_errors=True)
+    
+    @patch('aws_backend.get_dynamodb_client', side_effect=RuntimeError("no aws"))
+    def test_call_graph_is_per_session(self, mock_dynamodb):
+        """다른 세션이 올린 파일의 함수는 헬퍼로 연결하지 않는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        import aws_backend
+        
+        source = "int square(int x) { return x * x; }\nint area(int w) { return square(w); }\n"
+        selected = [{'name': 'area', 'code': 'int area(int w) { return square(w); }'}]
+        try:
+            with patch.object(aws_backend.services, 'agent_wrapper', return_value=None):
+                response = self.client.post("/analyze", headers={'X-Session-Id': 'graph-a'},
+                                            files=[("files", ("shapes.cpp", source.encode(), "text/plain"))])
+            self.assertEqual(response.status_code, 200)
+            helpers = aws_backend.session_call_graph('graph-a').dependency_closure(selected)
+            self.assertEqual([helper['name'] for helper in helpers], ['square'])
+            self.assertEqual(aws_backend.session_call_graph('graph-b').dependency_closure(selected), [])
+        finally:
+            self.client.post("/clear")
+    
+    def test_job_with_error_response_fails(self):
+        """엔드포인트가 오류 응답을 돌려준 작업은 성공이 아니라 실패로 기록되는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        import asyncio
+        import shutil
+        from unittest.mock import AsyncMock
+        from jobs import JobQueue, FAILED
+        import aws_backend
+        
+        test_dir = tempfile.mkdtemp()
+        queue = JobQueue(os.path.join(test_dir, 'jobs.db'))
+        queue.register('analyze_commit_changes', aws_backend.run_analyze_commit_changes_job, 'interactive')
+        error = {"error": "레포지터리를 찾을 수 없습니다. 먼저 레포지터리를 분석해주세요."}
+        
+        async def run():
+            await queue.start()
+            job_id = queue.submit('analyze_commit_changes', {'repo_id': 'missing', 'commit_sha': 'abc'})
+            for _ in range(500):
+                if queue.get(job_id)['status'] == FAILED:
+                    break
+                await asyncio.sleep(0.01)
+            await queue.stop()
+            return job_id
+        try:
+            with patch('aws_backend.analyze_commit_changes', AsyncMock(return_value=error)):
+                job_id = asyncio.run(run())
+            job = queue.get(job_id, with_result=True)
+            self.assertEqual(job['status'], FAILED)
+            self.assertEqual(job['error'], error['error'])
+            self.assertEqual(job['result'], error)
+        finally:
+            queue.close()
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+    def test_build_job_runs_on_queue_loop(self):
+        """빌드 작업이 별도 스레드 루프가 아니라 작업 큐의 이벤트 루프에서 실행되는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        import asyncio
+        import shutil
+        from jobs import JobQueue, SUCCEEDED
+        import aws_backend
+        
+        test_dir = tempfile.mkdtemp()
+        queue = JobQueue(os.path.join(test_dir, 'jobs.db'))
+        queue.register('build', aws_backend.run_build_job, 'interactive')
+        loops = []
+        
+        async def fake_build(config, session):
+            loops.append((asyncio.get_running_loop(), session))
+            return {'build_id': 'b1', 'status': 'built'}
+        
+        async def run():
+            await queue.start()
+            job_id = queue.submit('build', {'architecture': 'x64', 'runtime': 'MD', 'msvc_version': '2022',
+                                          'library_type': 'dll', 'utilities': [], 'session': 's1'})
+            for _ in range(500):
+                if queue.get(job_id)['status'] == SUCCEEDED:
+                    break
+                await asyncio.sleep(0.01)
+            await queue.stop()
+            return asyncio.get_running_loop(), job_id
+        try:
+            with patch('aws_backend.build_library', fake_build):
+                loop, job_id = asyncio.run(run())
+            self.assertEqual(queue.get(job_id)['status'], SUCCEEDED)
+            self.assertEqual(loops, [(loop, 's1')])
+        finally:
+            queue.close()
+            shutil.rmtree(test_dir, ignore_errors=True)
+    
+    def test_job_priority_is_bounded(self):
+        """범위를 벗어난 우선순위로는 작업을 등록할 수 없는지 테스트"""
+        if not self.app_available:
+            self.skipTest("AWS Backend not available")
+        from aws_backend import JOB_PRIORITY_MAX
+        body = {'repo_id': 'missing', 'commit_sha': 'abc'}
+        response = self.client.post(f"/jobs/analyze_commit_changes?priority={JOB_PRIORITY_MAX + 1}", json=body)
+        self.assertEqual(response.status_code, 422)
 
 class TestUtilityFunctions(unittest.TestCase):
     
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from call_graph import CallGraph, find_calls
+from function_extractor import FunctionExtractor
+
+
+class TestCallGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = FunctionExtractor()
+        self.graph = CallGraph()
+
+    def add_file(self, filename, code):
+        self.graph.update_file(filename, self.extractor.extract_functions(code))
+
+    def test_find_calls_ignores_comments_strings_and_members(self):
+        """주석/문자열 안의 호출과 멤버 호출은 무시"""
+        code = '''int run(Obj o, Obj* p) {
+    // skipped(1);
+    const char* s = "quoted(2)";
+    o.member(); p->pointer();
+    return util::scoped(3) + plain(4);
+}'''
+        calls = find_calls(code)
+        self.assertIn('util::scoped', calls)
+        self.assertIn('plain', calls)
+        for name in ('skipped', 'quoted', 'member', 'pointer'):
+            self.assertNotIn(name, calls)
+
+    def test_dependency_closure_is_transitive_and_ordered(self):
+        """선택한 함수의 전이 헬퍼만 호출되는 순서대로 포함"""
+        self.add_file('math.cpp', '''
+int square(int x) { return x * x; }
+int sumSquares(int a, int b) { return square(a) + square(b); }
+int unused(int x) { return x; }
+''')
+        self.add_file('api.cpp', '''
+int distance2(int a, int b) { return sumSquares(a, b); }
+''')
+        selected = [{'name': 'distance2', 'code': 'int distance2(int a, int b) { return sumSquares(a, b); }'}]
+        helpers = self.graph.dependency_closure(selected)
+        self.assertEqual([helper['name'] for helper in helpers], ['square', 'sumSquares'])
+
+        # 이미 선택한 함수는 헬퍼로 다시 넣지 않음
+        selected.append({'name': 'square', 'code': 'int square(int x) { return x * x; }'})
+        helpers = self.graph.dependency_closure(selected)
+        self.assertEqual([helper['name'] for helper in helpers], ['sumSquares'])
+
+    def test_qualified_calls_match_namespace(self):
+        """std::max()나 멤버 호출은 같은 이름의 사용자 함수로 연결하지 않음"""
+        source = '''
+int max(int a, int b) { return a > b ? a : b; }
+namespace util {
+int clamp(int x) { return x < 0 ? 0 : x; }
+}
+'''
+        self.graph.update_file('util.cpp', self.extractor.extract_functions(source), source=source)
+
+        code = 'int pick(Obj o, int a, int b) { return std::max(a, b) + o.max() + util::clamp(a); }'
+        helpers = self.graph.dependency_closure([{'name': 'pick', 'code': code}])
+        self.assertEqual([helper['name'] for helper in helpers], ['clamp'])
+
+        code = 'int pick(int a, int b) { return ::max(a, b) + other::clamp(a); }'
+        helpers = self.graph.dependency_closure([{'name': 'pick', 'code': code}])
+        self.assertEqual([helper['name'] for helper in helpers], ['max'])
+
+    def test_closure_skips_helpers_needing_project_types(self):
+        """프로젝트 타입/매크로를 쓰는 헬퍼(와 그 호출자)는 빼고, 시스템 헤더는 같이 알려주는지 테스트"""
+        source = '''#include <cmath>
+#include "config.h"
+#define SCALE 3
+struct Point { int x; };
+int scaled(int v) { return v * SCALE; }
+int norm(int v) { return (int)std::sqrt(v); }
+int wrapper(int v) { return scaled(v) + norm(v); }
+'''
+        self.graph.update_file('geo.cpp', self.extractor.extract_functions(source), source=source)
+
+        skipped = []
+        code = 'int api(int v) { return wrapper(v) + norm(v); }'
+        helpers = self.graph.dependency_closure([{'name': 'api', 'code': code}], skipped)
+        self.assertEqual([helper['name'] for helper in helpers], ['norm'])
+        self.assertEqual(sorted(skipped), ['scaled', 'wrapper'])
+        self.assertEqual(self.graph.includes_for(helpers), {'<cmath>'})
+
+    def test_recursion_and_incremental_update(self):
+        """재귀 호출 처리와 증분 갱신 시 삭제된 함수 제외"""
+        self.add_file('a.cpp', '''
+int even(int n) { return n == 0 ? 1 : odd(n - 1); }
+int odd(int n) { return n == 0 ? 0 : even(n - 1); }
+int top(int n) { return even(n); }
+''')
+        selected = [{'name': 'top', 'code': 'int top(int n) { return even(n); }', 'source_file': 'a.cpp'}]
+        self.assertEqual([h['name'] for h in self.graph.dependency_closure(selected)], ['odd', 'even'])
+
+        self.graph.update_file('a.cpp', [], removed={'odd'})
+        self.assertEqual([h['name'] for h in self.graph.dependency_closure(selected)], ['even'])
+
+        self.graph.remove_file('a.cpp')
+        self.assertEqual(self.graph.dependency_closure(selected), [])
+        self.assertEqual(self.graph.stats(), {'files': 0, 'functions': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
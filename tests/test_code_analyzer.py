@@ -3,22 +3,36 @@ import tempfile
 import os
 from pathlib import Path
 import sys
+from unittest.mock import patch
 
 # 서버 모듈 경로 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
 
+import code_analyzer
 from code_analyzer import CodeAnalyzer
 
 
 class TestCodeAnalyzer(unittest.TestCase):
     
     def setUp(self):
+        # 분석 캐시는 클래스 전체에서 공유하므로 테스트마다 임시 파일로 새로 열기
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_patch = patch.object(code_analyzer, 'ANALYSIS_CACHE_FILE',
+                                        os.path.join(self.cache_dir.name, 'code_analysis_cache.db'))
+        self.cache_patch.start()
+        self.saved_cache = CodeAnalyzer._cache
+        CodeAnalyzer._cache = None
         self.analyzer = CodeAnalyzer()
         self.test_dir = tempfile.mkdtemp()
         
     def tearDown(self):
         import shutil
         shutil.rmtree(self.test_dir, ignore_errors=True)
+        if CodeAnalyzer._cache is not None:
+            CodeAnalyzer._cache.close()
+        CodeAnalyzer._cache = self.saved_cache
+        self.cache_patch.stop()
+        self.cache_dir.cleanup()
     
     def create_test_file(self, filename, content):
         """테스트용 파일 생성"""
@@ -120,6 +134,200 @@ class DataProcessor:
         
         self.assertEqual(result1, result2)
     
+    def test_per_file_cache(self):
+        """파일 하나만 바뀌면 그 파일만 다시 분석하는지 테스트"""
+        self.create_test_file("a.py", "print('a')")
+        self.create_test_file("b.py", "print('b')")
+        
+        analyzed = []
+        original = self.analyzer._build_file_result
+        def counting(file_path, content, ai_analysis):
+            analyzed.append(os.path.basename(file_path))
+            return original(file_path, content, ai_analysis)
+        self.analyzer._build_file_result = counting
+        
+        first = self.analyzer.analyze_project(self.test_dir)
+        self.assertEqual(sorted(analyzed), ['a.py', 'b.py'])
+        
+        analyzed.clear()
+        self.create_test_file("b.py", "print('b')\nprint('changed')")
+        second = self.analyzer.analyze_project(self.test_dir)
+        self.assertEqual(analyzed, ['b.py'])
+        self.assertEqual(second['summary']['total_files'], 2)
+        self.assertEqual(second['summary']['total_lines'], first['summary']['total_lines'] + 1)
+        self.assertEqual(second['files'][0], first['files'][0])
+        self.assertEqual(self.analyzer.cache.path, code_analyzer.ANALYSIS_CACHE_FILE)
+        self.assertTrue(self.analyzer.cache.path.startswith(self.cache_dir.name))
+    
+    def test_pack_small_files(self):
+        """작은 파일은 한 요청으로 묶고, 응답에 없는 파일만 단일 요청으로 다시 분석하는지 테스트"""
+        import re
+        import json
+        for name in ("a.py", "b.py", "c.py"):
+            self.create_test_file(name, f"print('{name}')")
+        self.create_test_file("big.py", "x = 1\n" * 1000)
+        
+        analysis = {'cyclomatic_complexity': 1, 'maintainability_index': 90, 'estimated_dev_hours': 0.5,
+                    'difficulty_score': 1, 'developer_level': 'Entry', 'pattern_score': 1,
+                    'optimization_score': 5, 'best_practices_score': 5}
+        prompts = []
+        def fake_invoke(prompt, max_tokens):
+            prompts.append(prompt)
+            if '코드 조각' in prompt:
+                keys = re.findall(r'^### (f\d+)$', prompt, re.M)
+                return json.dumps({key: dict(analysis, difficulty_score=4) for key in keys})
+            if '"f0", "f1", "f2"' in prompt:
+                # c.py(f2) 결과는 빠진 응답
+                return json.dumps({'f0': analysis, 'f1': dict(analysis, difficulty_score=2)})
+            if '프로젝트 분석 결과' in prompt:
+                return '{"result": "신입사원도 충분히 개발 가능함", "desc": "간단함"}'
+            return json.dumps(dict(analysis, difficulty_score=3))
+        self.analyzer.use_ai = True
+        self.analyzer._invoke_model_once = fake_invoke
+        
+        result = self.analyzer.analyze_project(self.test_dir)
+        by_name = {os.path.basename(r['file_path']): r for r in result['files']}
+        self.assertEqual(by_name['a.py']['difficulty_score'], 1)
+        self.assertEqual(by_name['b.py']['difficulty_score'], 2)
+        self.assertEqual(by_name['c.py']['difficulty_score'], 3)
+        # 큰 파일은 조각으로 나눠 한 묶음 요청으로 분석
+        self.assertEqual(by_name['big.py']['difficulty_score'], 4)
+        # 묶음 1번 + c.py 재요청 + big.py 조각 묶음 + 요약
+        self.assertEqual(len(prompts), 4)
+        
+        # 다시 분석하면 파일 결과는 (테스트 전용) 캐시에서 읽음
+        prompts.clear()
+        self.assertEqual(self.analyzer.analyze_project(self.test_dir)['files'], result['files'])
+        self.assertFalse([prompt for prompt in prompts if '프로젝트 분석 결과' not in prompt])
+        
+        self.assertEqual(self.analyzer._parse_pack_response('not json', 2), [None, None])
+    
+    def test_chunk_large_file(self):
+        """큰 파일은 앞 2000자만 보내지 않고 함수 단위 조각으로 나눠 분석한 뒤 합치는지 테스트"""
+        import re
+        import json
+        functions = []
+        for i in range(6):
+            body = ''.join(f"    value_{j} = x + {j}\n" for j in range(40))
+            functions.append(f"def func_{i}(x):\n    if x:\n        return x\n{body}    return value_0\n")
+        content = "import os\n\n" + "\n".join(functions)
+        self.assertGreater(len(content), 4000)
+        self.create_test_file("large.py", content)
+        
+        chunks = self.analyzer._split_into_chunks(content, "large.py")
+        self.assertEqual(len(chunks), 7)
+        self.assertIn("func_5", chunks[5][0])
+        self.assertIn("import os", chunks[6][1])
+        
+        analysis = {'cyclomatic_complexity': 2, 'maintainability_index': 80, 'estimated_dev_hours': 1,
+                    'difficulty_score': 2, 'developer_level': 'Junior', 'pattern_score': 4,
+                    'optimization_score': 6, 'best_practices_score': 6, 'tech_stack_identification': 'Python'}
+        prompts = []
+        def fake_invoke(prompt, max_tokens):
+            prompts.append(prompt)
+            if '프로젝트 분석 결과' in prompt:
+                return '{"result": "신입사원도 충분히 개발 가능함", "desc": "간단함"}'
+            keys = re.findall(r'^### (f\d+)$', prompt, re.M)
+            results = {key: dict(analysis) for key in keys}
+            if 'def func_3' in prompt:
+                results = {key: dict(analysis, difficulty_score=5, developer_level='Senior')
+                           if 'def func_3' in prompt.split(f'### {key}\n')[1].split('### ')[0] else value
+                           for key, value in results.items()}
+            return json.dumps(results)
+        self.analyzer.use_ai = True
+        self.analyzer._invoke_model_once = fake_invoke
+        
+        result = self.analyzer.analyze_project(self.test_dir)
+        row = result['files'][0]
+        # 모든 함수가 프롬프트에 들어감 (잘리지 않음)
+        sent = '\n'.join(prompts)
+        for i in range(6):
+            self.assertIn(f"def func_{i}(x):", sent)
+        self.assertEqual(row['cyclomatic_complexity'], 14)
+        self.assertEqual(row['estimated_dev_hours'], 7)
+        self.assertEqual(row['difficulty_score'], 5)
+        self.assertEqual(row['developer_level'], 'Senior')
+        self.assertEqual(row['tech_stack_identification'], 'Python')
+        
+        # 파일 하나 분석(analyze_file, /analyze_json)도 같은 조각 분석을 사용
+        prompts.clear()
+        single = self.analyzer.analyze_file(os.path.join(self.test_dir, "large.py"))
+        self.assertTrue(prompts)
+        self.assertTrue(all('코드 조각' in prompt for prompt in prompts))
+        self.assertEqual(single['difficulty_score'], 5)
+    
+    def test_plan_estimate(self):
+        """파일을 읽기 전에 대상 파일과 크기 구간별 비용 추정을 먼저 보내는지 테스트"""
+        import asyncio
+        self.create_test_file("a.py", "x = 1\n")
+        self.create_test_file("big.py", "x = 1\n" * 1000)
+        os.makedirs(os.path.join(self.test_dir, "node_modules"))
+        self.create_test_file(os.path.join("node_modules", "dep.js"), "var a = 1;\n")
+        self.analyzer.use_ai = True
+        
+        estimate = self.analyzer.estimate_cost(self.analyzer.plan_project(self.test_dir))
+        self.assertEqual(estimate['files'], 2)
+        self.assertEqual(estimate['tiers']['small']['files'], 1)
+        self.assertEqual(estimate['tiers']['large']['files'], 1)
+        self.assertEqual(estimate['ignored_dirs'], 1)
+        # 작은 파일 묶음 1 + 큰 파일 조각 묶음 1 + 종합 평가 1
+        self.assertEqual(estimate['requests'], 3)
+        
+        async def first_event():
+            events = self.analyzer.analyze_project_events(self.test_dir)
+            try:
+                return await events.__anext__()
+            finally:
+                await events.aclose()
+        event = asyncio.run(first_event())
+        self.assertEqual(event, {'type': 'plan', 'estimate': estimate})
+    
+    def test_sampling_mode(self):
+        """시간 예산을 넘는 프로젝트는 층화 표본만 AI로 분석하고 합계를 외삽하는지 테스트"""
+        import re
+        import json
+        for directory in ("api", "core", "web"):
+            os.makedirs(os.path.join(self.test_dir, directory))
+            for i in range(20):
+                self.create_test_file(os.path.join(directory, f"m{i}.py"), f"value = {i}\n")
+        
+        analysis = {'cyclomatic_complexity': 3, 'maintainability_index': 80, 'estimated_dev_hours': 2,
+                    'difficulty_score': 2, 'developer_level': 'Junior', 'pattern_score': 4,
+                    'optimization_score': 6, 'best_practices_score': 6}
+        prompts = []
+        def fake_invoke(prompt, max_tokens):
+            prompts.append(prompt)
+            if '프로젝트 분석 결과' in prompt:
+                return '{"result": "신입사원도 충분히 개발 가능함", "desc": "간단함"}'
+            keys = re.findall(r'^### (f\d+)$', prompt, re.M)
+            return json.dumps({key: analysis for key in keys} if keys else analysis)
+        self.analyzer.use_ai = True
+        self.analyzer._invoke_model_once = fake_invoke
+        
+        result = self.analyzer.analyze_project(self.test_dir, time_budget=2)
+        self.assertEqual(len(result['files']), 60)
+        local = [r for r in result['files'] if r.get('local_estimate')]
+        self.assertEqual(len(local), 30)
+        sampling = result['summary']['sampling']
+        self.assertEqual(sampling['sampled_files'], 30)
+        self.assertEqual(sampling['local_files'], 30)
+        self.assertEqual(sampling['strata'], 3)
+        # 표본 값이 모두 같으면 분산 0: 외삽 합계가 정확히 60 x 2시간
+        self.assertEqual(result['summary']['total_estimated_hours'], 120)
+        self.assertEqual(sampling['total_estimated_hours'], {'estimate': 120, 'low': 120, 'high': 120})
+        self.assertEqual(result['summary']['avg_complexity'], 3)
+        # 표본 30개 묶음 요청 3번 + 종합 평가
+        self.assertEqual(len(prompts), 4)
+        self.assertIn("120.0시간", prompts[-1])
+        
+        # 다시 분석하면 표본은 캐시를 쓰고 나머지 파일만 AI 분석 (예산 안에 끝나므로 전체 분석)
+        prompts.clear()
+        again = self.analyzer.analyze_project(self.test_dir, time_budget=2)
+        self.assertNotIn('sampling', again['summary'])
+        self.assertFalse(any(r.get('local_estimate') for r in again['files']))
+        self.assertEqual(again['summary']['total_estimated_hours'], 120)
+        self.assertEqual(len(prompts), 4)
+    
     def test_fallback_analysis(self):
         """AI 실패시 fallback 분석 테스트"""
         content = """
@@ -0,0 +1,79 @@
+import unittest
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from code_metrics import compute_metrics, maintainability_index
+
+
+class TestCodeMetrics(unittest.TestCase):
+
+    def test_c_family_metrics(self):
+        """C 계열: 줄 분류, 분기 수, 문자열/식별자 안의 키워드 무시 테스트"""
+        code = (
+            "/* header\n"
+            " * more\n"
+            " */\n"
+            "int diff(int a, int b) { // compare\n"
+            "    if (a > b && b > 0) return a - b;\n"
+            "\n"
+            "    const char *s = \"if for while\";\n"
+            "    return a ? b : 0;\n"
+            "}"
+        )
+        metrics = compute_metrics(code, 'diff.cpp')
+        self.assertEqual(metrics.total_lines, 9)
+        self.assertEqual(metrics.code_lines, 5)
+        self.assertEqual(metrics.comment_lines, 3)
+        self.assertEqual(metrics.blank_lines, 1)
+        # if, &&, ?
+        self.assertEqual(metrics.cyclomatic_complexity, 4)
+        self.assertEqual(metrics.keyword_counts['return'], 2)
+        self.assertIn('diff', metrics.names)
+        self.assertGreater(metrics.halstead_volume, 0)
+
+    def test_python_metrics(self):
+        """Python: 주석/여러 줄 문자열 줄 분류와 and/or/elif/컴프리헨션 분기 테스트"""
+        code = (
+            "def f(x):\n"
+            "    \"\"\"doc\n"
+            "    string\"\"\"\n"
+            "    # comment\n"
+            "    if x and not x.startswith('a'):\n"
+            "        return [i for i in x if i]\n"
+            "    elif x:\n"
+            "        pass\n"
+        )
+        metrics = compute_metrics(code, 'f.py')
+        self.assertEqual(metrics.total_lines, len(code.split('\n')))
+        self.assertEqual(metrics.code_lines, 7)
+        self.assertEqual(metrics.comment_lines, 1)
+        self.assertEqual(metrics.blank_lines, 1)
+        # if, and, for, if, elif
+        self.assertEqual(metrics.cyclomatic_complexity, 6)
+        self.assertTrue(metrics.mentions('startswith'))
+        self.assertFalse(metrics.mentions('async'))
+        self.assertTrue(0 < maintainability_index(metrics) <= 100)
+
+    def test_same_content_computed_once(self):
+        """같은 내용은 한 번만 계산해서 공유하는지 테스트"""
+        code = "x = 1\n"
+        self.assertIs(compute_metrics(code, 'a.py'), compute_metrics(code, 'b.py'))
+        self.assertEqual(compute_metrics('', 'a.py').total_lines, 1)
+
+    def test_cache_does_not_keep_content(self):
+        """캐시가 파일 내용 대신 해시를 키로 쓰고 크기 제한을 지키는지 테스트"""
+        import code_metrics
+        big = "int x;\n" * 10000
+        self.assertIs(compute_metrics(big, 'a.c'), compute_metrics(''.join(["int x;\n"] * 10000), 'b.c'))
+        for key in code_metrics._metrics_cache:
+            self.assertNotIn(big, key)
+        for i in range(code_metrics.METRICS_CACHE_SIZE + 5):
+            compute_metrics(f"int v{i};\n", 'a.c')
+        self.assertEqual(len(code_metrics._metrics_cache), code_metrics.METRICS_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import tempfile
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from disk_cache import DiskCache
+from function_extractor import FunctionExtractor
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.test_dir, 'cache.db')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_get_set_and_stats(self):
+        """저장/조회 및 히트/미스 통계 테스트"""
+        cache = DiskCache(self.cache_path)
+        self.assertIsNone(cache.get('missing'))
+        cache.set('key', {'value': [1, 2, 3]})
+        self.assertEqual(cache.get('key'), {'value': [1, 2, 3]})
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+        cache.close()
+
+        # 재시작 후에도 유지
+        reopened = DiskCache(self.cache_path)
+        self.assertEqual(reopened.get('key'), {'value': [1, 2, 3]})
+        self.assertEqual(reopened.stats()['bytes'], stats['bytes'])
+        reopened.close()
+
+    def test_lru_eviction(self):
+        """용량 초과 시 가장 오래 사용되지 않은 항목 제거 테스트"""
+        cache = DiskCache(self.cache_path, max_bytes=200, access_interval=0)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, 'x' * 60)
+        cache.get('a')              # a를 최근 사용으로 갱신
+        cache.set('d', 'x' * 60)    # 용량 초과 -> b 제거
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('d'))
+        self.assertLessEqual(cache.stats()['bytes'], 200)
+        cache.close()
+
+    def test_access_time_update_interval(self):
+        """조회 시각은 저장된 값이 access_interval보다 오래됐을 때만 다시 기록"""
+        cache = DiskCache(self.cache_path, access_interval=60)
+        cache.set('key', 'value')
+        last_access = lambda: cache._conn.execute(
+            "SELECT last_access FROM cache WHERE key = 'key'").fetchone()[0]
+        stored = last_access()
+
+        cache.get('key')
+        self.assertEqual(last_access(), stored)
+
+        cache._conn.execute("UPDATE cache SET last_access = ? WHERE key = 'key'", (stored - 120,))
+        cache.get('key')
+        self.assertGreaterEqual(last_access(), stored)
+        cache.close()
+
+    def test_memory_l1(self):
+        """최근 항목은 메모리 L1에서 반환하고, 반환값을 수정해도 캐시에 영향 없음"""
+        cache = DiskCache(self.cache_path, memory_items=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, {'items': [key]})
+
+        value = cache.get('c')
+        value['items'].append('changed')
+        self.assertEqual(cache.get('c'), {'items': ['c']})
+        self.assertEqual(cache.stats()['memory_hits'], 2)
+
+        # L1에서 밀려난 항목은 SQLite에서 읽어 다시 L1에 올림
+        self.assertEqual(cache.get('a'), {'items': ['a']})
+        stats = cache.stats()
+        self.assertEqual(stats['memory_hits'], 2)
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['memory_entries'], 2)
+        cache.close()
+
+    def test_extractor_uses_cache(self):
+        """같은 내용의 파일은 캐시에서 추출 결과를 재사용하는지 테스트"""
+        cache = DiskCache(self.cache_path)
+        extractor = FunctionExtractor(cache=cache)
+        code = "int twice(int x) { return x * 2; }\n"
+
+        first = extractor.extract_functions(code)
+        second = extractor.extract_functions(code)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+        results = extractor.extract_many([code, "void other() {}\n"])
+        self.assertTrue(results[0]['cached'])
+        self.assertFalse(results[1]['cached'])
+        self.assertEqual(results[0]['functions'], first)
+        self.assertTrue(extractor.extract_many(["void other() {}\n"])[0]['cached'])
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
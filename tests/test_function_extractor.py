@@ -1,4 +1,5 @@
 import unittest
+import asyncio
 import tempfile
 import os
 import sys
@@ -6,6 +7,7 @@ import sys
 # 서버 모듈 경로 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
 
+import function_extractor
 from function_extractor import FunctionExtractor
 
 
@@ -164,6 +166,308 @@ def documented_function(param1, param2='default'):
         
         self.assertEqual(len(functions), 0)
     
+    def test_extract_java_go_typescript_functions(self):
+        """Java/Go/TypeScript 함수 추출 테스트 (문자열/주석 안의 선언과 중괄호 무시)"""
+        self.create_test_file("Util.java", """
+public class Util {
+    private static final String FAKE = "int fake() {";
+    public Util() { }
+    /** Reverses a string. */
+    public static String reverse(String s) {
+        if (s == null) { return null; }
+        return new StringBuilder(s).reverse().toString();
+    }
+    abstract int todo();
+}
+""")
+        self.create_test_file("util.go", """
+package util
+
+// Add returns a + b.
+func Add(a, b int) int {
+	s := "}"
+	return a + b
+}
+
+func (s *Server) Handle(r *Request) (int, error) {
+	return 0, nil
+}
+""")
+        self.create_test_file("util.ts", """
+export function sum(a: number, b: number): number {
+  // function commented() {
+  return a + b;
+}
+export const double = (x: number): number => {
+  return x * 2;
+};
+class Service {
+  async fetch(url: string): Promise<string> {
+    return `${url}{`;
+  }
+}
+""")
+        functions = self.extractor.extract_functions_from_directory(self.test_dir)
+        by_name = {f['name']: f for funcs in functions.values() for f in funcs}
+
+        self.assertEqual(sorted(by_name), ['Add', 'Handle', 'double', 'fetch', 'reverse', 'sum'])
+        self.assertEqual(by_name['reverse']['docstring'], 'Reverses a string.')
+        self.assertEqual(by_name['reverse']['parameters'], 'String s')
+        self.assertEqual(by_name['Add']['docstring'], 'Add returns a + b.')
+        self.assertEqual(by_name['Handle']['return_type'], '(int, error) - 함수 반환값')
+        self.assertEqual(by_name['sum']['line_number'], 2)
+        self.assertEqual(by_name['fetch']['language'], 'typescript')
+        self.assertTrue(by_name['double']['code'].endswith('return x * 2;\n}'))
+
+    def test_extract_cpp_functions(self):
+        """C++ 함수 추출 테스트 (문자열/주석 안의 중괄호 무시)"""
+        content = """
+#define BLOCK(x) { x }
+namespace util {
+// int commented_out() {
+static std::string trim(const std::string& s)
+{
+    const char* braces = "}{";
+    char close = '}';
+    /* } */
+    return s;
+}
+}
+
+extern "C" {
+int add(int a,
+        int b)
+{
+    return a + b;
+}
+}
+"""
+        functions = self.extractor.extract_functions(content)
+
+        self.assertEqual([f['name'] for f in functions], ['trim', 'add'])
+
+        trim = functions[0]
+        self.assertEqual(trim['line'], 5)
+        self.assertEqual(trim['parameters'], 'const std::string& s')
+        self.assertEqual(trim['original_signature'], 'std::string trim(const std::string& s)')
+        self.assertEqual(trim['header_declaration'], 'LIBRARY_API std::string trim(const std::string& s);')
+        self.assertTrue(trim['code'].startswith('static std::string trim('))
+        self.assertTrue(trim['code'].endswith('return s;\n}'))
+
+        add = functions[1]
+        self.assertEqual(add['parameters'], 'int a, int b')
+        self.assertTrue(add['code'].endswith('return a + b;\n}'))
+
+    def test_cpp_trailing_return_type(self):
+        """후행 반환 타입(-> type)과 noexcept가 헤더 선언과 시그니처에 포함되는지 테스트"""
+        content = "auto trailing(int x) -> int { return x; }\nauto safe(int x) noexcept -> long\n{\n    return x;\n}\n"
+        functions = self.extractor.extract_functions(content)
+
+        self.assertEqual([f['name'] for f in functions], ['trailing', 'safe'])
+        self.assertEqual(functions[0]['header_declaration'], 'LIBRARY_API auto trailing(int x) -> int;')
+        self.assertEqual(functions[0]['original_signature'], 'auto trailing(int x) -> int')
+        self.assertEqual(functions[1]['header_declaration'], 'LIBRARY_API auto safe(int x) noexcept -> long;')
+
+        span = self.extractor.extract_spans(content)[0]
+        self.assertEqual(span.trailer, '-> int')
+        self.assertEqual(span.signature, 'auto trailing(int x) -> int')
+
+    def test_cpp_excluded_functions(self):
+        """템플릿, 엔트리 포인트, 클래스 멤버 함수 제외 테스트"""
+        content = """
+template <typename T>
+T max_of(T a, T b) { return a > b ? a : b; }
+
+class Counter {
+public:
+    int get() const { return value; }
+};
+
+int Counter::increment() { return ++value; }
+
+int main(int argc, char** argv) { return 0; }
+
+double square(double x) { return x * x; }
+"""
+        functions = self.extractor.extract_functions(content)
+
+        self.assertEqual([f['name'] for f in functions], ['square'])
+
+    def test_extract_spans(self):
+        """오프셋 기반 FunctionSpan 추출 테스트"""
+        content = "static int twice(int x) { return x * 2; }\nvoid noop() {}\n"
+        spans = self.extractor.extract_spans(content)
+
+        self.assertEqual(len(spans), 2)
+        for span in spans:
+            self.assertIs(span.source, content)
+
+        twice = spans[0]
+        self.assertEqual(content[twice.name_start:twice.name_end], 'twice')
+        self.assertEqual(content[twice.sig_start:twice.sig_end], 'int twice(int x)')
+        self.assertEqual(twice.code, content[twice.start:twice.end])
+        self.assertEqual(twice.signature, 'int twice(int x)')
+        self.assertEqual(spans[1].line, 2)
+
+        self.assertEqual([span.to_dict() for span in spans],
+                         self.extractor.extract_functions(content))
+
+    def test_extract_many_keeps_order(self):
+        """여러 파일 병렬 추출 시 입력 순서 유지 테스트"""
+        sources = [f"int func_{i}(int x) {{ return x + {i}; }}\n" for i in range(4)]
+        results = self.extractor.extract_many(sources)
+
+        self.assertEqual(len(results), 4)
+        for i, result in enumerate(results):
+            self.assertIsNone(result['error'])
+            self.assertGreaterEqual(result['elapsed'], 0)
+            self.assertEqual([f['name'] for f in result['functions']], [f'func_{i}'])
+
+        async_results = asyncio.run(self.extractor.extract_many_async(sources))
+        self.assertEqual(async_results[2]['functions'], results[2]['functions'])
+
+    def test_extract_many_recovers_broken_pool(self):
+        """작업 프로세스가 죽어 풀이 깨져도 새 풀로 다시 추출하는지 테스트"""
+        import function_extractor
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        broken = ProcessPoolExecutor(max_workers=1)
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+        function_extractor._process_pool = broken
+
+        sources = [f"int pool_{i}(int x) {{ return x * {i}; }}\n" for i in range(3)]
+        results = self.extractor.extract_many(sources)
+        self.assertEqual([r['functions'][0]['name'] for r in results], ['pool_0', 'pool_1', 'pool_2'])
+        self.assertIsNot(function_extractor._process_pool, broken)
+
+        function_extractor._process_pool = broken
+        async_results = asyncio.run(self.extractor.extract_many_async(sources))
+        self.assertEqual(async_results[1]['functions'], results[1]['functions'])
+        self.assertIsNot(function_extractor._process_pool, broken)
+
+    def test_extract_incremental(self):
+        """변경된 함수만 다시 추출하는 증분 추출 테스트"""
+        old = """int keep(int x)
+{
+    return x;
+}
+
+int change(int x) { return x + 1; }
+
+int drop(int x) { return x - 1; }
+"""
+        new = "// header\n" + old.replace("x + 1", "x + 2").replace("int drop(int x) { return x - 1; }\n", "void add() {}\n")
+        result = self.extractor.extract_incremental(self.extractor.extract_spans(old), new)
+
+        self.assertFalse(result['full_parse'])
+        self.assertEqual([s.name for s in result['added']], ['add'])
+        self.assertEqual([s.name for s in result['modified']], ['change'])
+        self.assertEqual([s.name for s in result['removed']], ['drop'])
+        self.assertEqual([s.to_dict() for s in result['spans']], self.extractor.extract_functions(new))
+
+        # 블록 주석이 바뀌면 전체 재추출
+        commented = old.replace("int drop", "/* int drop")
+        result = self.extractor.extract_incremental(self.extractor.extract_spans(old), commented)
+        self.assertTrue(result['full_parse'])
+        self.assertEqual([s.to_dict() for s in result['spans']], self.extractor.extract_functions(commented))
+
+    def test_disabled_preprocessor_branches(self):
+        """#if 0, 플랫폼 분기 등 비활성 전처리 분기 제외 테스트"""
+        content = """
+#ifndef UTIL_H
+#define UTIL_H
+#if 0
+int dead_code() { return 0; }
+#endif
+#ifdef _WIN32
+int platform_id() { return 1; }
+#elif defined(__linux__)
+int platform_id() { return 2; }
+#else
+int platform_id() { return 3; }
+#endif
+#if HAVE_FEATURE
+int feature() { return 1; }
+#else
+int feature() { return 0; }
+#endif
+int count(int a) {
+#ifdef _MSC_VER
+    if (a) {
+#else
+    if (!a) {
+#endif
+        return 1;
+    }
+    return 0;
+}
+#endif
+"""
+        functions = self.extractor.extract_functions(content)
+
+        self.assertEqual([f['name'] for f in functions], ['platform_id', 'feature', 'count'])
+        self.assertIn('return 2;', functions[0]['code'])
+        self.assertIn('return 1;', functions[1]['code'])
+        self.assertTrue(functions[2]['code'].endswith('return 0;\n}'))
+
+    @unittest.skipIf(function_extractor.np is None, "numpy 미설치")
+    def test_brace_index_matches_scan(self):
+        """NumPy 중괄호 인덱스 사용 시에도 결과가 같은지 테스트"""
+        content = """
+static const char* open_brace() { return "{"; }
+int nested(int x)
+{
+    // }
+    if (x) { x = '}'; }
+    const char* raw = R"d(}})d";
+#if 0 // {
+#endif
+    return x;
+}
+void unterminated() {
+    int y = 0;
+"""
+        expected = self.extractor.extract_functions(content)
+        original = function_extractor.BRACE_INDEX_MIN_SIZE
+        function_extractor.BRACE_INDEX_MIN_SIZE = 0
+        try:
+            self.assertEqual(self.extractor.extract_functions(content), expected)
+        finally:
+            function_extractor.BRACE_INDEX_MIN_SIZE = original
+        self.assertEqual([f['name'] for f in expected], ['open_brace', 'nested', 'unterminated'])
+
+    def test_extract_functions_stream(self):
+        """청크 단위 스트리밍 추출이 전체 추출과 같은지 테스트 (청크 경계의 주석/분기/raw 문자열)"""
+        import io
+        content = """
+#define USE_FAST 1
+/* block { comment */
+int first(int a) { return a + 1; }
+#if USE_FAST
+const char* fast() { return R"x(} ; {)x"; }
+#else
+const char* fast() { return "slow"; }
+#endif
+namespace util {
+static double scale(double x)
+{
+    if (x > 0) { return x * 2; }
+    return '}';
+}
+}
+static const int table[] = {1, 2, 3};
+int last(void) { return 0; }
+"""
+        expected = self.extractor.extract_functions(content)
+        self.assertEqual([f['name'] for f in expected], ['first', 'fast', 'scale', 'last'])
+
+        for chunk_size in (1, 5, 64):
+            text_stream = self.extractor.extract_functions_stream(io.StringIO(content), chunk_size)
+            self.assertEqual(list(text_stream), expected)
+            binary_stream = self.extractor.extract_functions_stream(io.BytesIO(content.encode()), chunk_size)
+            self.assertEqual(list(binary_stream), expected)
+
     def test_unsupported_file_type(self):
         """지원하지 않는 파일 타입 테스트"""
         file_path = self.create_test_file("test.txt", "This is not code")
@@ -0,0 +1,90 @@
+import unittest
+import asyncio
+import tempfile
+import os
+import sys
+from unittest.mock import Mock, patch
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from disk_cache import DiskCache
+from function_fingerprint import RefactorStore, function_fingerprint
+
+
+class TestFunctionFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = RefactorStore(DiskCache(os.path.join(self.test_dir, 'store.db')), 'model:1')
+
+    def tearDown(self):
+        import shutil
+        self.store.cache.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_fingerprint_ignores_formatting_comments_and_renames(self):
+        """공백/주석/지역 식별자 이름이 달라도 같은 핑거프린트"""
+        original = '''std::string trim(const std::string& s) {
+    size_t start = s.find_first_not_of(" \\t");
+    return start == std::string::npos ? "" : s.substr(start);
+}'''
+        renamed = '''// 앞쪽 공백 제거
+std::string ltrim(const std::string &text)
+{
+    size_t first = text.find_first_not_of(" \\t");  /* 첫 문자 */
+    return first == std::string::npos ? "" : text.substr(first);
+}'''
+        self.assertEqual(function_fingerprint(original, 'trim'), function_fingerprint(renamed, 'ltrim'))
+
+        # 호출하는 함수, 문자열, 연산자가 다르면 다른 핑거프린트
+        for changed in (original.replace('find_first_not_of', 'find_last_not_of'),
+                        original.replace('" \\t"', '" "'),
+                        original.replace('==', '!=')):
+            self.assertNotEqual(function_fingerprint(original, 'trim'), function_fingerprint(changed, 'trim'))
+
+    def test_fingerprint_keeps_types_and_globals(self):
+        """매개변수/지역 변수만 정규화하고 타입 이름과 전역 이름은 구분"""
+        original = 'int f(Foo* p){ return p->x + LIMIT; }'
+        self.assertNotEqual(function_fingerprint(original, 'f'),
+                            function_fingerprint('int f(Bar* p){ return p->x + OTHER; }', 'f'))
+        self.assertNotEqual(function_fingerprint(original, 'f'),
+                            function_fingerprint('int f(Foo* p){ return p->x + OTHER; }', 'f'))
+        self.assertEqual(function_fingerprint(original, 'f'),
+                         function_fingerprint('int g(Foo* q) { return q->x + LIMIT; }', 'g'))
+
+    def test_store_returns_result_for_renamed_function(self):
+        """저장된 결과를 이름만 다른 함수에 새 이름으로 반환"""
+        func = {'name': 'add', 'code': 'int add(int a, int b) { return a + b; }'}
+        self.assertIsNone(self.store.lookup(func))
+        self.store.record(func, [{'name': 'add', 'code': 'LIBRARY_API int add(int a, int b) { return a + b; }',
+                                  'header_declaration': 'LIBRARY_API int add(int a, int b);'}])
+
+        renamed = {'name': 'sum', 'code': 'int sum(int x, int y)\n{\n    return x + y;\n}'}
+        utilities = self.store.lookup(renamed)
+        self.assertEqual(utilities[0]['name'], 'sum')
+        self.assertEqual(utilities[0]['header_declaration'], 'LIBRARY_API int sum(int a, int b);')
+
+        # 리팩토링 대상에서 빠진 함수는 빈 목록으로 기억
+        skipped = {'name': 'noop', 'code': 'void noop() {}'}
+        self.store.record(skipped, [])
+        self.assertEqual(self.store.lookup(skipped), [])
+
+    @patch('agents.code_analyzer_agent.get_bedrock_client')
+    def test_known_functions_skip_bedrock(self, mock_bedrock):
+        """저장된 함수만 있으면 Bedrock을 호출하지 않음"""
+        from agents.code_analyzer_agent import CodeAnalyzerAgent
+        mock_bedrock.return_value = Mock()
+        agent = CodeAnalyzerAgent(self.store)
+
+        func = {'name': 'square', 'code': 'int square(int v) { return v * v; }'}
+        stored = {'name': 'square', 'code': 'int square(int v) { return v * v; }', 'reusability_score': 8}
+        self.store.record(func, [stored])
+
+        result = asyncio.run(agent.refactor_functions([func], "", "cpp"))
+        self.assertEqual(result, [stored])
+        mock_bedrock.return_value.converse.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
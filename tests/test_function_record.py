@@ -0,0 +1,101 @@
+import unittest
+import tracemalloc
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from function_extractor import FunctionExtractor
+from function_record import FunctionRecord
+
+
+def analyzed_dict(func, filename):
+    """/analyze가 추출 결과에 파일 정보를 붙이던 방식 그대로 만든 dict"""
+    func = dict(func)
+    func['source_file'] = filename
+    func['file_extension'] = filename.split('.')[-1]
+    func['file'] = filename
+    func['type'] = 'function'
+    func['line'] = func.get('line', 1)
+    func['path'] = filename
+    if func.get('language', 'cpp') != 'cpp':
+        func['signature'] = func.get('original_signature', func['name'])
+    else:
+        func['signature'] = f"{func['return_type']} {func['name']}({func['parameters']})"
+    return func
+
+
+class TestFunctionRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = FunctionExtractor()
+
+    def test_round_trip_keeps_json_shape(self):
+        """추출 결과/AI 결과 모두 to_dict가 원래 dict와 같은지"""
+        cpp = self.extractor.extract_functions('''
+/// 두 수의 합
+int add(int a, int b) { return a + b; }
+void reset(void) { }
+''')
+        py = self.extractor.extract_functions('def greet(name: str) -> str:\n    """인사"""\n    return name\n', 'python')
+        ai_utility = {
+            'name': 'trim', 'description': '문자열 공백 제거', 'code': 'std::string trim(std::string s) { return s; }',
+            'parameters': 'std::string s', 'return_type': 'std::string', 'purpose': '공백 제거',
+            'header_declaration': 'LIBRARY_API std::string trim(std::string s);',
+            'required_headers': ['<string>'], 'reusability_score': 9, 'line': 1, 'type': 'function'
+        }
+        originals = [analyzed_dict(func, 'src/util.cpp') for func in cpp]
+        originals += [analyzed_dict(func, 'tools/greet.py') for func in py]
+        originals.append(ai_utility)
+
+        for original in originals:
+            record = FunctionRecord.from_dict(original)
+            self.assertEqual(record.to_dict(), original)
+            self.assertEqual(set(record.keys()), set(original))
+
+        # 추출기가 채운 파생 필드는 따로 저장하지 않음
+        record = FunctionRecord.from_dict(originals[0])
+        self.assertIsNone(record._extra)
+        self.assertEqual(record['signature'], 'int - 함수 반환값 add(int a, int b)')
+        self.assertEqual(record.get('file_extension'), 'cpp')
+        self.assertIn('purpose', record)
+        self.assertNotIn('required_headers', record)
+        self.assertIsNone(record.get('required_headers'))
+        with self.assertRaises(KeyError):
+            record['required_headers']
+
+        # 키 순서와 상관없이 signature가 original_signature에서 만들어지면 따로 저장하지 않음
+        data = {'name': 'greet', 'language': 'python', 'signature': 'def greet(name)',
+                'original_signature': 'def greet(name)', 'return_type': '', 'parameters': 'name'}
+        record = FunctionRecord.from_dict(data)
+        self.assertEqual(record.to_dict(), data)
+        self.assertNotIn('signature', record._extra)
+
+        # 파일명은 intern되어 레코드끼리 같은 객체를 공유
+        record = FunctionRecord.from_dict(originals[0])
+        other = FunctionRecord.from_dict(analyzed_dict(cpp[1], ''.join(['src/', 'util.cpp'])))
+        self.assertIs(record.source_file, other.source_file)
+
+    def test_records_use_less_memory_than_dicts(self):
+        """레코드 목록이 같은 내용의 dict 목록보다 메모리를 적게 사용"""
+        code = ''.join(f'static int helper_{i}(int value, const char* label) {{ return value + {i}; }}\n'
+                       for i in range(2000))
+        functions = self.extractor.extract_functions(code)
+
+        tracemalloc.start()
+        try:
+            dicts = [analyzed_dict(func, 'src/generated.cpp') for func in functions]
+            dict_bytes = tracemalloc.get_traced_memory()[0]
+            records = [FunctionRecord.from_dict(func) for func in dicts]
+            del dicts
+            record_bytes = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(records), 2000)
+        self.assertLess(record_bytes, dict_bytes * 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
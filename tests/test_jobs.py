@@ -0,0 +1,138 @@
+import unittest
+import tempfile
+import asyncio
+import time
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from jobs import JobQueue, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'jobs.db')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def make_queue(self, order):
+        queue = JobQueue(self.db_path, {'interactive': 1, 'batch': 1})
+
+        async def slow(payload, job):
+            order.append(('start', payload['name']))
+            job.progress(done=0, total=1)
+            await asyncio.sleep(payload.get('seconds', 0))
+            order.append(('end', payload['name']))
+            return {'name': payload['name']}
+
+        def quick(payload, job):
+            order.append(('quick', payload['name']))
+            if payload.get('fail'):
+                raise ValueError("실패")
+            return payload['name'].upper()
+
+        queue.register('scan', slow, 'batch')
+        queue.register('single', quick, 'interactive')
+        return queue
+
+    async def wait_for(self, queue, job_id, statuses, timeout=5):
+        deadline = time.time() + timeout
+        while queue.get(job_id)['status'] not in statuses:
+            self.assertLess(time.time(), deadline)
+            await asyncio.sleep(0.01)
+
+    def test_priority_and_separate_queues(self):
+        """대화형 작업은 일괄 작업을 기다리지 않고, 같은 큐에서는 우선순위 순으로 실행되는지 테스트"""
+        order = []
+        queue = self.make_queue(order)
+        long_scan = queue.submit('scan', {'name': 'long', 'seconds': 0.3})
+
+        async def run():
+            await queue.start()
+            await self.wait_for(queue, long_scan, (RUNNING,))
+            low = queue.submit('scan', {'name': 'low'})
+            high = queue.submit('scan', {'name': 'high'}, priority=5)
+            self.assertEqual(queue.get(low)['queue_position'], 1)
+            self.assertEqual(queue.get(high)['queue_position'], 0)
+            single = queue.submit('single', {'name': 'file'})
+            await self.wait_for(queue, single, (SUCCEEDED,))
+            # 긴 일괄 작업이 끝나기 전에 대화형 작업 완료
+            self.assertEqual(queue.get(long_scan)['status'], RUNNING)
+            await self.wait_for(queue, low, (SUCCEEDED,))
+            await queue.stop()
+            return single, low
+        single, low = asyncio.run(run())
+
+        self.assertEqual(order, [('start', 'long'), ('quick', 'file'), ('end', 'long'),
+                                 ('start', 'high'), ('end', 'high'), ('start', 'low'), ('end', 'low')])
+        self.assertEqual(queue.get(single, with_result=True)['result'], 'FILE')
+        self.assertEqual(queue.get(low, with_result=True)['result'], {'name': 'low'})
+        self.assertEqual(queue.get(low)['progress'], {'done': 0, 'total': 1})
+        self.assertEqual(queue.stats()['batch'], {SUCCEEDED: 3})
+        queue.close()
+
+    def test_cancel_and_failure(self):
+        """대기/실행 중 작업 취소와 핸들러 예외 기록 테스트"""
+        order = []
+        queue = self.make_queue(order)
+        running = queue.submit('scan', {'name': 'running', 'seconds': 5})
+        waiting = queue.submit('scan', {'name': 'waiting'})
+        failing = queue.submit('single', {'name': 'bad', 'fail': True})
+
+        async def run():
+            await queue.start()
+            await self.wait_for(queue, running, (RUNNING,))
+            self.assertEqual(queue.cancel(waiting)['status'], CANCELLED)
+            self.assertEqual(queue.cancel(running)['status'], CANCELLED)
+            await self.wait_for(queue, failing, (FAILED,))
+            await asyncio.sleep(0.05)
+            await queue.stop()
+        asyncio.run(run())
+
+        self.assertEqual(sorted(order), [('quick', 'bad'), ('start', 'running')])
+        self.assertEqual(queue.get(failing)['error'], "실패")
+        self.assertIsNone(queue.get(running, with_result=True)['result'])
+        # 끝난 작업은 다시 취소해도 그대로
+        self.assertEqual(queue.cancel(failing)['status'], FAILED)
+        self.assertIsNone(queue.get('missing'))
+        queue.close()
+
+    def test_survives_restart(self):
+        """대기 중이던 작업과 실행 중에 중단된 작업이 재시작 후 다시 실행되는지 테스트"""
+        order = []
+        queue = self.make_queue(order)
+        interrupted = queue.submit('scan', {'name': 'interrupted', 'seconds': 5})
+        pending = queue.submit('single', {'name': 'pending'})
+
+        async def stop_midway():
+            await queue.start()
+            await self.wait_for(queue, interrupted, (RUNNING,))
+            await queue.stop()
+        # interactive 워커가 pending을 먼저 끝내지 않도록 대화형 큐 없이 시작
+        queue.queues = {'batch': 1}
+        asyncio.run(stop_midway())
+        self.assertEqual(queue.get(interrupted)['status'], RUNNING)
+        self.assertEqual(queue.get(pending)['status'], QUEUED)
+        queue.close()
+
+        restarted = self.make_queue(order)
+        self.assertEqual(restarted.get(interrupted)['status'], QUEUED)
+
+        async def resume():
+            await restarted.start()
+            await self.wait_for(restarted, pending, (SUCCEEDED,))
+            restarted.cancel(interrupted)
+            await restarted.stop()
+        asyncio.run(resume())
+        self.assertEqual(order.count(('start', 'interrupted')), 2)
+        restarted.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import tempfile
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from project_fingerprint import fingerprint_project
+from scan_planner import plan_scan
+
+
+class TestProjectFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.test_dir, 'project')
+        os.makedirs(os.path.join(self.project_dir, 'src'))
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def create_test_file(self, filename, content):
+        """테스트용 파일 생성"""
+        file_path = os.path.join(self.project_dir, filename)
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return file_path
+
+    def test_entries_and_read_text(self):
+        """대상 확장자만 상대 경로 순으로 해시하고, 읽은 내용을 텍스트 모드와 같게 돌려주는지 테스트"""
+        self.create_test_file('src/b.py', "print('b')\r\n")
+        self.create_test_file('a.cpp', "int a() { return 1; }\n")
+        self.create_test_file('notes.txt', "ignored")
+
+        entries = fingerprint_project(self.project_dir, {'.py', '.cpp'})
+        self.assertEqual([e.rel_path for e in entries], ['a.cpp', os.path.join('src', 'b.py')])
+        self.assertTrue(all(e.digest for e in entries))
+        self.assertEqual(entries[1].read_text(), "print('b')\n")
+        # 해시할 때 읽은 내용은 한 번 쓰고 버림 (다시 부르면 파일에서 읽음)
+        self.assertEqual(entries[1].read_text(), "print('b')\n")
+
+    def test_same_content_in_fresh_directory(self):
+        """새 디렉토리에 같은 내용을 올리면 같은 해시가 나오고, 내용이 바뀐 파일만 해시가 달라지는지 테스트"""
+        self.create_test_file('a.py', "print('a')\n")
+        self.create_test_file('b.py', "print('b')\n")
+        first = fingerprint_project(self.project_dir, {'.py'})
+
+        copy_dir = os.path.join(self.test_dir, 'copy')
+        os.makedirs(copy_dir)
+        for name, content in (('a.py', "print('a')\n"), ('b.py', "print('B')\n")):
+            with open(os.path.join(copy_dir, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        second = fingerprint_project(copy_dir, {'.py'})
+        self.assertEqual(second[0].digest, first[0].digest)
+        self.assertNotEqual(second[1].digest, first[1].digest)
+
+    def test_unreadable_file_is_dropped(self):
+        """목록을 만든 뒤 사라진 파일은 결과에서 빠지는지 테스트"""
+        self.create_test_file('a.py', "print('a')\n")
+        gone = self.create_test_file('b.py', "print('b')\n")
+        plan = plan_scan(self.project_dir, {'.py'})
+        os.remove(gone)
+        entries = fingerprint_project(self.project_dir, {'.py'}, plan=plan)
+        self.assertEqual([e.rel_path for e in entries], ['a.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import asyncio
+import time
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+import rate_limiter
+from rate_limiter import TokenBucket, call_with_retry, call_with_retry_async, is_throttling_error
+
+
+class ThrottlingError(Exception):
+    """botocore ClientError와 같은 모양의 쓰로틀링 오류"""
+
+    def __init__(self):
+        super().__init__('ThrottlingException: Too many requests')
+        self.response = {'Error': {'Code': 'ThrottlingException'}}
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self._base_delay = rate_limiter.THROTTLE_BASE_DELAY
+        rate_limiter.THROTTLE_BASE_DELAY = 0.01
+
+    def tearDown(self):
+        rate_limiter.THROTTLE_BASE_DELAY = self._base_delay
+
+    def test_token_bucket_limits_rate(self):
+        """버스트만큼은 바로 통과하고 이후에는 분당 요청 수에 맞춰 기다리는지 테스트"""
+        bucket = TokenBucket(rate_per_minute=600, burst=2)    # 초당 10개
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.25)
+        self.assertLess(elapsed, 1.0)
+
+    def test_retry_on_throttling(self):
+        """쓰로틀링 오류는 재시도하고 다른 오류는 바로 전달하는지 테스트"""
+        bucket = TokenBucket(rate_per_minute=60000)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ThrottlingError()
+            return 'ok'
+
+        self.assertEqual(call_with_retry(flaky, bucket), 'ok')
+        self.assertEqual(len(calls), 3)
+
+        calls.clear()
+        self.assertEqual(asyncio.run(call_with_retry_async(flaky, bucket)), 'ok')
+        self.assertEqual(len(calls), 3)
+
+        def broken():
+            raise ValueError('bad request')
+
+        def throttled():
+            raise ThrottlingError()
+
+        with self.assertRaises(ValueError):
+            call_with_retry(broken, bucket)
+        with self.assertRaises(ThrottlingError):
+            call_with_retry(throttled, bucket, max_retries=2)
+        self.assertTrue(is_throttling_error(ThrottlingError()))
+        self.assertFalse(is_throttling_error(ValueError('bad request')))
+
+
+if __name__ == '__main__':
+    unittest.main()
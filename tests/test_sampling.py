@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from sampling import allocate, stratify, stratified_sample, stratified_total
+
+
+class TestSampling(unittest.TestCase):
+
+    def test_allocate(self):
+        """층 크기에 비례해 배분하고 각 층에 최소 1개를 주는지 테스트"""
+        self.assertEqual(allocate({'a': 90, 'b': 9, 'c': 1}, 10), {'a': 8, 'b': 1, 'c': 1})
+        self.assertEqual(allocate({'a': 50, 'b': 50}, 11), {'a': 6, 'b': 5})
+        self.assertEqual(allocate({'a': 2, 'b': 30}, 20), {'a': 1, 'b': 19})
+        self.assertEqual(allocate({'a': 2, 'b': 30}, 31), {'a': 2, 'b': 29})
+        # 층이 표본보다 많으면 큰 층부터
+        self.assertEqual(allocate({'a': 1, 'b': 5, 'c': 3}, 2), {'a': 0, 'b': 1, 'c': 1})
+        self.assertEqual(sum(allocate({i: i + 1 for i in range(7)}, 13).values()), 13)
+
+    def test_stratify_and_sample(self):
+        """층이 너무 많으면 거친 키로 합치고, 같은 입력이면 같은 표본을 고르는지 테스트"""
+        items = [(ext, d, i) for ext in ('.py', '.js') for d in range(5) for i in range(4)]
+        levels = (lambda item: (item[0], item[1]), lambda item: item[0])
+        self.assertEqual(len(stratify(items, levels, 10)), 10)
+        strata = stratify(items, levels, 4)
+        self.assertEqual(sorted(strata), ['.js', '.py'])
+
+        first = stratified_sample(strata, 6, order=lambda item: (item[2], item[1]))
+        second = stratified_sample(strata, 6, order=lambda item: (item[2], item[1]))
+        self.assertEqual(first, second)
+        self.assertEqual({key: len(sample) for key, sample in first.items()}, {'.js': 3, '.py': 3})
+
+    def test_stratified_total(self):
+        """층별 합계 추정과 신뢰구간 (전수 조사한 층은 분산 0) 테스트"""
+        total, low, high = stratified_total([(3, [1, 2, 3])])
+        self.assertEqual((total, low, high), (6, 6, 6))
+
+        total, low, high = stratified_total([(10, [1, 3]), (4, [5, 5, 5, 5])])
+        self.assertEqual(total, 40)
+        # 표본 분산 2, 유한 모집단 수정 (1 - 2/10): 분산 = 100 * 0.8 * 2 / 2 = 80
+        self.assertAlmostEqual(high - total, 1.96 * 80 ** 0.5)
+        self.assertAlmostEqual(total - low, high - total)
+
+        # 표본이 1개인 층은 전체 표본 분산 사용
+        total, low, high = stratified_total([(5, [2]), (2, [4, 6])])
+        self.assertEqual(total, 20)
+        self.assertGreater(high, total)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import tempfile
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from scan_planner import IgnoreRules, ScanRules, plan_scan, sniff_content
+from project_fingerprint import fingerprint_project
+
+
+class TestScanPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def create_test_file(self, filename, content):
+        """테스트용 파일 생성 (중간 디렉토리 포함)"""
+        file_path = os.path.join(self.test_dir, filename)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        mode = 'wb' if isinstance(content, bytes) else 'w'
+        with open(file_path, mode) as f:
+            f.write(content)
+        return file_path
+
+    def rel_paths(self, plan):
+        return [rel_path.replace(os.sep, '/') for rel_path, _, _ in plan.files]
+
+    def test_ignore_rules(self):
+        """기본 규칙, 설정 규칙, 하위 디렉토리 .gitignore와 '!' 규칙 적용 테스트"""
+        self.create_test_file('main.py', "print('main')\n")
+        self.create_test_file('.git/hooks/pre-commit.py', "x = 1\n")
+        self.create_test_file('node_modules/lib/index.js', "module.exports = 1;\n")
+        self.create_test_file('web/app.min.js', "var a=1;\n")
+        self.create_test_file('web/app.js', "var a = 1;\n")
+        self.create_test_file('.gitignore', "*.gen.py\n/scripts/\n")
+        self.create_test_file('scripts/tool.py', "x = 1\n")
+        self.create_test_file('pkg/scripts/keep.py', "x = 1\n")
+        self.create_test_file('pkg/a.gen.py', "x = 1\n")
+        self.create_test_file('pkg/.gitignore', "!a.gen.py\nlocal_*.py\n")
+        self.create_test_file('pkg/local_test.py', "x = 1\n")
+        self.create_test_file('legacy/old.py', "x = 1\n")
+
+        plan = plan_scan(self.test_dir, {'.py', '.js'}, ScanRules(['legacy/']))
+        self.assertEqual(self.rel_paths(plan),
+                         ['main.py', 'pkg/a.gen.py', 'pkg/scripts/keep.py', 'web/app.js'])
+        self.assertEqual(plan.skipped['ignored'], 2)
+        self.assertEqual(plan.ignored_dirs, 4)
+
+        rules = IgnoreRules(['docs/**/*.py', 'build/'])
+        self.assertTrue(rules.match('docs/a/b/c.py', False))
+        self.assertTrue(rules.match('docs/c.py', False))
+        self.assertIsNone(rules.match('src/docs/c.py', False))
+        self.assertIsNone(rules.match('build', False))
+        self.assertTrue(rules.match('src/build', True))
+
+    def test_size_cap_and_tiers(self):
+        """크기 상한을 넘는 파일은 제외하고 남은 파일을 크기 구간으로 나누는지 테스트"""
+        self.create_test_file('small.py', "x = 1\n")
+        self.create_test_file('medium.py', "x = 1\n" * 100)
+        self.create_test_file('huge.py', "x = 1\n" * 1000)
+
+        plan = plan_scan(self.test_dir, {'.py'}, ScanRules(max_file_bytes=1000))
+        self.assertEqual(self.rel_paths(plan), ['medium.py', 'small.py'])
+        self.assertEqual(plan.skipped['too_large'], 1)
+        tiers = plan.size_tiers((('small', 100), ('large', None)))
+        self.assertEqual(tiers, {'small': {'files': 1, 'bytes': 6}, 'large': {'files': 1, 'bytes': 600}})
+
+    def test_content_detection(self):
+        """바이너리, 압축, 생성 코드 판별과 fingerprint 단계에서의 제외 테스트"""
+        self.assertEqual(sniff_content(b"abc\0def"), 'binary')
+        self.assertEqual(sniff_content(b"// Code generated by protoc. DO NOT EDIT.\npackage x\n"), 'generated')
+        self.assertEqual(sniff_content(b"var a=1;" * 500), 'minified')
+        self.assertIsNone(sniff_content(b"def f():\n    return 1\n" * 200))
+        # 앞부분 몇 줄이 아닌 곳의 표시는 무시
+        self.assertIsNone(sniff_content(b"x = 1\n" * 10 + b"# do not edit\n"))
+
+        self.create_test_file('real.go', "package main\n\nfunc main() {}\n")
+        self.create_test_file('api.go', "// Code generated by tool. DO NOT EDIT.\npackage main\n")
+        self.create_test_file('blob.c', b"\x7fELF\0\0\0")
+        plan = plan_scan(self.test_dir, {'.go', '.c'})
+        entries = fingerprint_project(self.test_dir, {'.go', '.c'}, plan=plan)
+        self.assertEqual([e.rel_path for e in entries], ['real.go'])
+        self.assertEqual(plan.skipped['generated'], 1)
+        self.assertEqual(plan.skipped['binary'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
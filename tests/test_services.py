@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import json
+import os
+import sys
+
+# 서버 모듈 경로 추가
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'server'))
+
+from services import Services, DEFAULT_SERVICE_CONFIG
+from rate_limiter import bedrock_rate_limiter
+
+
+class TestServices(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.test_dir, 'service_config.json')
+        self.services = Services(config_path=self.config_path)
+
+    def tearDown(self):
+        import shutil
+        # 공용 토큰 버킷을 기본 설정으로 되돌림
+        bedrock_rate_limiter.configure(DEFAULT_SERVICE_CONFIG['bedrock_requests_per_minute'])
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def write_config(self, **config):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+
+    def test_shared_instances(self):
+        """요청마다 같은 분석기와 클라이언트를 돌려주는지 테스트"""
+        analyzer = self.services.code_analyzer()
+        self.assertIs(self.services.code_analyzer(), analyzer)
+        self.assertIs(analyzer.bedrock_client, self.services.bedrock_client())
+        self.assertTrue(self.services.stats()['code_analyzer'])
+
+    def test_reload_config(self):
+        """한도 변경은 기존 객체에 반영하고, 클라이언트 설정 변경 시에만 재생성하는지 테스트"""
+        analyzer = self.services.code_analyzer()
+
+        self.write_config(bedrock_requests_per_minute=120, analysis_max_concurrency=2, unknown_key=1)
+        result = self.services.reload()
+        self.assertFalse(result['rebuilt'])
+        self.assertNotIn('unknown_key', result['config'])
+        self.assertIs(self.services.code_analyzer(), analyzer)
+        self.assertEqual(analyzer.max_concurrency, 2)
+        self.assertEqual(bedrock_rate_limiter.rate, 2.0)
+
+        self.write_config(aws_region='us-west-2', analysis_max_concurrency=2)
+        self.assertTrue(self.services.reload()['rebuilt'])
+        self.assertIsNot(self.services.code_analyzer(), analyzer)
+        self.assertEqual(self.services.code_analyzer().max_concurrency, 2)
+
+
+    def test_agent_requires_aws_init(self):
+        """AWS 초기화가 실패하면 Bedrock 클라이언트가 있어도 에이전트 없이 동작하는지 테스트"""
+        calls = []
+        def failing_init():
+            calls.append(1)
+            raise RuntimeError("S3 권한 없음")
+        services = Services(config_path=self.config_path, aws_init=failing_init)
+        self.assertIsNone(services.agent_wrapper())
+
+        self.assertFalse(services.init_aws())
+        self.assertIsNone(services.agent_wrapper())
+        self.assertFalse(services.stats()['aws_ready'])
+
+        # 클라이언트 설정이 그대로면 초기화 결과도 그대로, 바뀌면 다시 초기화해서 기록
+        self.write_config(analysis_max_concurrency=2)
+        self.assertFalse(services.reload()['aws_ready'])
+        self.assertEqual(len(calls), 1)
+        self.write_config(aws_region='us-west-2')
+        self.assertFalse(services.reload()['aws_ready'])
+        self.assertEqual(len(calls), 2)
+        self.assertIsNone(services.agent_wrapper())
+
+if __name__ == '__main__':
+    unittest.main()